@@ -12,11 +12,41 @@ __all__ = [
     "GraphStyle",
     "Metrics",
     "CustomMetricsCallBacks",
+    "configure_process_metrics",
+    "QuantileSketch",
+    "get_overhead_counters",
+    "configure_python_memory",
+    "configure_stack_sampling",
+    "configure_thread_metrics",
+    "configure_burst_capture",
+    "configure_suppression",
+    "configure_combined_output",
+    "add_sink",
+    "remove_sink",
+    "open_store",
+    "start_prometheus_exporter",
+    "stop_prometheus_exporter",
+    "open_statsd_sink",
+    "open_otlp_exporter",
 ]
 
 from sparkle_log.__about__ import __version__
 from sparkle_log.as_context_manager import MetricsLoggingContext
 from sparkle_log.as_decorator import monitor_metrics_on_call
+from sparkle_log.burst import configure_burst_capture
 from sparkle_log.custom_types import CustomMetricsCallBacks, GraphStyle, Metrics
+from sparkle_log.layout import configure_combined_output
 from sparkle_log.log_writer import log_system_metrics
+from sparkle_log.otlp import open_otlp_exporter
+from sparkle_log.overhead import get_overhead_counters
+from sparkle_log.process_metrics import configure_process_metrics
+from sparkle_log.prometheus import start_prometheus_exporter, stop_prometheus_exporter
+from sparkle_log.python_memory import configure_python_memory
+from sparkle_log.sinks import add_sink, remove_sink
+from sparkle_log.sketch import QuantileSketch
+from sparkle_log.stack_sampler import configure_stack_sampling
+from sparkle_log.statsd import open_statsd_sink
+from sparkle_log.store import open_store
+from sparkle_log.suppression import configure_suppression
+from sparkle_log.thread_metrics import configure_thread_metrics
 from sparkle_log.ui import sparkline
@@ -1,7 +1,7 @@
 # sparkle_log/__main__.py
 """
-CLI interface. At the moment, the CLI is for demonstration purposes only. Use the decorator or context manager in your
-own code.
+CLI interface. Without a subcommand, the CLI runs a demonstration. `run` and `attach` monitor another process until it
+exits. `render` summarizes recorded samples offline. In your own code, use the decorator or context manager.
 """
 
 from __future__ import annotations
@@ -11,12 +11,17 @@ import logging
 import logging.config
 import sys
 import time
-from typing import Sequence, cast
+from typing import Sequence, cast, get_args
 
 from sparkle_log.__about__ import __version__
 from sparkle_log.as_context_manager import MetricsLoggingContext
 from sparkle_log.as_decorator import monitor_metrics_on_call
-from sparkle_log.custom_types import GraphStyle
+from sparkle_log.custom_types import BUILTIN_METRICS, GraphStyle, Metrics, is_builtin_metric
+from sparkle_log.dashboard import LiveDashboard
+from sparkle_log.process_monitor import attach_process, monitor_until_exit, run_command
+from sparkle_log.replay import FORMATS, parse_time, read_samples, render_samples
+
+STYLES = list(get_args(GraphStyle))
 
 
 @monitor_metrics_on_call(("cpu",), 1)
@@ -44,8 +49,29 @@ def log_memory_and_cpu_cli(
         time.sleep(int(duration / 3))
 
 
-def configure_logging() -> None:
-    """Turn on color logging"""
+def live_demo(metrics: tuple[Metrics, ...], interval: float, duration: float, dashboard: LiveDashboard) -> None:
+    """Draw metrics on a live dashboard for duration seconds."""
+    configure_logging()
+    deadline = time.monotonic() + duration
+
+    def finished(timeout: float) -> bool:
+        """Sleep until the next sample or the end of the demo, True at the end."""
+        time.sleep(max(0.0, min(timeout, deadline - time.monotonic())))
+        return time.monotonic() >= deadline
+
+    monitor_until_exit(finished, metrics, interval, dashboard=dashboard)
+
+
+def configure_logging(output: str | None = None) -> None:
+    """Turn on color logging, or plain logging to a file if output is given."""
+    handler: dict[str, str] = {
+        "level": "DEBUG",
+        "formatter": "colored",
+        "class": "logging.StreamHandler",
+        "stream": "ext://sys.stdout",  # Default is stderr
+    }
+    if output:
+        handler = {"level": "DEBUG", "formatter": "plain", "class": "logging.FileHandler", "filename": output}
     logging.config.dictConfig(
         {
             "version": 1,
@@ -53,15 +79,11 @@ def configure_logging() -> None:
                 "colored": {
                     "()": "colorlog.ColoredFormatter",
                     "format": "%(log_color)s%(levelname)-8s%(reset)s %(blue)s%(message)s",
-                }
+                },
+                "plain": {"format": "%(asctime)s %(levelname)-8s %(message)s"},
             },
             "handlers": {
-                "default": {
-                    "level": "DEBUG",
-                    "formatter": "colored",
-                    "class": "logging.StreamHandler",
-                    "stream": "ext://sys.stdout",  # Default is stderr
-                },
+                "default": handler,
             },
             "loggers": {
                 "sparkle_log": {
@@ -74,6 +96,101 @@ def configure_logging() -> None:
     )
 
 
+def _add_process_subcommands(parser: argparse.ArgumentParser) -> argparse._SubParsersAction:
+    """Add the run and attach subcommands, which monitor another process until it exits. Returns the subparsers."""
+    subparsers = parser.add_subparsers(dest="command")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--metrics",
+        type=str,
+        default="process_cpu,process_rss,process_threads",
+        help="Comma-separated list of metrics to monitor (e.g., 'process_cpu,process_rss,cpu')",
+    )
+    common.add_argument("--interval", type=float, default=1.0, help="Interval in seconds between samples")
+    common.add_argument("--style", choices=STYLES, default="bar", help="Graph Style")
+    common.add_argument("--children", action="store_true", help="Include child processes in the process_* metrics")
+    common.add_argument("--output", type=str, default=None, help="Write log lines to this file instead of stdout")
+    _add_live_arguments(common)
+
+    run_parser = subparsers.add_parser("run", parents=[common], help="Launch a command and monitor it until it exits")
+    run_parser.add_argument("cmd", nargs=argparse.REMAINDER, help="Command to run, after --")
+
+    attach_parser = subparsers.add_parser("attach", parents=[common], help="Monitor a running process until it exits")
+    attach_parser.add_argument("--pid", type=int, required=True, help="Process id to monitor")
+    return subparsers
+
+
+def _add_render_subcommand(subparsers: argparse._SubParsersAction) -> None:
+    """Add the render subcommand, which summarizes recorded samples."""
+    render_parser = subparsers.add_parser("render", help="Render sparklines and stats from recorded samples or logs")
+    render_parser.add_argument("path", help="CSV, JSON lines, store (.spkl) or sparkle_log log file")
+    render_parser.add_argument("--format", choices=FORMATS, default=None, help="Input format, guessed if not given")
+    render_parser.add_argument("--metrics", type=str, default="", help="Comma-separated metrics to show, default all")
+    render_parser.add_argument("--start", type=parse_time, default=None, help="Epoch seconds or ISO 8601 time")
+    render_parser.add_argument("--end", type=parse_time, default=None, help="Epoch seconds or ISO 8601 time")
+    render_parser.add_argument("--style", choices=STYLES, default="bar", help="Graph Style")
+    render_parser.add_argument("--points", type=int, default=30, help="Width of the sparklines, an even number")
+    render_parser.add_argument(
+        "--percentiles", type=str, default="50,95,99", help="Comma-separated percentiles to show, empty for none"
+    )
+
+
+def _add_live_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options for the live dashboard."""
+    parser.add_argument("--live", action="store_true", help="Draw a live dashboard instead of writing log lines")
+    parser.add_argument("--max-fps", type=float, default=2.0, help="Cap on live dashboard redraws per second")
+
+
+def _live_dashboard(args: argparse.Namespace, title: str) -> LiveDashboard | None:
+    """The dashboard to draw on if --live was given."""
+    if not getattr(args, "live", False):
+        return None
+    return LiveDashboard(max_fps=args.max_fps, style=cast(GraphStyle, str(args.style)), title=title)
+
+
+def _run_render_subcommand(args: argparse.Namespace) -> int:
+    """Run the render subcommand."""
+    try:
+        lines = render_samples(
+            read_samples(args.path, args.format),
+            metrics=tuple(m for m in args.metrics.split(",") if m),
+            start=args.start,
+            end=args.end,
+            style=cast(GraphStyle, str(args.style)),
+            percentiles=tuple(float(p) for p in args.percentiles.split(",") if p),
+            points=args.points,
+        )
+    except (OSError, ValueError) as error:
+        print(f"sparkle_log render: {error}", file=sys.stderr)
+        return 2
+    for line in lines:
+        print(line)
+    return 0
+
+
+def _run_process_subcommand(args: argparse.Namespace) -> int:
+    """Run the run or attach subcommand."""
+    metrics = cast(tuple[Metrics, ...], tuple(m for m in args.metrics.split(",") if m))
+    unknown = [m for m in metrics if not is_builtin_metric(m)] if metrics else ["(none)"]
+    if unknown:
+        print(
+            f"sparkle_log {args.command}: unknown --metrics {', '.join(unknown)}, choose from {', '.join(BUILTIN_METRICS)}",
+            file=sys.stderr,
+        )
+        return 2
+    style = cast(GraphStyle, str(args.style))
+    configure_logging(args.output)
+    if args.command == "attach":
+        dashboard = _live_dashboard(args, f"sparkle_log attach {args.pid}")
+        return attach_process(args.pid, metrics, args.interval, style, args.children, dashboard)
+    command = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+    if not command:
+        print("sparkle_log run: no command given, use: sparkle_log run -- <command>", file=sys.stderr)
+        return 2
+    dashboard = _live_dashboard(args, f"sparkle_log run {' '.join(command)}")
+    return run_command(command, metrics, args.interval, style, args.children, dashboard)
+
+
 def main(argv: Sequence[str] | None = None) -> int:
     """Arg parse code"""
     parser = argparse.ArgumentParser(description="Monitor system metrics using Sparkle Log.")
@@ -86,52 +203,27 @@ def main(argv: Sequence[str] | None = None) -> int:
     parser.add_argument("--interval", type=int, default=1, help="Interval in seconds between metric logs")
     parser.add_argument("--duration", type=int, default=10, help="Duration in seconds to gather metrics")
     # An add_argument call with a choice of bar, faces
-    parser.add_argument(
-        "--style",
-        choices=[
-            "bar",
-            "faces",
-            "jagged",
-            "linear",
-            "vertical",
-            "ascii_art",
-            "pie_chart",
-            "braille",
-            "arrows",
-            "weather",
-            "hearts",
-            "stars",
-            "circles",
-            "triangles",
-            "blocks",
-            "dna",
-            "morse",
-            "digits",
-            "binary",
-            "hex",
-            "chess",
-            "cards",
-            "bullets",
-            "math",
-            "zodiac",
-            "traffic",
-            "battery",
-            "temperature",
-            "music",
-            "checkmarks",
-            "trees",
-        ],
-        default="bar",
-        help="Graph Style",
-    )
+    parser.add_argument("--style", choices=STYLES, default="bar", help="Graph Style")
 
     parser.add_argument("--version", action="version", version=f"Sparkle Log {__version__}")
+    _add_live_arguments(parser)
+    _add_render_subcommand(_add_process_subcommands(parser))
 
     args = parser.parse_args(argv)
 
+    if getattr(args, "command", None) in ("run", "attach"):
+        return _run_process_subcommand(args)
+    if getattr(args, "command", None) == "render":
+        return _run_render_subcommand(args)
+
     # Convert comma-separated string to tuple of metrics
     metrics_tuple = tuple(args.metrics.split(","))
 
+    dashboard = _live_dashboard(args, "sparkle_log demo")
+    if dashboard:
+        live_demo(cast(tuple[Metrics, ...], metrics_tuple), args.interval, args.duration, dashboard)
+        return 0
+
     # Call the function with parsed arguments
     log_memory_and_cpu_cli(
         metrics=metrics_tuple, interval=args.interval, duration=args.duration, style=cast(GraphStyle, str(args.style))
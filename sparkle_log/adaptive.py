@@ -0,0 +1,94 @@
+# sparkle_log/adaptive.py
+"""
+Adaptive sampling interval.
+
+While every metric is steady the interval grows, up to a maximum, so an idle host costs fewer samples. As soon as a
+metric jumps or its recent spread rises, the interval shrinks, down to a minimum, to follow the change.
+
+Jumps and spread are relative, so one setting suits metrics of any scale: percentages against their full scale of 100,
+other metrics, like bytes per second, against the mean of their recent samples.
+"""
+
+from __future__ import annotations
+
+import statistics
+from collections import deque
+
+from sparkle_log.custom_types import NumberType
+from sparkle_log.log_writer import metric_unit
+
+INTERVAL_METRIC = "sample_interval_ms"
+
+
+class AdaptiveInterval:
+    """Pick the next sampling interval from the recent samples of every metric."""
+
+    def __init__(
+        self,
+        interval: float,
+        min_interval: float,
+        max_interval: float,
+        spread_threshold: float = 0.02,
+        change_threshold: float = 0.1,
+        window: int = 5,
+        factor: float = 1.5,
+    ) -> None:
+        """
+        Initialize the controller. Use one per scheduler, it keeps the recent samples.
+
+        Args:
+            interval: Starting interval in seconds, clamped to the bounds.
+            min_interval: Shortest interval in seconds.
+            max_interval: Longest interval in seconds.
+            spread_threshold: A metric is volatile when the standard deviation of its last `window` samples is above
+                this fraction of its scale.
+            change_threshold: A metric is volatile when it moved by more than this fraction of its scale since the
+                previous sample.
+            window: Number of recent samples per metric. The interval only grows once every window is full and calm.
+            factor: How much the interval grows or shrinks per step.
+        """
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("Need 0 < min_interval <= max_interval")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.spread_threshold = spread_threshold
+        self.change_threshold = change_threshold
+        self.window = window
+        self.factor = factor
+        self.interval = min(max(interval, min_interval), max_interval)
+        self.history: dict[str, deque[float]] = {}
+
+    @staticmethod
+    def scale(name: str, recent: deque[float]) -> float:
+        """What changes of a metric are measured against: 100 for percentages, else the mean of its recent samples."""
+        if metric_unit(name) == "%":
+            return 100.0
+        return abs(statistics.fmean(recent))
+
+    def update(self, samples: dict[str, NumberType]) -> float:
+        """
+        Add one tick's samples and return the interval to use next.
+
+        Returns:
+            float: The new interval in seconds.
+        """
+        volatile = False
+        calm = bool(samples)
+        for name, value in samples.items():
+            if value is None or name == INTERVAL_METRIC:
+                continue
+            recent = self.history.setdefault(name, deque(maxlen=self.window))
+            previous = recent[-1] if recent else None
+            recent.append(value)
+            scale = self.scale(name, recent)
+            if previous is not None and abs(value - previous) > self.change_threshold * scale:
+                volatile = True
+            if len(recent) > 1 and statistics.pstdev(recent) > self.spread_threshold * scale:
+                volatile = True
+            if len(recent) < self.window:
+                calm = False
+        if volatile:
+            self.interval = max(self.min_interval, self.interval / self.factor)
+        elif calm:
+            self.interval = min(self.max_interval, self.interval * self.factor)
+        return self.interval
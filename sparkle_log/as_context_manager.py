@@ -5,13 +5,15 @@ Context manager of logger so you have more control over when it starts and stops
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from threading import Event, Thread
 from typing import Any
 
-from sparkle_log.custom_types import CustomMetricsCallBacks, GraphStyle
+from sparkle_log.custom_types import CustomMetricsCallBacks, GraphStyle, is_builtin_metric
 from sparkle_log.graphs import GLOBAL_LOGGER
-from sparkle_log.scheduler import run_scheduler
+from sparkle_log.lag import start_loop_lag_probe
+from sparkle_log.scheduler import SCHEDULER_THREAD_NAME, run_scheduler
 
 
 class MetricsLoggingContext:
@@ -25,14 +27,23 @@ class MetricsLoggingContext:
         interval: int = 10,
         style: GraphStyle = "faces",
         custom_metrics: CustomMetricsCallBacks = None,
+        percentiles: tuple[float, ...] = (),
+        summary: bool = True,
+        adaptive: tuple[float, float] | None = None,
     ) -> None:
-        """Initialize the context manager."""
+        """
+        Initialize the context manager.
+
+        percentiles, e.g. (95, 99), adds those percentiles over all samples so far to each log line.
+        summary logs one line per metric for the whole block on exit, with percentiles and a downsampled sparkline.
+        adaptive, a (min_interval, max_interval) pair in seconds, adapts the interval to how much the metrics change.
+        """
         if not metrics:
             metrics = ("cpu", "memory")
         else:
             custom_metrics_names = custom_metrics.keys() if custom_metrics else []
             for metric in metrics:
-                if metric not in ("cpu", "memory", "drive") and metric not in custom_metrics_names:
+                if not is_builtin_metric(metric) and metric not in custom_metrics_names:
                     raise TypeError("Unexpected metric")
         self.metrics = metrics
         self.interval = interval
@@ -40,6 +51,10 @@ class MetricsLoggingContext:
         self.stop_event: Event | None = None
         self.scheduler_thread: Thread | None = None
         self.custom_metrics = custom_metrics
+        self.percentiles = percentiles
+        self.summary = summary
+        self.adaptive = adaptive
+        self.loop_lag_probe: asyncio.Task | None = None
 
     def __enter__(self) -> MetricsLoggingContext:
         """Start the context manager, if logging enabled."""
@@ -47,13 +62,29 @@ class MetricsLoggingContext:
             self.stop_event = Event()
             self.scheduler_thread = Thread(
                 target=run_scheduler,
-                args=(self.stop_event, self.metrics, self.interval, self.style, self.custom_metrics),
+                name=SCHEDULER_THREAD_NAME,
+                args=(
+                    self.stop_event,
+                    self.metrics,
+                    self.interval,
+                    self.style,
+                    self.custom_metrics,
+                    self.percentiles,
+                    self.summary,
+                    self.adaptive,
+                ),
             )
             self.scheduler_thread.start()
+            if "loop_lag_us" in self.metrics:
+                # Only measures something when the block runs inside a coroutine.
+                self.loop_lag_probe = start_loop_lag_probe()
         return self
 
     def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
         """Stop the context manager."""
+        if self.loop_lag_probe:
+            self.loop_lag_probe.cancel()
+            self.loop_lag_probe = None
         if self.scheduler_thread and self.scheduler_thread.is_alive():
             if self.stop_event:
                 self.stop_event.set()
@@ -4,30 +4,120 @@ This module contains the decorator to monitor the metrics of the system while th
 
 from __future__ import annotations
 
+import atexit
 import logging
+import time
 from functools import wraps
 from inspect import iscoroutinefunction
-from threading import Event, Thread
+from threading import Event, Lock, Thread
+from typing import Any
 
 from sparkle_log.custom_types import CustomMetricsCallBacks, GraphStyle
 from sparkle_log.graphs import GLOBAL_LOGGER
-from sparkle_log.scheduler import run_scheduler
+from sparkle_log.lag import start_loop_lag_probe
+from sparkle_log.scheduler import SCHEDULER_THREAD_NAME, run_scheduler
+from sparkle_log.timing import CallTimer
 
 INITIALIZED = False
 
 
+class _BackgroundMonitor:
+    """
+    One scheduler thread shared by every call of a timed function, started on the first call.
+
+    It keeps running between calls, so intervals without calls are logged too, until stop() or interpreter exit. A call
+    after stop() starts it again.
+    """
+
+    def __init__(
+        self,
+        metrics: tuple[str, ...],
+        interval: int,
+        style: GraphStyle,
+        custom_metrics: CustomMetricsCallBacks,
+        percentiles: tuple[float, ...] = (),
+        summary: bool = True,
+        adaptive: tuple[float, float] | None = None,
+    ) -> None:
+        """Initialize the monitor, nothing runs until ensure_started()."""
+        self.metrics = metrics
+        self.interval = interval
+        self.style = style
+        self.custom_metrics = custom_metrics
+        self.percentiles = percentiles
+        self.summary = summary
+        self.adaptive = adaptive
+        self.stop_event = Event()
+        self.scheduler_thread: Thread | None = None
+        self._lock = Lock()
+
+    def ensure_started(self) -> None:
+        """Start the scheduler thread if it is not running yet."""
+        if self.scheduler_thread is not None:
+            return
+        with self._lock:
+            if self.scheduler_thread is not None:
+                return
+            # Daemon, so a process that never stops monitoring can still exit. atexit stops it cleanly when it can.
+            self.scheduler_thread = Thread(
+                target=run_scheduler,
+                name=SCHEDULER_THREAD_NAME,
+                args=(
+                    self.stop_event,
+                    self.metrics,
+                    self.interval,
+                    self.style,
+                    self.custom_metrics,
+                    self.percentiles,
+                    self.summary,
+                    self.adaptive,
+                ),
+                daemon=True,
+            )
+            self.scheduler_thread.start()
+            atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Stop the scheduler thread, which logs the summary. The next call starts a new one."""
+        with self._lock:
+            thread, self.scheduler_thread = self.scheduler_thread, None
+            stop_event, self.stop_event = self.stop_event, Event()
+        atexit.unregister(self.stop)
+        stop_event.set()
+        if thread and thread.is_alive():
+            thread.join()
+
+
 def monitor_metrics_on_call(
     metrics: tuple[str, ...] = ("cpu", "memory"),
     interval: int = 10,
     style: GraphStyle = "bar",
     custom_metrics: CustomMetricsCallBacks = None,
+    timing: bool = False,
+    percentiles: tuple[float, ...] = (),
+    summary: bool = True,
+    adaptive: tuple[float, float] | None = None,
 ):
     """
     Decorator to monitor the system metrics while the function is being executed.
+
+    With timing=True, each call's wall and CPU time is recorded instead, and one background scheduler shared by all
+    calls logs the number of calls and p50/max latency per interval next to the other metrics. That scheduler is a
+    daemon thread started by the first call. It keeps running after the calls return, until
+    `decorated.sparkle_monitor.stop()` or interpreter exit.
+
+    percentiles, e.g. (95, 99), adds those percentiles over all samples so far to each log line.
+
+    summary logs one line per metric when the call returns, covering the whole call with percentiles and a
+    downsampled sparkline. With timing=True the summary is logged when monitoring stops, at the latest at exit.
+
+    adaptive, a (min_interval, max_interval) pair in seconds, adapts the interval to how much the metrics change.
     """
 
     def decorator(func):
         """Wrapper function"""
+        if timing:
+            return _timed(func, metrics, interval, style, custom_metrics, percentiles, summary, adaptive)
 
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -38,7 +128,8 @@ def monitor_metrics_on_call(
             stop_event = Event()
             scheduler_thread = Thread(
                 target=run_scheduler,
-                args=(stop_event, metrics, interval, style, custom_metrics),
+                name=SCHEDULER_THREAD_NAME,
+                args=(stop_event, metrics, interval, style, custom_metrics, percentiles, summary, adaptive),
             )
             scheduler_thread.start()
 
@@ -58,13 +149,17 @@ def monitor_metrics_on_call(
             stop_event = Event()
             scheduler_thread = Thread(
                 target=run_scheduler,
-                args=(stop_event, metrics, interval, style, custom_metrics),
+                name=SCHEDULER_THREAD_NAME,
+                args=(stop_event, metrics, interval, style, custom_metrics, percentiles, summary, adaptive),
             )
             scheduler_thread.start()
+            loop_lag_probe = start_loop_lag_probe() if "loop_lag_us" in metrics else None
 
             try:
                 return await func(*args, **kwargs)
             finally:
+                if loop_lag_probe:
+                    loop_lag_probe.cancel()
                 # Stop the scheduler and wait for thread to finish
                 stop_event.set()
                 scheduler_thread.join()
@@ -72,3 +167,52 @@ def monitor_metrics_on_call(
         return async_wrapper if iscoroutinefunction(func) else wrapper
 
     return decorator
+
+
+def _timed(
+    func,
+    metrics: tuple[str, ...],
+    interval: int,
+    style: GraphStyle,
+    custom_metrics: CustomMetricsCallBacks,
+    percentiles: tuple[float, ...],
+    summary: bool,
+    adaptive: tuple[float, float] | None,
+):
+    """Wrap func so each call is timed, with a shared background scheduler logging the latency metrics."""
+    timer = CallTimer(func.__name__)
+    monitor = _BackgroundMonitor(
+        metrics, interval, style, {**(custom_metrics or {}), **timer.custom_metrics()}, percentiles, summary, adaptive
+    )
+
+    @wraps(func)
+    def timed_wrapper(*args, **kwargs):
+        """Wrapper function"""
+        if not GLOBAL_LOGGER.isEnabledFor(logging.INFO):
+            return func(*args, **kwargs)
+        monitor.ensure_started()
+        wall_start = time.perf_counter_ns()
+        cpu_start = time.thread_time_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timer.record(time.perf_counter_ns() - wall_start, time.thread_time_ns() - cpu_start)
+
+    @wraps(func)
+    async def async_timed_wrapper(*args, **kwargs):
+        """Wrapper function"""
+        if not GLOBAL_LOGGER.isEnabledFor(logging.INFO):
+            return await func(*args, **kwargs)
+        monitor.ensure_started()
+        wall_start = time.perf_counter_ns()
+        cpu_start = time.thread_time_ns()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            timer.record(time.perf_counter_ns() - wall_start, time.thread_time_ns() - cpu_start)
+
+    wrapper: Any = async_timed_wrapper if iscoroutinefunction(func) else timed_wrapper
+    # Exposed so callers can stop monitoring early or read the timer, e.g. in tests.
+    wrapper.sparkle_timer = timer
+    wrapper.sparkle_monitor = monitor
+    return wrapper
@@ -0,0 +1,220 @@
+# sparkle_log/burst.py
+"""
+Burst capture: sample at a high rate for a while after a metric crosses its threshold.
+
+Between ticks the scheduler reads only the trigger metrics, once per second, into a short pre-trigger ring. When one
+crosses its threshold, the scheduler samples the trigger metrics at rate_hz instead of sleeping. At the end of the
+burst window, or when monitoring stops, it logs a high-resolution sparkline of the incident, preceded by the ring, and
+drops back to the normal interval.
+
+Trigger metrics are read with their own baselines, so watching between ticks does not shorten the window of the
+tick's cpu% or take the deltas the tick's own readings depend on.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+
+import psutil
+
+from sparkle_log.custom_types import GraphStyle, Metrics, NumberType
+from sparkle_log.drive_space import get_free_percent_for_all_drives
+from sparkle_log.graphs import GLOBAL_LOGGER
+from sparkle_log.log_writer import metric_unit
+from sparkle_log.pressure import PRESSURE_METRICS, get_pressure_sampler
+from sparkle_log.process_metrics import ProcessSampler, get_process_sampler
+from sparkle_log.ui import sparkline
+
+# Metrics that can trigger a burst: the ones that can be read between ticks without disturbing the tick's readings.
+TRIGGER_METRICS = ("cpu", "memory", "drive", "process_cpu", "process_rss", *PRESSURE_METRICS)
+
+
+def _busy_and_total(times) -> tuple[float, float]:
+    """Busy and total CPU seconds from psutil.cpu_times(). Guest time is already counted in user time."""
+    total = sum(times) - getattr(times, "guest", 0.0) - getattr(times, "guest_nice", 0.0)
+    return total - times.idle - getattr(times, "iowait", 0.0), total
+
+
+class TriggerReader:
+    """Read trigger metrics with private baselines, leaving psutil's and the samplers' shared state alone."""
+
+    def __init__(self, metrics: tuple[Metrics, ...]) -> None:
+        """Take the baselines of the rate metrics, a cpu_times() snapshot and a process sampler of our own."""
+        unknown = [m for m in metrics if m not in TRIGGER_METRICS]
+        if unknown:
+            raise ValueError(f"Burst capture cannot trigger on {', '.join(unknown)}, use {', '.join(TRIGGER_METRICS)}")
+        self.metrics = metrics
+        self._cpu = _busy_and_total(psutil.cpu_times()) if "cpu" in metrics else (0.0, 0.0)
+        self._process: ProcessSampler | None = None
+        if "process_cpu" in metrics or "process_rss" in metrics:
+            self._process_sampler()
+
+    def _process_sampler(self) -> ProcessSampler:
+        """
+        A private sampler of the process the process_* metrics watch, e.g. the child of `sparkle_log run`.
+
+        Rebuilt when configure_process_metrics() points them at another process, and sampled once on creation so the
+        first read has a cpu_percent baseline.
+        """
+        target = get_process_sampler()
+        wanted = (target.pid, target.include_children)
+        if self._process is None or (self._process.pid, self._process.include_children) != wanted:
+            self._process = ProcessSampler(target.pid, target.include_children, target.children_refresh_seconds)
+            self._process.sample()
+        return self._process
+
+    def _cpu_percent(self) -> NumberType:
+        """System CPU% since the previous read."""
+        busy, total = _busy_and_total(psutil.cpu_times())
+        previous_busy, previous_total = self._cpu
+        self._cpu = busy, total
+        if total <= previous_total:
+            return None
+        return max(0.0, min(100.0, (busy - previous_busy) / (total - previous_total) * 100))
+
+    def read(self) -> dict[str, NumberType]:
+        """One reading of every trigger metric, None for a failed read."""
+        readings: dict[str, NumberType] = {}
+        if "cpu" in self.metrics:
+            readings["cpu"] = self._cpu_percent()
+        if "memory" in self.metrics:
+            readings["memory"] = psutil.virtual_memory().percent
+        if "drive" in self.metrics:
+            readings["drive"] = get_free_percent_for_all_drives()
+        if "process_cpu" in self.metrics or "process_rss" in self.metrics:
+            readings.update(self._process_sampler().sample())
+        pressure: list[str] = [m for m in self.metrics if m in PRESSURE_METRICS]
+        if pressure:
+            readings.update(get_pressure_sampler().sample(pressure))
+        values: dict[str, NumberType] = {}
+        for m in self.metrics:
+            value = readings.get(m)
+            values[m] = None if value is None else int(value)
+        return values
+
+
+class BurstCapture:
+    """Watch trigger metrics between ticks and capture a high-rate burst when one fires."""
+
+    def __init__(
+        self,
+        triggers: dict[Metrics, float],
+        rate_hz: float = 10.0,
+        burst_seconds: float = 10.0,
+        pre_trigger_seconds: int = 5,
+        style: GraphStyle = "bar",
+    ) -> None:
+        """
+        Initialize the capture.
+
+        Args:
+            triggers: Metric to threshold, e.g. {"cpu": 90, "memory": 85}. A reading above the threshold starts a burst.
+                Only TRIGGER_METRICS can trigger.
+            rate_hz: Samples per second during a burst.
+            burst_seconds: Length of a burst.
+            pre_trigger_seconds: Seconds of once-per-second readings kept from before the trigger.
+            style: The style of the incident sparklines.
+        """
+        self.triggers = triggers
+        self.reader = TriggerReader(tuple(triggers))
+        self.rate_hz = rate_hz
+        self.burst_seconds = burst_seconds
+        self.style = style
+        self.metrics: tuple[Metrics, ...] = tuple(triggers)
+        self.ring: dict[str, deque[NumberType]] = {m: deque(maxlen=pre_trigger_seconds) for m in self.metrics}
+        max_burst_samples = max(1, int(rate_hz * burst_seconds))
+        self.burst: dict[str, deque[NumberType]] = {m: deque(maxlen=max_burst_samples) for m in self.metrics}
+        self.pre_trigger: dict[str, list[NumberType]] = {}
+        self.bursting_until: float | None = None
+        self.reason = ""
+        self.bursts = 0
+
+    @property
+    def bursting(self) -> bool:
+        """True while a burst is being captured."""
+        return self.bursting_until is not None
+
+    def watch(self) -> bool:
+        """
+        Take one reading of the trigger metrics into the ring and start a burst if any is over its threshold.
+
+        Returns:
+            bool: True when a burst is in progress, the caller should call capture_for() instead of sleeping.
+        """
+        if self.bursting:
+            return True
+        readings = self.reader.read()
+        fired = [m for m in self.metrics if (value := readings.get(m)) is not None and value > self.triggers[m]]
+        if fired:
+            self.pre_trigger = {m: list(ring) for m, ring in self.ring.items()}
+            self.bursting_until = time.monotonic() + self.burst_seconds
+            self.reason = ", ".join(f"{m} {readings[m]} > {self.triggers[m]:g}" for m in fired)
+            self.bursts += 1
+            GLOBAL_LOGGER.info(
+                f"Burst capture started: {self.reason}, sampling at {self.rate_hz:g} Hz for {self.burst_seconds:g}s"
+            )
+        for m in self.metrics:
+            self.ring[m].append(readings.get(m))
+        return self.bursting
+
+    def capture_for(self, seconds: float) -> None:
+        """Sample at rate_hz for up to seconds, finishing the burst if its window ends first."""
+        deadline = time.monotonic() + seconds
+        period = 1 / self.rate_hz
+        while self.bursting_until is not None and time.monotonic() < deadline:
+            readings = self.reader.read()
+            for m in self.metrics:
+                self.burst[m].append(readings.get(m))
+            if time.monotonic() >= self.bursting_until:
+                self.finish()
+                return
+            time.sleep(period)
+
+    def finish(self) -> list[str]:
+        """End the burst, log one incident line per trigger metric and return them."""
+        lines = []
+        for m in self.metrics:
+            series = list(self.burst[m])
+            values = [v for v in series if v is not None]
+            if not values:
+                continue
+            unit = metric_unit(m)
+            before = self.pre_trigger.get(m) or []
+            lines.append(
+                f"Burst {m}: {len(series)} samples at {self.rate_hz:g} Hz ({self.reason}) "
+                f"| min, mean, max ({min(values)}, {sum(values) / len(values):.0f}, {max(values)}){unit} "
+                f"| before {sparkline(before, self.style) if before else '-'} | {sparkline(series, self.style)}"
+            )
+            self.burst[m].clear()
+        for line in lines:
+            GLOBAL_LOGGER.info(line)
+        self.bursting_until = None
+        self.pre_trigger = {}
+        return lines
+
+
+_CAPTURE: BurstCapture | None = None
+
+
+def configure_burst_capture(
+    triggers: dict[Metrics, float] | None,
+    rate_hz: float = 10.0,
+    burst_seconds: float = 10.0,
+    pre_trigger_seconds: int = 5,
+    style: GraphStyle = "bar",
+) -> BurstCapture | None:
+    """
+    Turn on burst capture for the given triggers, see BurstCapture. None turns it off.
+
+    Returns:
+        BurstCapture | None: The capture now used by the scheduler.
+    """
+    global _CAPTURE  # pylint: disable=global-statement
+    _CAPTURE = BurstCapture(triggers, rate_hz, burst_seconds, pre_trigger_seconds, style) if triggers else None
+    return _CAPTURE
+
+
+def get_burst_capture() -> BurstCapture | None:
+    """Return the configured burst capture, None when it is off."""
+    return _CAPTURE
@@ -0,0 +1,193 @@
+# sparkle_log/cgroup.py
+"""
+Container-aware CPU and memory metrics read from the cgroup v2 filesystem.
+
+psutil reports host-wide numbers, which hide CPU throttling and how close a container is to its memory limit. Files
+are opened once and re-read with pread at offset 0 on each tick, which makes the kernel regenerate their contents
+without a fresh open/close pair.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from threading import Lock
+
+import psutil
+
+from sparkle_log.custom_types import NumberType
+
+CGROUP_METRICS = ("container_cpu", "container_throttled", "container_memory", "container_oom_kills")
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+class PreadFile:
+    """A file opened once and read from the start on every read()."""
+
+    def __init__(self, path: str, size: int = 4096) -> None:
+        """Open the file. Raises OSError if it cannot be opened."""
+        self.path = path
+        self.size = size
+        self.fd: int | None = os.open(path, os.O_RDONLY)
+
+    def read(self) -> str:
+        """Read the current contents of the file."""
+        if self.fd is None:
+            raise OSError(f"{self.path} is closed")
+        if hasattr(os, "pread"):
+            return os.pread(self.fd, self.size, 0).decode()
+        # Windows has no pread, cgroups are Linux only but keep the class usable.
+        os.lseek(self.fd, 0, os.SEEK_SET)
+        return os.read(self.fd, self.size).decode()
+
+    def close(self) -> None:
+        """Close the file descriptor."""
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def _parse_keyed(text: str) -> dict[str, int]:
+    """Parse the 'key value' per line format of cpu.stat and memory.events."""
+    result = {}
+    for line in text.splitlines():
+        key, _, value = line.partition(" ")
+        if value.strip().isdigit():
+            result[key] = int(value)
+    return result
+
+
+def find_cgroup_dir(root: str = CGROUP_ROOT, proc_self_cgroup: str = "/proc/self/cgroup") -> str | None:
+    """
+    Find this process's cgroup v2 directory.
+
+    Returns:
+        str | None: The directory, or None when not running under a cgroup v2 (unified) hierarchy.
+    """
+    if not os.path.exists(os.path.join(root, "cgroup.controllers")):
+        return None
+    try:
+        with open(proc_self_cgroup, encoding="utf-8") as handle:
+            lines = handle.read().splitlines()
+    except OSError:
+        return None
+    for line in lines:
+        if line.startswith("0::"):
+            candidate = os.path.join(root, line[3:].strip().lstrip("/"))
+            # With a cgroup namespace the path is / already. Without one, the path may not be visible in this mount.
+            return candidate if os.path.isdir(candidate) else root
+    return None
+
+
+class CgroupSampler:
+    """Sample the container_* metrics from one cgroup v2 directory."""
+
+    def __init__(self, cgroup_dir: str | None) -> None:
+        """Initialize the sampler. A cgroup_dir of None means not in a cgroup, every reading is None."""
+        self.cgroup_dir = cgroup_dir
+        self._files: dict[str, PreadFile | None] = {}
+        self._last_cpu: tuple[float, dict[str, int]] | None = None
+        self._last_oom_kills: int | None = None
+        self._lock = Lock()
+
+    def _read(self, name: str) -> str | None:
+        """Read a cgroup file, opening it on first use. None if it does not exist (controller not enabled)."""
+        if self.cgroup_dir is None:
+            return None
+        if name not in self._files:
+            try:
+                self._files[name] = PreadFile(os.path.join(self.cgroup_dir, name))
+            except OSError:
+                self._files[name] = None
+        handle = self._files[name]
+        if handle is None:
+            return None
+        try:
+            return handle.read()
+        except OSError:
+            return None
+
+    def _cpu_limit(self) -> float:
+        """Number of CPUs the cgroup may use, from cpu.max. Unlimited means all host CPUs."""
+        text = self._read("cpu.max")
+        # Format is "$MAX $PERIOD", where $MAX is "max" for no limit.
+        parts = text.split() if text else []
+        if len(parts) == 2 and parts[0].isdigit() and parts[1].isdigit() and int(parts[1]) > 0:
+            return int(parts[0]) / int(parts[1])
+        return float(psutil.cpu_count() or 1)
+
+    def _memory_limit(self) -> int:
+        """Memory limit in bytes from memory.max. Unlimited means host memory."""
+        text = self._read("memory.max")
+        if text and text.strip().isdigit():
+            return int(text)
+        return psutil.virtual_memory().total
+
+    def sample(self, names: list[str]) -> dict[str, NumberType]:
+        """
+        Read the requested container_* metrics.
+
+        Returns:
+            dict[str, NumberType]: container_cpu is % of the CPU limit, container_throttled is % of scheduler periods
+            throttled, container_memory is % of the memory limit, container_oom_kills counts OOM kills since the last
+            sample. None when not available.
+        """
+        readings: dict[str, NumberType] = dict.fromkeys(names)
+        with self._lock:
+            if "container_cpu" in names or "container_throttled" in names:
+                self._sample_cpu(readings)
+            if "container_memory" in names:
+                current = self._read("memory.current")
+                if current and current.strip().isdigit():
+                    readings["container_memory"] = int(current) / self._memory_limit() * 100
+            if "container_oom_kills" in names:
+                events = self._read("memory.events")
+                if events:
+                    oom_kills = _parse_keyed(events).get("oom_kill", 0)
+                    if self._last_oom_kills is not None:
+                        readings["container_oom_kills"] = max(0, oom_kills - self._last_oom_kills)
+                    self._last_oom_kills = oom_kills
+        return {name: readings[name] for name in names}
+
+    def _sample_cpu(self, readings: dict[str, NumberType]) -> None:
+        """Fill in container_cpu and container_throttled from cpu.stat deltas."""
+        text = self._read("cpu.stat")
+        if not text:
+            return
+        now = time.monotonic()
+        stat = _parse_keyed(text)
+        previous = self._last_cpu
+        self._last_cpu = (now, stat)
+        if previous is None:
+            return
+        elapsed = now - previous[0]
+        old = previous[1]
+        if elapsed > 0 and "usage_usec" in stat:
+            used_seconds = (stat["usage_usec"] - old.get("usage_usec", 0)) / 1_000_000
+            readings["container_cpu"] = used_seconds / elapsed / self._cpu_limit() * 100
+        periods = stat.get("nr_periods", 0) - old.get("nr_periods", 0)
+        if periods > 0:
+            readings["container_throttled"] = (stat.get("nr_throttled", 0) - old.get("nr_throttled", 0)) / periods * 100
+        elif "nr_periods" in stat:
+            # No quota set, so nothing can be throttled.
+            readings["container_throttled"] = 0
+
+    def close(self) -> None:
+        """Close all open cgroup files."""
+        with self._lock:
+            for handle in self._files.values():
+                if handle:
+                    handle.close()
+            self._files.clear()
+
+
+_SAMPLER: CgroupSampler | None = None
+
+
+def get_cgroup_sampler() -> CgroupSampler:
+    """Return the sampler for this process's cgroup, detecting the cgroup on first use."""
+    global _SAMPLER  # pylint: disable=global-statement
+    if _SAMPLER is None:
+        _SAMPLER = CgroupSampler(find_cgroup_dir())
+    return _SAMPLER
@@ -1,7 +1,7 @@
 # sparkle_log/custom_types.py
 from __future__ import annotations
 
-from typing import Callable, Literal, Union
+from typing import Callable, Literal, Union, get_args
 
 NumberType = Union[int, float, None]
 GraphStyle = Literal[
@@ -37,5 +37,50 @@ GraphStyle = Literal[
     "checkmarks",
     "trees",
 ]
-Metrics = Literal["cpu", "memory", "drive"]
+Metrics = Literal[
+    "cpu",
+    "memory",
+    "drive",
+    "process_cpu",
+    "process_rss",
+    "process_threads",
+    "process_fds",
+    "process_ctx_switches",
+    "threads",
+    "net_rx",
+    "net_tx",
+    "disk_read",
+    "disk_write",
+    "disk_iops",
+    "container_cpu",
+    "container_throttled",
+    "container_memory",
+    "container_oom_kills",
+    "cpu_pressure",
+    "memory_pressure",
+    "io_pressure",
+    "loadavg",
+    "py_heap",
+    "py_heap_peak",
+    "gc_pause_us",
+    "gc_collections",
+    "wakeup_lag_us",
+    "loop_lag_us",
+    "sparkle_log.overhead_tick_us",
+    "sparkle_log.overhead_cpu_us",
+    "sparkle_log.overhead_late_ms",
+]
+BUILTIN_METRICS: tuple[str, ...] = get_args(Metrics)
+# Metrics that can also be broken down by device, e.g. net_rx:eth0 or disk_read:sda.
+PER_DEVICE_METRICS = ("net_rx", "net_tx", "disk_read", "disk_write", "disk_iops")
+
+
+def is_builtin_metric(name: str) -> bool:
+    """True for a built-in metric name, including per-device names like net_rx:eth0."""
+    family, _, device = name.partition(":")
+    if device:
+        return family in PER_DEVICE_METRICS
+    return name in BUILTIN_METRICS
+
+
 CustomMetricsCallBacks = dict[str, Callable[[], NumberType]] | None
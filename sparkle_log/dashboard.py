@@ -0,0 +1,157 @@
+# sparkle_log/dashboard.py
+"""
+Live terminal dashboard. Draws one row per metric in place and only rewrites the cells that changed.
+"""
+
+from __future__ import annotations
+
+import shutil
+import statistics
+import sys
+import time
+import unicodedata
+from typing import TextIO
+
+from sparkle_log.custom_types import GraphStyle, NumberType
+from sparkle_log.io_metrics import format_bytes_rate
+from sparkle_log.log_writer import metric_unit
+from sparkle_log.ui import sparkline
+
+# Moving the cursor costs about 8 bytes, so unchanged gaps shorter than this are rewritten rather than skipped.
+_MIN_SKIP = 8
+
+CLEAR_SCREEN = "\x1b[2J\x1b[H"
+HIDE_CURSOR = "\x1b[?25l"
+SHOW_CURSOR = "\x1b[?25h"
+
+
+def _move(row: int, column: int) -> str:
+    """ANSI cursor position, 0-based arguments."""
+    return f"\x1b[{row + 1};{column + 1}H"
+
+
+def _has_wide_characters(text: str) -> bool:
+    """True if any character takes two terminal cells, which breaks column arithmetic."""
+    return any(unicodedata.east_asian_width(char) in ("W", "F") for char in text)
+
+
+def format_row(name: str, series: list[NumberType], style: GraphStyle = "bar", name_width: int = 12) -> str:
+    """Format one dashboard row: name, current value, min/mean/max and the sparkline."""
+    values = [v for v in series if v is not None]
+    unit = metric_unit(name)
+    if not values:
+        return f"{name:<{name_width}} {'-':>6}"
+    if unit == "B/s":
+        current = format_bytes_rate(series[-1]).strip() or "-"
+        return f"{name:<{name_width}} {current:>11} {format_bytes_rate(max(values)):>11} max {sparkline(series, style)}"
+    current = "-" if series[-1] is None else str(int(series[-1]))
+    stats = f"{min(values)}/{int(round(statistics.mean(values)))}/{max(values)}"
+    return f"{name:<{name_width}} {current:>6}{unit:<3} {stats:>17} {sparkline(series, style)}"
+
+
+def diff_row(row: int, old: str, new: str) -> str:
+    """
+    Escape sequences that turn old into new on screen row `row`.
+
+    Returns:
+        str: Cursor moves and text for the changed cells only, empty if nothing changed.
+    """
+    if old == new:
+        return ""
+    if _has_wide_characters(old) or _has_wide_characters(new):
+        # Column positions no longer match string indexes, rewrite the row and clear what is left of the old one.
+        return _move(row, 0) + new + "\x1b[K"
+    width = max(len(old), len(new))
+    old = old.ljust(width)
+    new = new.ljust(width)
+    changed = [column for column in range(width) if old[column] != new[column]]
+    parts = []
+    start = previous = changed[0]
+    for column in changed[1:]:
+        # Rewrite short unchanged gaps, a cursor move would cost more than the cells.
+        if column - previous > _MIN_SKIP:
+            parts.append(_move(row, start) + new[start : previous + 1])
+            start = column
+        previous = column
+    parts.append(_move(row, start) + new[start : previous + 1])
+    return "".join(parts)
+
+
+class LiveDashboard:
+    """
+    Fixed screen dashboard of metric rows.
+
+    Redraws are capped at max_fps regardless of how often update() is called. Frames that arrive too soon are
+    skipped; the next update after the cool-down, or close(), draws the latest state. Rows that do not fit the
+    terminal are left out, so the screen never scrolls out from under the cursor moves.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO | None = None,
+        max_fps: float = 2.0,
+        style: GraphStyle = "bar",
+        title: str = "sparkle_log",
+    ) -> None:
+        """Initialize the dashboard, nothing is drawn until the first update."""
+        self.stream = stream or sys.stdout
+        self.min_frame_seconds = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.style = style
+        self.title = title
+        self._rows: list[str] = []
+        self._last_drawn_at: float | None = None
+        self._pending: dict[str, list[NumberType]] | None = None
+        self.frames_drawn = 0
+        self.frames_skipped = 0
+        self.bytes_written = 0
+
+    def render(self, readings: dict[str, list[NumberType]], max_rows: int | None = None) -> list[str]:
+        """Rows for the given windows, title first, at most max_rows with the last one counting the rows left out."""
+        name_width = max((len(name) for name in readings), default=0)
+        rows = [self.title]
+        rows.extend(format_row(name, series, self.style, name_width) for name, series in readings.items())
+        if max_rows is not None and len(rows) > max_rows:
+            hidden = len(rows) - max_rows + 1
+            rows = [*rows[: max_rows - 1], f"... {hidden} more metrics, enlarge the terminal to see them"]
+        return rows
+
+    def update(self, readings: dict[str, list[NumberType]], force: bool = False) -> bool:
+        """
+        Redraw changed cells, unless the previous frame was too recent.
+
+        Returns:
+            bool: True if a frame was drawn.
+        """
+        now = time.monotonic()
+        if not force and self._last_drawn_at is not None and now - self._last_drawn_at < self.min_frame_seconds:
+            self.frames_skipped += 1
+            self._pending = readings
+            return False
+        self._pending = None
+        # Keep the last line free, writing on it would scroll the screen.
+        rows = self.render(readings, max(2, shutil.get_terminal_size().lines - 1))
+        if self._last_drawn_at is None:
+            output = CLEAR_SCREEN + HIDE_CURSOR + "\n".join(rows)
+        else:
+            output = "".join(
+                diff_row(index, self._rows[index] if index < len(self._rows) else "", row)
+                for index, row in enumerate(rows)
+            )
+            # Blank out rows left over from a frame with more metrics.
+            output += "".join(_move(index, 0) + "\x1b[K" for index in range(len(rows), len(self._rows)))
+        self._rows = rows
+        self._last_drawn_at = now
+        self.frames_drawn += 1
+        if output:
+            self.stream.write(output)
+            self.stream.flush()
+            self.bytes_written += len(output)
+        return True
+
+    def close(self) -> None:
+        """Draw the last skipped frame, if any, and put the cursor below the dashboard so later output is kept apart."""
+        if self._pending is not None:
+            self.update(self._pending, force=True)
+        if self._last_drawn_at is not None:
+            self.stream.write(_move(len(self._rows), 0) + SHOW_CURSOR + "\n")
+            self.stream.flush()
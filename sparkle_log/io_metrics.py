@@ -0,0 +1,134 @@
+# sparkle_log/io_metrics.py
+"""
+Network and disk throughput, as per-second rates from the deltas of psutil's cumulative counters.
+"""
+
+from __future__ import annotations
+
+import time
+from threading import Lock
+from typing import Any
+
+import psutil
+
+from sparkle_log.custom_types import NumberType
+
+NET_METRICS = ("net_rx", "net_tx")
+DISK_METRICS = ("disk_read", "disk_write", "disk_iops")
+IO_METRICS = NET_METRICS + DISK_METRICS
+
+
+class CounterRates:
+    """Turn cumulative counters into per-second rates using monotonic timestamps."""
+
+    def __init__(self) -> None:
+        """Initialize with no history, so the first reading of each counter has no rate."""
+        self._last: dict[str, tuple[float, int]] = {}
+
+    def rate(self, key: str, value: int, now: float) -> float | None:
+        """
+        Rate of change of a counter since it was last seen.
+
+        Returns:
+            float | None: Units per second, None on the first reading or if the counter was reset.
+        """
+        previous = self._last.get(key)
+        self._last[key] = (now, value)
+        if previous is None:
+            return None
+        previous_at, previous_value = previous
+        elapsed = now - previous_at
+        if elapsed <= 0:
+            return None
+        delta = value - previous_value
+        if delta < 0:
+            # psutil already corrects kernel counter wraparound (nowrap=True), so going backwards means the counter
+            # was reset, e.g. a NIC was re-added. There is no way to know how much was transferred across the reset.
+            return None
+        return delta / elapsed
+
+
+def _split(name: str) -> tuple[str, str | None]:
+    """Split 'net_rx:eth0' into the metric family and the device, if any."""
+    family, _, device = name.partition(":")
+    return family, device or None
+
+
+class IOSampler:
+    """Sample net_* and disk_* metrics, whole-system or per NIC/disk with names like net_rx:eth0 or disk_read:sda."""
+
+    def __init__(self) -> None:
+        """Initialize the sampler."""
+        self._rates = CounterRates()
+        self._lock = Lock()
+
+    def sample(self, names: list[str]) -> dict[str, NumberType]:
+        """
+        Read the requested I/O metrics.
+
+        Args:
+            names: Metric names, each an IO_METRICS family optionally followed by :device.
+
+        Returns:
+            dict[str, NumberType]: Bytes (or operations, for disk_iops) per second, None when not available yet.
+        """
+        families = [_split(name) for name in names]
+        now = time.monotonic()
+        net = self._counters(families, NET_METRICS, psutil.net_io_counters)
+        disk = self._counters(families, DISK_METRICS, psutil.disk_io_counters)
+        readings: dict[str, NumberType] = {}
+        with self._lock:
+            for name, (family, device) in zip(names, families, strict=True):
+                counters = (net if family in NET_METRICS else disk).get(device)
+                if counters is None:
+                    readings[name] = None
+                    continue
+                readings[name] = self._rates.rate(name, _counter_value(family, counters), now)
+        return readings
+
+    @staticmethod
+    def _counters(families: list[tuple[str, str | None]], wanted: tuple[str, ...], read: Any) -> dict[str | None, Any]:
+        """Read counters for one psutil call, keyed by device (None for the system total). Only reads if needed."""
+        requested = [device for family, device in families if family in wanted]
+        if not requested:
+            return {}
+        result: dict[str | None, Any] = {}
+        try:
+            if None in requested:
+                result[None] = read()
+            if any(device is not None for device in requested):
+                result.update(read(True) or {})
+        except (OSError, RuntimeError):
+            # No disks (some containers) or no permission; the metrics read as None.
+            pass
+        return result
+
+
+def _counter_value(family: str, counters: Any) -> int:
+    """The cumulative counter behind a metric family."""
+    if family == "net_rx":
+        return counters.bytes_recv
+    if family == "net_tx":
+        return counters.bytes_sent
+    if family == "disk_read":
+        return counters.read_bytes
+    if family == "disk_write":
+        return counters.write_bytes
+    return counters.read_count + counters.write_count
+
+
+def format_bytes_rate(value: NumberType) -> str:
+    """Format bytes per second with an automatically scaled unit, e.g. 1.2 MB/s."""
+    if value is None:
+        return "  "
+    if abs(value) < 1024:
+        return f"{int(value)} B/s"
+    scaled = value / 1024
+    for unit in ("KB/s", "MB/s"):
+        if abs(scaled) < 1024:
+            return f"{scaled:.1f} {unit}"
+        scaled /= 1024
+    return f"{scaled:.1f} GB/s"
+
+
+IO_SAMPLER = IOSampler()
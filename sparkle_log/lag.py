@@ -0,0 +1,81 @@
+# sparkle_log/lag.py
+"""
+Wake-up lag of the scheduler thread and of the asyncio event loop.
+
+wakeup_lag_us is sleep overshoot: how much longer than asked each of the scheduler thread's short polling sleeps took.
+A thread that asks to sleep for one second and wakes up 40 ms late was mostly waiting for the GIL, so the overshoot is
+a direct measure of how busy the application keeps the interpreter, plus the OS timer slack of a millisecond or less.
+It is not the tick's lateness: sparkle_log.overhead_late_ms measures when a tick started against its deadline, which
+also counts the time spent sampling and in the previous tick.
+
+An event loop that resumes a sleeping task late is blocked by callbacks that do not yield.
+
+Both are in microseconds: contention worth knowing about often stays well under a millisecond, which a metric in
+milliseconds would log as 0.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from threading import Lock
+
+from sparkle_log.custom_types import NumberType
+
+LAG_METRICS = ("wakeup_lag_us", "loop_lag_us")
+
+
+class LagTracker:
+    """Worst lag seen since the last sample."""
+
+    def __init__(self) -> None:
+        """Initialize an empty tracker."""
+        self._worst: float | None = None
+        self._lock = Lock()
+
+    def record(self, lag_seconds: float) -> None:
+        """Record one lag measurement. Early wake-ups count as no lag."""
+        lag_seconds = max(0.0, lag_seconds)
+        with self._lock:
+            self._worst = lag_seconds if self._worst is None else max(self._worst, lag_seconds)
+
+    def take(self) -> NumberType:
+        """Return the worst lag in microseconds since the last call, None if nothing was measured."""
+        with self._lock:
+            worst, self._worst = self._worst, None
+        return None if worst is None else worst * 1_000_000
+
+
+WAKEUP_LAG = LagTracker()
+LOOP_LAG = LagTracker()
+
+
+async def _probe_loop(period: float) -> None:
+    """Sleep for period over and over, recording how late the loop resumes this task."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(period)
+        LOOP_LAG.record(loop.time() - started - period)
+
+
+def start_loop_lag_probe(period: float = 0.1) -> asyncio.Task | None:
+    """
+    Start measuring loop_lag_us on the event loop running in this thread.
+
+    Args:
+        period: Seconds between probes. Each probe is one sleep and two clock reads on the loop.
+
+    Returns:
+        asyncio.Task | None: The probe task, cancel it to stop. None when no event loop is running.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    return loop.create_task(_probe_loop(period))
+
+
+def sample_lag(names: list[str]) -> dict[str, NumberType]:
+    """Read the requested lag metrics, the worst lag in microseconds since the previous sample."""
+    trackers = {"wakeup_lag_us": WAKEUP_LAG, "loop_lag_us": LOOP_LAG}
+    return {name: trackers[name].take() for name in names}
@@ -0,0 +1,74 @@
+# sparkle_log/layout.py
+"""
+Combined output: every metric of a tick in one log record, e.g. `cpu   43% ▁▂▅ | mem   61% ▃▃▄`.
+
+One record per tick instead of one per metric means one handler call, one handler lock and one line to ingest. The
+exception is the threads metric, whose ranking of the busiest threads stays a record of its own after the line. With
+a suppression policy the line is one decision: written if any metric changed, counted once if not.
+"""
+
+from __future__ import annotations
+
+# Short labels keep the combined line narrow.
+SHORT_LABELS = {"memory": "mem"}
+
+
+class CombinedLayout:
+    """Fixed-column, single-line layout for all metrics of a tick."""
+
+    def __init__(self, order: tuple[str, ...] = (), label_width: int = 5, value_width: int = 8) -> None:
+        """
+        Initialize the layout.
+
+        Args:
+            order: Metrics to put first, in this order. The rest follow in the order they were requested.
+            label_width: Column width of the metric labels, longer labels widen their column.
+            value_width: Column width of the current values, right aligned.
+        """
+        self.order = order
+        self.label_width = label_width
+        self.value_width = value_width
+
+    def sort(self, metrics: list[str]) -> list[str]:
+        """Put the metrics in field order."""
+        first = [m for m in self.order if m in metrics]
+        return first + [m for m in metrics if m not in first]
+
+    def format_line(self, fields: dict[str, tuple[str, str]]) -> str:
+        """
+        Join the fields into one line.
+
+        Args:
+            fields: Metric name to (current value, sparkline), already formatted.
+
+        Returns:
+            str: The line, empty when there are no fields.
+        """
+        columns = []
+        for metric in self.sort(list(fields)):
+            value, graph = fields[metric]
+            label = SHORT_LABELS.get(metric, metric)
+            columns.append(f"{label.ljust(self.label_width)} {value.rjust(self.value_width)} {graph}")
+        return " | ".join(columns)
+
+
+_LAYOUT: CombinedLayout | None = None
+
+
+def configure_combined_output(
+    enabled: bool = True, order: tuple[str, ...] = (), label_width: int = 5, value_width: int = 8
+) -> CombinedLayout | None:
+    """
+    Log all metrics of a tick as one line, see CombinedLayout. enabled=False goes back to one line per metric.
+
+    Returns:
+        CombinedLayout | None: The layout now in use.
+    """
+    global _LAYOUT  # pylint: disable=global-statement
+    _LAYOUT = CombinedLayout(order, label_width, value_width) if enabled else None
+    return _LAYOUT
+
+
+def get_combined_layout() -> CombinedLayout | None:
+    """Return the combined layout, None when each metric gets its own line."""
+    return _LAYOUT
@@ -5,45 +5,124 @@ Log writer module, stateful and does not require a decorator or context manager.
 from __future__ import annotations
 
 import logging
+import math
 import statistics
+import time
+from array import array
+from itertools import pairwise
 from threading import Lock
 from typing import cast
 
 import psutil
 
+from sparkle_log.cgroup import CGROUP_METRICS, get_cgroup_sampler
 from sparkle_log.custom_types import CustomMetricsCallBacks, GraphStyle, Metrics, NumberType
 from sparkle_log.drive_space import get_free_percent_for_all_drives
 from sparkle_log.graphs import GLOBAL_LOGGER
+from sparkle_log.io_metrics import IO_METRICS, IO_SAMPLER, format_bytes_rate
+from sparkle_log.lag import LAG_METRICS, sample_lag
+from sparkle_log.layout import get_combined_layout
+from sparkle_log.overhead import OVERHEAD, OVERHEAD_METRICS
+from sparkle_log.pressure import PRESSURE_METRICS, get_pressure_sampler
+from sparkle_log.process_metrics import PROCESS_METRICS, get_process_sampler
+from sparkle_log.python_memory import GC_METRICS, GC_TRACKER, PY_HEAP_METRICS, get_heap_sampler
+from sparkle_log.sinks import notify_sinks
+from sparkle_log.sketch import QuantileSketch
+from sparkle_log.suppression import get_suppression_policy
+from sparkle_log.thread_metrics import get_thread_sampler
 from sparkle_log.ui import sparkline
 
 # Global readings buffer. Each metric stores a rolling window of up to 30 samples.
 READINGS: dict[str, list[NumberType]] = {}
 
+# Monotonic time of each sample in READINGS, index for index, so sparklines can show late and skipped ticks. A compact
+# array of doubles, NaN for the padding READINGS starts with.
+TIMESTAMPS: dict[str, array] = {}
+
+# A pause shorter than this is scheduling jitter, not a gap worth drawing.
+MIN_GAP_SECONDS = 0.5
+
+# Quantile sketch per metric, over every sample since the metric was first seen with percentiles requested. Bounded
+# memory, unlike READINGS would be if it kept everything. Used when log_system_metrics() is called without sketches
+# of its own, monitoring runs each keep theirs.
+SKETCHES: dict[str, QuantileSketch] = {}
+
 # Protect READINGS from concurrent access (decorator + context manager can run in parallel threads).
 _READINGS_LOCK = Lock()
 
+# Unit shown after the current value. Anything not listed is a percentage. B/s is scaled to KB/s, MB/s as needed.
+METRIC_UNITS: dict[str, str] = {
+    "process_rss": " MB",
+    "process_threads": "",
+    "process_fds": "",
+    "process_ctx_switches": "/s",
+    "net_rx": "B/s",
+    "net_tx": "B/s",
+    "disk_read": "B/s",
+    "disk_write": "B/s",
+    "disk_iops": "/s",
+    "container_oom_kills": "",
+    "py_heap": " MB",
+    "py_heap_peak": " MB",
+    "gc_collections": "",
+}
+
+
+# Metrics whose current value is cut to two characters, as they always were.
+FIXED_WIDTH_METRICS = ("cpu", "memory", "drive")
+
+# Units for metrics whose names are generated, e.g. the per-call latency metrics of monitor_metrics_on_call.
+METRIC_UNIT_SUFFIXES: dict[str, str] = {
+    "_us": " us",
+    "_ms": " ms",
+    "_calls": "",
+}
+
+
+def metric_unit(metric: str) -> str:
+    """Unit of a metric. Per-device metrics like net_rx:eth0 share the unit of their family."""
+    family = metric.partition(":")[0]
+    if family in METRIC_UNITS:
+        return METRIC_UNITS[family]
+    for suffix, unit in METRIC_UNIT_SUFFIXES.items():
+        if family.endswith(suffix):
+            return unit
+    return "%"
+
 
 def _ensure_metric_buffers(metrics: tuple[Metrics, ...], custom_metrics: CustomMetricsCallBacks) -> None:
     """Ensure all requested metric keys (including custom) exist in READINGS."""
     with _READINGS_LOCK:
-        for m in metrics:
-            READINGS.setdefault(m, [None] * 29)
-        if custom_metrics:
-            for name in custom_metrics.keys():
-                READINGS.setdefault(name, [None] * 29)
+        for name in (*metrics, *(custom_metrics or {})):
+            if name not in READINGS:
+                READINGS[name] = [None] * 29
+                TIMESTAMPS[name] = array("d", [math.nan] * 29)
 
 
 def _append_metric_sample(name: str, value: NumberType) -> None:
     """Append a single sample to a metric window, trimming to last 30."""
     with _READINGS_LOCK:
-        READINGS.setdefault(name, [None] * 29).append(value)
+        if name not in READINGS:
+            READINGS[name] = [None] * 29
+            TIMESTAMPS[name] = array("d", [math.nan] * 29)
+        READINGS[name].append(value)
+        times = TIMESTAMPS.setdefault(name, array("d", [math.nan] * (len(READINGS[name]) - 1)))
+        times.append(time.monotonic())
         if len(READINGS[name]) > 30:
             READINGS[name].pop(0)
+        if len(times) > 30:
+            times.pop(0)
 
 
-def _gather_builtin_metrics(metrics: tuple[Metrics, ...]) -> None:
-    """Sample built-in metrics (cpu/memory/drive) and append to buffers."""
+def read_builtin_metrics(metrics: tuple[Metrics, ...]) -> dict[str, NumberType]:
+    """
+    Sample built-in metrics without touching the windows, e.g. for burst capture.
+
+    Rate and "since the previous sample" metrics are measured from whichever read came last, window or not.
+    """
+    sampled: dict[str, NumberType] = {}
     if "cpu" in metrics:
+        started = time.perf_counter_ns()
         # Interval None to prevent blocking.
         # https://psutil.readthedocs.io/en/latest/#psutil.cpu_percent
         interval = None
@@ -52,26 +131,104 @@ def _gather_builtin_metrics(metrics: tuple[Metrics, ...]) -> None:
         # First reading with interval=None can be unreliable (often 0).
         # Do not append that initial 0, but do not bail out either; let other metrics record.
         if not (reading == 0 and interval is None):
-            _append_metric_sample("cpu", 0 if reading is None else int(reading))
+            sampled["cpu"] = 0 if reading is None else int(reading)
+        OVERHEAD.add_phase("sample.cpu", time.perf_counter_ns() - started)
 
     if "memory" in metrics:
-        _append_metric_sample("memory", int(psutil.virtual_memory().percent))
+        started = time.perf_counter_ns()
+        sampled["memory"] = int(psutil.virtual_memory().percent)
+        OVERHEAD.add_phase("sample.memory", time.perf_counter_ns() - started)
 
     if "drive" in metrics:
-        _append_metric_sample("drive", int(get_free_percent_for_all_drives()))
+        started = time.perf_counter_ns()
+        sampled["drive"] = int(get_free_percent_for_all_drives())
+        OVERHEAD.add_phase("sample.drive", time.perf_counter_ns() - started)
+
+    requested_process_metrics = [m for m in metrics if m in PROCESS_METRICS]
+    if requested_process_metrics:
+        started = time.perf_counter_ns()
+        # One oneshot() batch serves every process_* metric for this tick.
+        process_readings = get_process_sampler().sample()
+        for metric in requested_process_metrics:
+            value = process_readings[metric]
+            sampled[metric] = None if value is None else int(value)
+        OVERHEAD.add_phase("sample.process", time.perf_counter_ns() - started)
+
+    if "threads" in metrics:
+        started = time.perf_counter_ns()
+        value = get_thread_sampler().sample()["threads"]
+        sampled["threads"] = None if value is None else int(value)
+        OVERHEAD.add_phase("sample.threads", time.perf_counter_ns() - started)
+
+    requested_io_metrics: list[str] = [m for m in metrics if m.partition(":")[0] in IO_METRICS]
+    if requested_io_metrics:
+        started = time.perf_counter_ns()
+        for name, value in IO_SAMPLER.sample(requested_io_metrics).items():
+            sampled[name] = None if value is None else int(value)
+        OVERHEAD.add_phase("sample.io", time.perf_counter_ns() - started)
+
+    requested_cgroup_metrics: list[str] = [m for m in metrics if m in CGROUP_METRICS]
+    if requested_cgroup_metrics:
+        started = time.perf_counter_ns()
+        for name, value in get_cgroup_sampler().sample(requested_cgroup_metrics).items():
+            sampled[name] = None if value is None else int(value)
+        OVERHEAD.add_phase("sample.cgroup", time.perf_counter_ns() - started)
+
+    requested_pressure_metrics: list[str] = [m for m in metrics if m in PRESSURE_METRICS]
+    if requested_pressure_metrics:
+        started = time.perf_counter_ns()
+        for name, value in get_pressure_sampler().sample(requested_pressure_metrics).items():
+            sampled[name] = None if value is None else int(value)
+        OVERHEAD.add_phase("sample.pressure", time.perf_counter_ns() - started)
+
+    requested_heap_metrics: list[str] = [m for m in metrics if m in PY_HEAP_METRICS]
+    if requested_heap_metrics:
+        started = time.perf_counter_ns()
+        for name, value in get_heap_sampler().sample(requested_heap_metrics).items():
+            sampled[name] = None if value is None else int(value)
+        OVERHEAD.add_phase("sample.py_heap", time.perf_counter_ns() - started)
+
+    requested_gc_metrics: list[str] = [m for m in metrics if m in GC_METRICS]
+    if requested_gc_metrics:
+        for name, value in GC_TRACKER.sample(requested_gc_metrics).items():
+            sampled[name] = None if value is None else int(value)
+
+    requested_lag_metrics: list[str] = [m for m in metrics if m in LAG_METRICS]
+    if requested_lag_metrics:
+        for name, value in sample_lag(requested_lag_metrics).items():
+            sampled[name] = None if value is None else int(value)
+
+    requested_overhead_metrics: list[str] = [m for m in metrics if m in OVERHEAD_METRICS]
+    if requested_overhead_metrics:
+        for name, value in OVERHEAD.sample(requested_overhead_metrics).items():
+            sampled[name] = None if value is None else int(value)
+    return sampled
 
 
-def _gather_custom_metrics(custom_metrics: CustomMetricsCallBacks) -> None:
-    """Sample custom metric callables and append to buffers."""
+def _gather_builtin_metrics(metrics: tuple[Metrics, ...]) -> dict[str, NumberType]:
+    """Sample built-in metrics and append to buffers. Returns the samples taken."""
+    sampled = read_builtin_metrics(metrics)
+    for name, value in sampled.items():
+        _append_metric_sample(name, value)
+    return sampled
+
+
+def _gather_custom_metrics(custom_metrics: CustomMetricsCallBacks) -> dict[str, NumberType]:
+    """Sample custom metric callables and append to buffers. Returns the samples taken."""
+    sampled: dict[str, NumberType] = {}
     if not custom_metrics:
-        return
+        return sampled
+    started = time.perf_counter_ns()
     for name, fn in custom_metrics.items():
         try:
             reading = fn()
         #  - user-provided callback may fail; we insulate the logger
         except Exception:  # nosec
             reading = None
-        _append_metric_sample(name, None if reading is None else int(reading))
+        sampled[name] = None if reading is None else int(reading)
+        _append_metric_sample(name, sampled[name])
+    OVERHEAD.add_phase("custom", time.perf_counter_ns() - started)
+    return sampled
 
 
 def _pad(value: NumberType) -> str:
@@ -81,49 +238,203 @@ def _pad(value: NumberType) -> str:
     return str(int(value)).rjust(2)
 
 
-def _log_metric_series(metric: str, series: list[NumberType], style: GraphStyle) -> None:
-    """Compute stats and emit a single log line for one metric."""
+def _format_percentiles(
+    metric: str, percentiles: tuple[float, ...], unit: str, sketches: dict[str, QuantileSketch]
+) -> str:
+    """The '| p95, p99 (80, 97) ' part of a log line, from the metric's long-running sketch."""
+    sketch = sketches.get(metric)
+    if not percentiles or sketch is None or not sketch.count:
+        return ""
+    names = ", ".join(f"p{p:g}" for p in percentiles)
+    estimates = [sketch.quantile(p / 100) for p in percentiles]
+    if unit == "B/s":
+        values = ", ".join(format_bytes_rate(v) for v in estimates)
+    else:
+        values = ", ".join(_pad(None if v is None else int(round(v))) for v in estimates)
+    return f"| {names} ({values}) "
+
+
+def place_in_time(series: list[NumberType], times: list[float], max_cells: int = 60) -> list[NumberType]:
+    """
+    Spread a window over time buckets one typical interval wide, so a late, skipped or paused tick shows as a gap.
+
+    Args:
+        series: The window of samples.
+        times: Monotonic time of each sample, NaN for padding. Without usable times the series is returned as is.
+        max_cells: Cap on the length of the result, the oldest cells are dropped past it.
+
+    Returns:
+        list[NumberType]: The samples, with a None for every missed interval.
+    """
+    if len(times) != len(series):
+        return series
+    stamped = [t for t in times if not math.isnan(t)]
+    steps = sorted(later - earlier for earlier, later in pairwise(stamped))
+    if len(steps) < 2 or steps[len(steps) // 2] <= 0:
+        return series
+    step = steps[len(steps) // 2]
+    placed: list[NumberType] = []
+    previous = math.nan
+    for value, at in zip(series, times, strict=True):
+        if not math.isnan(previous) and at - previous - step >= MIN_GAP_SECONDS:
+            placed.extend([None] * min(max_cells, round((at - previous) / step) - 1))
+        placed.append(value)
+        previous = at
+    return placed[-max_cells:]
+
+
+def _log_metric_series(
+    metric: str,
+    series: list[NumberType],
+    style: GraphStyle,
+    percentiles: tuple[float, ...] = (),
+    times: list[float] | None = None,
+    sketches: dict[str, QuantileSketch] | None = None,
+) -> None:
+    """
+    Compute stats and emit a single log line for one metric. With times, the sparkline shows gaps in time.
+
+    The percentiles come from sketches, SKETCHES by default.
+    """
     if all(v is None for v in series):
         return
+    started = time.perf_counter_ns()
     values_for_stats = [int(v) for v in series if v is not None]
     if not values_for_stats:
         return
 
     average = int(round(statistics.mean(values_for_stats), 0))
+    policy = get_suppression_policy()
+    if policy and not policy.should_emit(metric, (series[-1], min(values_for_stats), average, max(values_for_stats))):
+        OVERHEAD.add_phase("stats", time.perf_counter_ns() - started)
+        return
     minimum = _pad(min(values_for_stats))
     maximum = _pad(max(values_for_stats))
-    current = _pad(series[-1])[-2:]
-
-    # Keep the original human-readable format and sparkline.
-    if metric == "cpu":
-        GLOBAL_LOGGER.info(
-            f"CPU   : {current}% "
-            f"| min, mean, max ({minimum}, {average}, {maximum}) "
-            f"| {sparkline(series, style)}"
-        )
-    elif metric == "memory":
-        GLOBAL_LOGGER.info(
-            f"Memory: {current}% "
-            f"| min, mean, max ({minimum}, {average}, {maximum}) "
-            f"| {sparkline(series, style)}"
-        )
-    elif metric == "drive":
-        GLOBAL_LOGGER.info(
-            f"Drive: {current}% " f"| min, mean, max ({minimum}, {average}, {maximum}) " f"| {sparkline(series, style)}"
+    unit = metric_unit(metric)
+    tails = _format_percentiles(metric, percentiles, unit, SKETCHES if sketches is None else sketches)
+    rendered = time.perf_counter_ns()
+    OVERHEAD.add_phase("stats", rendered - started)
+    graph = sparkline(place_in_time(series, times) if times else series, style)
+    emitted = time.perf_counter_ns()
+    OVERHEAD.add_phase("render", emitted - rendered)
+
+    if unit == "B/s":
+        message = (
+            f"{metric}: {format_bytes_rate(series[-1])} "
+            f"| min, mean, max ({format_bytes_rate(min(values_for_stats))}, "
+            f"{format_bytes_rate(average)}, {format_bytes_rate(max(values_for_stats))}) "
+            f"{tails}"
+            f"| {graph}"
         )
     else:
-        GLOBAL_LOGGER.info(
-            f"{metric}: {current}% "
-            f"| min, mean, max ({minimum}, {average}, {maximum}) "
-            f"| {sparkline(series, style)}"
-        )
+        # The original metrics keep their fixed two character column. The others can pass 99, e.g. process_cpu
+        # on several cores or loadavg on an overloaded machine, and are shown in full.
+        current = _pad(series[-1])[-2:] if metric in FIXED_WIDTH_METRICS else _pad(series[-1])
+        # Keep the original human-readable format and sparkline.
+        label = {"cpu": "CPU   : ", "memory": "Memory: ", "drive": "Drive: "}.get(metric, f"{metric}: ")
+        message = f"{label}{current}{unit} | min, mean, max ({minimum}, {average}, {maximum}) {tails}| {graph}"
+    GLOBAL_LOGGER.info(message)
+    OVERHEAD.add_phase("emit", time.perf_counter_ns() - emitted)
+
+
+def _combined_field(
+    metric: str, series: list[NumberType], style: GraphStyle, times: list[float] | None
+) -> tuple[str, str]:
+    """One metric's field in the combined line, (current value, sparkline)."""
+    unit = metric_unit(metric)
+    current = series[-1]
+    if current is None:
+        value = "-"
+    elif unit == "B/s":
+        value = format_bytes_rate(current)
+    else:
+        value = f"{int(current)}{unit}"
+    return value, sparkline(place_in_time(series, times) if times else series, style)
+
+
+def _log_combined(fields_by_metric: dict[str, tuple[list[NumberType], list[float] | None]], style: GraphStyle) -> bool:
+    """
+    Write every metric of this tick as one record. With a suppression policy, only if any metric changed.
+
+    Returns:
+        bool: True if the line was written.
+    """
+    layout = get_combined_layout()
+    if layout is None:
+        return False
+    started = time.perf_counter_ns()
+    stats: dict[str, tuple[NumberType, ...]] = {}
+    for metric, (series, _times) in fields_by_metric.items():
+        values = [v for v in series if v is not None]
+        if values:
+            stats[metric] = (series[-1], min(values), max(values))
+    policy = get_suppression_policy()
+    if not stats or (policy and not policy.should_emit_line(stats)):
+        OVERHEAD.add_phase("stats", time.perf_counter_ns() - started)
+        return False
+    fields = {}
+    for metric in stats:
+        series, times = fields_by_metric[metric]
+        fields[metric] = _combined_field(metric, series, style, times)
+    emitted = time.perf_counter_ns()
+    OVERHEAD.add_phase("render", emitted - started)
+    GLOBAL_LOGGER.info(layout.format_line(fields))
+    OVERHEAD.add_phase("emit", time.perf_counter_ns() - emitted)
+    return True
+
+
+def collect_system_metrics(
+    metrics: tuple[Metrics, ...],
+    custom_metrics: CustomMetricsCallBacks = None,
+) -> dict[str, NumberType]:
+    """
+    Sample metrics into READINGS without writing any log lines.
+
+    Args:
+        metrics: A tuple of metrics to sample.
+        custom_metrics: A dictionary of custom metrics to sample.
+
+    Returns:
+        dict[str, NumberType]: The samples taken on this call.
+    """
+    # Ensure buffers exist for all requested metrics before sampling.
+    _ensure_metric_buffers(metrics, custom_metrics)
+
+    # Gather samples.
+    sampled = _gather_custom_metrics(custom_metrics)
+    sampled.update(_gather_builtin_metrics(metrics))
+
+    # Trim windows once after sampling (defensive; individual appends already trim).
+    with _READINGS_LOCK:
+        for windows in (READINGS, TIMESTAMPS):
+            for values in windows.values():
+                if len(values) > 30:
+                    values.pop(0)
+    notified = time.perf_counter_ns()
+    notify_sinks(sampled)
+    OVERHEAD.add_phase("sinks", time.perf_counter_ns() - notified)
+    return sampled
+
+
+def snapshot_readings(names: tuple[str, ...]) -> dict[str, list[NumberType]]:
+    """Copy the windows of the named metrics, for rendering outside the lock."""
+    with _READINGS_LOCK:
+        return {name: list(READINGS[name]) for name in names if name in READINGS}
+
+
+def snapshot_timestamps(names: tuple[str, ...]) -> dict[str, list[float]]:
+    """Copy the sample times of the named metrics, aligned with snapshot_readings(). NaN marks padding."""
+    with _READINGS_LOCK:
+        return {name: TIMESTAMPS[name].tolist() for name in names if name in TIMESTAMPS}
 
 
 def log_system_metrics(
     metrics: tuple[Metrics, ...],
     style: GraphStyle = "bar",
     custom_metrics: CustomMetricsCallBacks = None,
-) -> None:
+    percentiles: tuple[float, ...] = (),
+    sketches: dict[str, QuantileSketch] | None = None,
+) -> dict[str, NumberType]:
     """
     Log system metrics.
 
@@ -131,25 +442,44 @@ def log_system_metrics(
         metrics: A tuple of metrics to log.
         style: The style of the sparkline.
         custom_metrics: A dictionary of custom metrics to log.
+        percentiles: Percentiles to add to each line, e.g. (95, 99), estimated over all samples so far. Not shown
+            in the combined layout.
+        sketches: Where to keep the quantile sketches behind the percentiles, SKETCHES by default. Only fed when
+            percentiles are requested.
+
+    Returns:
+        dict[str, NumberType]: The samples taken on this call, empty if logging is disabled.
     """
     if not GLOBAL_LOGGER.isEnabledFor(logging.INFO):
-        return
-
-    # Ensure buffers exist for all requested metrics before sampling.
-    _ensure_metric_buffers(metrics, custom_metrics)
+        return {}
 
-    # Gather samples.
-    _gather_custom_metrics(custom_metrics)
-    _gather_builtin_metrics(metrics)
+    wall_started = time.perf_counter_ns()
+    cpu_started = time.thread_time_ns()
+    sampled = collect_system_metrics(metrics, custom_metrics)
 
-    # Trim windows once after sampling (defensive; individual appends already trim).
+    combined = get_combined_layout() is not None
+    if sketches is None:
+        sketches = SKETCHES
     with _READINGS_LOCK:
-        for values in READINGS.values():
-            if len(values) > 30:
-                values.pop(0)
-
+        if percentiles:
+            for name, value in sampled.items():
+                if value is not None:
+                    sketches.setdefault(name, QuantileSketch()).add(value)
         # Emit logs only for requested metrics (built-ins or custom names that were requested).
+        requested = {}
         for metric, series in READINGS.items():
             if metric not in metrics and (not custom_metrics or metric not in custom_metrics):
                 continue
-            _log_metric_series(metric, series, style)
+            times = TIMESTAMPS[metric].tolist() if metric in TIMESTAMPS else None
+            if combined:
+                requested[metric] = (series, times)
+            else:
+                _log_metric_series(metric, series, style, percentiles, times, sketches)
+        line_written = _log_combined(requested, style) if combined else True
+    # A record of its own, also in combined mode, and only alongside a written combined line.
+    if "threads" in metrics and line_written:
+        top_threads = get_thread_sampler().format_top()
+        if top_threads:
+            GLOBAL_LOGGER.info(top_threads)
+    OVERHEAD.add_tick(time.perf_counter_ns() - wall_started, time.thread_time_ns() - cpu_started)
+    return sampled
@@ -0,0 +1,278 @@
+# sparkle_log/otlp.py
+"""
+OpenTelemetry (OTLP) metrics exporter.
+
+Each tick adds a gauge data point per metric and feeds a per-metric histogram. Every flush_interval seconds, and on
+close, the batch becomes one ExportMetricsServiceRequest, sent as OTLP/JSON or protobuf to an OTLP/HTTP endpoint or
+appended to a file. Flushing runs on the sampler thread, no other thread is started. An exporter registered as a sink
+is closed, and so flushed, when the interpreter exits.
+
+Requests that fail to send wait in a retry buffer of at most max_buffered requests; past that the oldest are dropped, so
+a slow or missing collector never grows memory without limit. A request that cannot be encoded would fail the same way
+every time, so it is dropped instead.
+
+Protobuf output needs the optional opentelemetry-proto package (`pip install sparkle-log[otlp]`). JSON needs nothing.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import urllib.request
+from collections import deque
+from threading import Lock
+from typing import Any
+
+from sparkle_log.__about__ import __version__
+from sparkle_log.custom_types import NumberType
+from sparkle_log.log_writer import metric_unit
+from sparkle_log.sinks import add_sink
+
+ENCODINGS = ("json", "protobuf")
+CONTENT_TYPES = {"json": "application/json", "protobuf": "application/x-protobuf"}
+# Explicit histogram bucket bounds, suited to the percentage metrics.
+DEFAULT_BOUNDS = (10.0, 25.0, 50.0, 75.0, 90.0, 95.0, 99.0)
+# AGGREGATION_TEMPORALITY_DELTA, each histogram covers one flush interval.
+DELTA = 1
+# UCUM units for sparkle_log's units. sparkle_log's MB are 1024 * 1024 bytes.
+UNITS = {"%": "%", "B/s": "By/s", "/s": "1/s", "MB": "MiBy", "ms": "ms", "us": "us", "": "1"}
+
+
+def _attributes(device: str) -> list[dict[str, Any]]:
+    """Data point attributes, a device for per-device metrics like net_rx:eth0."""
+    return [{"key": "device", "value": {"stringValue": device}}] if device else []
+
+
+class _Histogram:
+    """Histogram of one metric over the current flush interval."""
+
+    def __init__(self, start_nanos: int, bounds: tuple[float, ...]) -> None:
+        """Initialize an empty histogram starting at start_nanos."""
+        self.start_nanos = start_nanos
+        self.bounds = bounds
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float("inf")
+        self.maximum = float("-inf")
+        self.bucket_counts = [0] * (len(bounds) + 1)
+
+    def add(self, value: float) -> None:
+        """Add one sample."""
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        self.bucket_counts[bisect.bisect_left(self.bounds, value)] += 1
+
+    def data_point(self, end_nanos: int, device: str) -> dict[str, Any]:
+        """The histogram as an OTLP/JSON data point ending at end_nanos."""
+        return {
+            "attributes": _attributes(device),
+            "startTimeUnixNano": str(self.start_nanos),
+            "timeUnixNano": str(end_nanos),
+            "count": str(self.count),
+            "sum": self.total,
+            "min": self.minimum,
+            "max": self.maximum,
+            "bucketCounts": [str(c) for c in self.bucket_counts],
+            "explicitBounds": list(self.bounds),
+        }
+
+
+def _protobuf_encoder():
+    """The protobuf serializer, from the optional opentelemetry-proto package. Raises ValueError for a bad request."""
+    # pylint: disable=import-outside-toplevel
+    try:
+        from google.protobuf import json_format
+        from opentelemetry.proto.collector.metrics.v1.metrics_service_pb2 import ExportMetricsServiceRequest
+    except ImportError as error:
+        raise ImportError("encoding='protobuf' needs opentelemetry-proto: pip install sparkle-log[otlp]") from error
+
+    def serialize(request: dict[str, Any]) -> bytes:
+        try:
+            return json_format.ParseDict(request, ExportMetricsServiceRequest()).SerializeToString()
+        except json_format.Error as error:
+            raise ValueError(f"Cannot encode the OTLP request as protobuf: {error}") from error
+
+    return serialize
+
+
+class OtlpExporter:
+    """Sink batching samples into OTLP metric requests."""
+
+    def __init__(
+        self,
+        endpoint: str | None = None,
+        path: str | None = None,
+        encoding: str = "json",
+        flush_interval: float = 10.0,
+        max_buffered: int = 100,
+        bounds: tuple[float, ...] = DEFAULT_BOUNDS,
+        service_name: str = "sparkle_log",
+        timeout: float = 2.0,
+    ) -> None:
+        """
+        Initialize the exporter. Give exactly one of endpoint or path.
+
+        Args:
+            endpoint: OTLP/HTTP metrics URL, e.g. http://localhost:4318/v1/metrics.
+            path: File to append to, one JSON request per line or length-prefixed protobuf requests.
+            encoding: "json" or "protobuf".
+            flush_interval: Seconds between requests.
+            max_buffered: Most requests kept for retry while the destination fails.
+            bounds: Explicit bucket bounds of the histograms.
+            service_name: The service.name resource attribute.
+            timeout: Seconds to wait for the endpoint. A flush blocks the sampler thread at most this long per request.
+        """
+        if (endpoint is None) == (path is None):
+            raise ValueError("Give exactly one of endpoint or path")
+        if encoding not in ENCODINGS:
+            raise ValueError(f"encoding must be one of {', '.join(ENCODINGS)}")
+        self.endpoint = endpoint
+        self.path = path
+        self.encoding = encoding
+        self.flush_interval = flush_interval
+        self.bounds = bounds
+        self.service_name = service_name
+        self.timeout = timeout
+        self.exported_requests = 0
+        self.failed_exports = 0
+        self.dropped_requests = 0
+        self.buffer: deque[dict[str, Any]] = deque(maxlen=max_buffered)
+        self._serialize = _protobuf_encoder() if encoding == "protobuf" else None
+        self._gauges: dict[str, list[dict[str, Any]]] = {}
+        self._histograms: dict[str, _Histogram] = {}
+        self._batch_started: float | None = None
+        self._last_nanos = 0
+        # Guards the batch, the buffer and the counters: ticks and remove_sink() or the exit flush can come from
+        # different threads.
+        self._lock = Lock()
+        # Held while sending, so concurrent flushes do not send the same buffered request twice.
+        self._send_lock = Lock()
+
+    def on_tick(self, samples: dict[str, NumberType], at: float) -> None:
+        """Add one tick's samples to the batch, flushing when flush_interval has passed."""
+        nanos = int(at * 1e9)
+        with self._lock:
+            if self._batch_started is None:
+                self._batch_started = at
+            for name, value in samples.items():
+                if value is None:
+                    continue
+                _, _, device = name.partition(":")
+                self._gauges.setdefault(name, []).append(
+                    {"attributes": _attributes(device), "timeUnixNano": str(nanos), "asDouble": float(value)}
+                )
+                self._histograms.setdefault(name, _Histogram(self._last_nanos or nanos, self.bounds)).add(float(value))
+            self._last_nanos = nanos
+            due = at - self._batch_started >= self.flush_interval
+        if due:
+            self.flush()
+
+    def _request(
+        self, gauges: dict[str, list[dict[str, Any]]], histograms: dict[str, _Histogram], end_nanos: int
+    ) -> dict[str, Any]:
+        """A batch as an ExportMetricsServiceRequest in OTLP/JSON form."""
+        metrics: dict[str, dict[str, Any]] = {}
+        for name, points in gauges.items():
+            family, _, device = name.partition(":")
+            unit = UNITS.get(metric_unit(family).strip(), "1")
+            gauge = metrics.setdefault(family, {"name": family, "unit": unit, "gauge": {"dataPoints": []}})
+            gauge["gauge"]["dataPoints"].extend(points)
+            histogram = metrics.setdefault(
+                f"{family}.histogram",
+                {
+                    "name": f"{family}.histogram",
+                    "unit": unit,
+                    "histogram": {"aggregationTemporality": DELTA, "dataPoints": []},
+                },
+            )
+            histogram["histogram"]["dataPoints"].append(histograms[name].data_point(end_nanos, device))
+        return {
+            "resourceMetrics": [
+                {
+                    "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                    "scopeMetrics": [
+                        {"scope": {"name": "sparkle_log", "version": __version__}, "metrics": list(metrics.values())}
+                    ],
+                }
+            ]
+        }
+
+    def _encode(self, request: dict[str, Any]) -> bytes:
+        """One request as OTLP/JSON or protobuf bytes, raising ValueError if it cannot be encoded."""
+        if self._serialize is None:
+            return json.dumps(request, separators=(",", ":")).encode("utf-8")
+        return self._serialize(request)
+
+    def _send(self, payload: bytes) -> None:
+        """Write or post one encoded request, raising OSError on failure."""
+        if self.path is not None:
+            with open(self.path, "ab") as handle:
+                if self._serialize is None:
+                    handle.write(payload + b"\n")
+                else:
+                    handle.write(len(payload).to_bytes(4, "big") + payload)
+            return
+        http_request = urllib.request.Request(  # nosec
+            str(self.endpoint), data=payload, headers={"Content-Type": CONTENT_TYPES[self.encoding]}, method="POST"
+        )
+        with urllib.request.urlopen(http_request, timeout=self.timeout):  # nosec
+            pass
+
+    def flush(self) -> None:
+        """Turn the batch into a request and send it with any buffered ones, oldest first. Never raises."""
+        with self._lock:
+            gauges, histograms = self._gauges, self._histograms
+            self._gauges = {}
+            self._histograms = {}
+            self._batch_started = None
+            if gauges:
+                if len(self.buffer) == self.buffer.maxlen:
+                    self.dropped_requests += 1
+                self.buffer.append(self._request(gauges, histograms, self._last_nanos))
+        with self._send_lock:
+            while True:
+                with self._lock:
+                    if not self.buffer:
+                        return
+                    request = self.buffer[0]
+                try:
+                    payload = self._encode(request)
+                except ValueError:
+                    # It would fail the same way on every retry, so drop it rather than hold up the requests behind it.
+                    with self._lock:
+                        self._pop(request)
+                        self.dropped_requests += 1
+                    continue
+                try:
+                    self._send(payload)
+                # urllib's URLError and HTTPError are OSErrors too, ValueError is an unusable endpoint URL.
+                except (OSError, ValueError):
+                    with self._lock:
+                        self.failed_exports += 1
+                    return
+                with self._lock:
+                    self._pop(request)
+                    self.exported_requests += 1
+
+    def _pop(self, request: dict[str, Any]) -> None:
+        """Remove a request that was sent or dropped from the front of the buffer. Call with the lock held."""
+        # A tick may have pushed it out of the full buffer in the meantime.
+        if self.buffer and self.buffer[0] is request:
+            self.buffer.popleft()
+
+    def close(self) -> None:
+        """Flush what is left."""
+        self.flush()
+
+
+def open_otlp_exporter(endpoint: str | None = None, path: str | None = None, **kwargs) -> OtlpExporter:
+    """
+    Create an OtlpExporter and register it as a sink, see OtlpExporter for the options.
+
+    remove_sink() flushes it, and so does interpreter exit while it is still registered.
+    """
+    exporter = OtlpExporter(endpoint, path, **kwargs)
+    add_sink(exporter)
+    return exporter
@@ -0,0 +1,112 @@
+# sparkle_log/overhead.py
+"""
+What sparkle_log itself costs.
+
+Every tick times its phases (sampling per metric family, custom callbacks, stats, rendering and emitting log lines)
+with perf_counter_ns, and its CPU time with thread_time_ns. The scheduler adds how late each tick fired. Fetch the
+totals with get_overhead_counters(), or log them as the sparkle_log.overhead_* metrics.
+"""
+
+from __future__ import annotations
+
+import time
+from threading import Lock
+from typing import Any
+
+from sparkle_log.custom_types import NumberType
+
+OVERHEAD_METRICS = ("sparkle_log.overhead_tick_us", "sparkle_log.overhead_cpu_us", "sparkle_log.overhead_late_ms")
+
+
+class OverheadCounters:
+    """Cumulative and last-tick timings of sparkle_log's own work."""
+
+    def __init__(self) -> None:
+        """Initialize zeroed counters."""
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero every counter and restart the clock used for cpu_percent."""
+        with self._lock:
+            self.started_ns = time.perf_counter_ns()
+            self.ticks = 0
+            self.tick_ns_total = 0
+            self.tick_ns_last = 0
+            self.cpu_ns_total = 0
+            self.cpu_ns_last = 0
+            self.late_ns_last = 0
+            self.late_ns_max = 0
+            self.phases_ns: dict[str, int] = {}
+
+    def add_phase(self, phase: str, elapsed_ns: int) -> None:
+        """Add the wall time spent in one phase of a tick."""
+        with self._lock:
+            self.phases_ns[phase] = self.phases_ns.get(phase, 0) + elapsed_ns
+
+    def add_tick(self, wall_ns: int, cpu_ns: int) -> None:
+        """Record one whole tick, timed by the thread that ran it."""
+        with self._lock:
+            self.ticks += 1
+            self.tick_ns_total += wall_ns
+            self.tick_ns_last = wall_ns
+            self.cpu_ns_total += cpu_ns
+            self.cpu_ns_last = cpu_ns
+
+    def add_lateness(self, late_ns: int) -> None:
+        """Record how long after its deadline a tick started."""
+        late_ns = max(0, late_ns)
+        with self._lock:
+            self.late_ns_last = late_ns
+            self.late_ns_max = max(self.late_ns_max, late_ns)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Copy the counters.
+
+        Returns:
+            dict[str, Any]: ticks, tick_ns_total/last, cpu_ns_total/last, late_ms_last/max, phases_ns (total wall time
+            per phase) and cpu_percent, the CPU used by ticks as a percent of one core since the counters were reset.
+        """
+        with self._lock:
+            elapsed_ns = time.perf_counter_ns() - self.started_ns
+            return {
+                "ticks": self.ticks,
+                "tick_ns_total": self.tick_ns_total,
+                "tick_ns_last": self.tick_ns_last,
+                "cpu_ns_total": self.cpu_ns_total,
+                "cpu_ns_last": self.cpu_ns_last,
+                "cpu_percent": self.cpu_ns_total / elapsed_ns * 100 if elapsed_ns > 0 else 0.0,
+                "late_ms_last": self.late_ns_last / 1_000_000,
+                "late_ms_max": self.late_ns_max / 1_000_000,
+                "phases_ns": dict(self.phases_ns),
+            }
+
+    def sample(self, names: list[str]) -> dict[str, NumberType]:
+        """
+        Read the requested sparkle_log.overhead_* metrics.
+
+        Returns:
+            dict[str, NumberType]: Wall and CPU time of the previous tick in microseconds, and how late the current
+            tick started in milliseconds.
+        """
+        with self._lock:
+            values = {
+                "sparkle_log.overhead_tick_us": self.tick_ns_last / 1000,
+                "sparkle_log.overhead_cpu_us": self.cpu_ns_last / 1000,
+                "sparkle_log.overhead_late_ms": self.late_ns_last / 1_000_000,
+            }
+        return {name: values[name] for name in names}
+
+
+OVERHEAD = OverheadCounters()
+
+
+def get_overhead_counters() -> dict[str, Any]:
+    """Counters of sparkle_log's own overhead, see OverheadCounters.snapshot()."""
+    return OVERHEAD.snapshot()
+
+
+def reset_overhead_counters() -> None:
+    """Zero the overhead counters, e.g. at the start of a measurement window."""
+    OVERHEAD.reset()
@@ -0,0 +1,137 @@
+# sparkle_log/pressure.py
+"""
+Linux pressure stall information (PSI) and load average.
+
+CPU% cannot tell a busy but healthy machine from one where work is queueing. PSI reports the share of time in which
+at least one task was stalled waiting for CPU, memory or I/O.
+"""
+
+from __future__ import annotations
+
+import os
+from threading import Lock
+
+import psutil
+
+from sparkle_log.cgroup import PreadFile, get_cgroup_sampler
+from sparkle_log.custom_types import NumberType
+
+PRESSURE_METRICS = ("cpu_pressure", "memory_pressure", "io_pressure", "loadavg")
+
+PROC_PRESSURE = "/proc/pressure"
+PROC_LOADAVG = "/proc/loadavg"
+
+
+def parse_pressure(text: str, line: str = "some", field: str = "avg10") -> float | None:
+    """
+    Read one field from a PSI file.
+
+    Args:
+        text: Contents such as "some avg10=1.65 avg60=2.22 avg300=1.64 total=11107432".
+        line: "some" (at least one task stalled) or "full" (all non-idle tasks stalled).
+        field: avg10, avg60 or avg300.
+
+    Returns:
+        float | None: The stall percentage, None if not present.
+    """
+    for row in text.splitlines():
+        kind, _, rest = row.partition(" ")
+        if kind != line:
+            continue
+        for pair in rest.split():
+            key, _, value = pair.partition("=")
+            if key == field:
+                return float(value)
+    return None
+
+
+class PressureSampler:
+    """Sample PSI and load average, preferring the cgroup's own PSI files over the system wide ones."""
+
+    def __init__(
+        self, cgroup_dir: str | None = None, proc_pressure: str = PROC_PRESSURE, proc_loadavg: str = PROC_LOADAVG
+    ) -> None:
+        """Initialize the sampler. Files are opened on first use and kept open."""
+        self.cgroup_dir = cgroup_dir
+        self.proc_pressure = proc_pressure
+        self.proc_loadavg = proc_loadavg
+        self._files: dict[str, PreadFile | None] = {}
+        self._lock = Lock()
+
+    def _open(self, resource: str) -> PreadFile | None:
+        """Open the PSI file for cpu, memory or io. None if this kernel has no PSI."""
+        candidates = [os.path.join(self.proc_pressure, resource)]
+        if self.cgroup_dir:
+            candidates.insert(0, os.path.join(self.cgroup_dir, f"{resource}.pressure"))
+        for path in candidates:
+            try:
+                return PreadFile(path)
+            except OSError:
+                continue
+        return None
+
+    def _pressure(self, resource: str) -> float | None:
+        """Current avg10 'some' stall percentage for a resource."""
+        if resource not in self._files:
+            self._files[resource] = self._open(resource)
+        handle = self._files[resource]
+        if handle is None:
+            return None
+        try:
+            return parse_pressure(handle.read())
+        except OSError:
+            # Reading PSI fails with EOPNOTSUPP when it was compiled in but disabled with psi=0.
+            handle.close()
+            self._files[resource] = None
+            return None
+
+    def sample(self, names: list[str]) -> dict[str, NumberType]:
+        """
+        Read the requested pressure metrics.
+
+        Returns:
+            dict[str, NumberType]: *_pressure is the % of the last 10 seconds in which some task stalled, loadavg is
+            the 1 minute load average as % of the CPU count. None when not available.
+        """
+        readings: dict[str, NumberType] = {}
+        with self._lock:
+            for name in names:
+                if name == "loadavg":
+                    readings[name] = self._load_percent()
+                else:
+                    readings[name] = self._pressure(name.removesuffix("_pressure"))
+        return readings
+
+    def _load_percent(self) -> float | None:
+        """One minute load average as a percent of logical CPUs, so 100 means every CPU has a runnable task."""
+        if "loadavg" not in self._files:
+            try:
+                self._files["loadavg"] = PreadFile(self.proc_loadavg)
+            except OSError:
+                self._files["loadavg"] = None
+        handle = self._files["loadavg"]
+        try:
+            # psutil emulates the load average on Windows.
+            one_minute = float(handle.read().split()[0]) if handle else psutil.getloadavg()[0]
+        except (OSError, ValueError, IndexError, AttributeError):
+            return None
+        return one_minute / (psutil.cpu_count() or 1) * 100
+
+    def close(self) -> None:
+        """Close all open PSI files."""
+        with self._lock:
+            for handle in self._files.values():
+                if handle:
+                    handle.close()
+            self._files.clear()
+
+
+_SAMPLER: PressureSampler | None = None
+
+
+def get_pressure_sampler() -> PressureSampler:
+    """Return the pressure sampler, scoped to this process's cgroup when it has PSI files."""
+    global _SAMPLER  # pylint: disable=global-statement
+    if _SAMPLER is None:
+        _SAMPLER = PressureSampler(get_cgroup_sampler().cgroup_dir)
+    return _SAMPLER
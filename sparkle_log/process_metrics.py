@@ -0,0 +1,171 @@
+# sparkle_log/process_metrics.py
+"""
+Resource metrics for a single process (by default, this one) and optionally its child process tree.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Any
+
+import psutil
+
+from sparkle_log.custom_types import NumberType
+
+PROCESS_METRICS = (
+    "process_cpu",
+    "process_rss",
+    "process_threads",
+    "process_fds",
+    "process_ctx_switches",
+)
+
+
+class ProcessSampler:
+    """
+    Sample a process with a cached psutil.Process handle, batching reads inside oneshot().
+
+    Child processes are discovered with process.children(recursive=True), which walks the whole process table, so
+    discovery is cached and only refreshed every children_refresh_seconds. Child handles are kept between refreshes
+    because psutil's cpu_percent(interval=None) measures against the previous call on the same handle.
+    """
+
+    def __init__(
+        self, pid: int | None = None, include_children: bool = False, children_refresh_seconds: float = 30.0
+    ) -> None:
+        """Initialize the sampler. A pid of None means the current process."""
+        self.pid = pid
+        self.include_children = include_children
+        self.children_refresh_seconds = children_refresh_seconds
+        self._process: psutil.Process | None = None
+        self._children: dict[int, psutil.Process] = {}
+        self._children_refreshed_at: float | None = None
+        self._last_ctx_switches: int | None = None
+        self._last_sampled_at: float | None = None
+
+    def _handle(self) -> psutil.Process:
+        """Return the cached process handle, creating it on first use (or after a fork, for the current process)."""
+        if self._process is None or (self.pid is None and self._process.pid != os.getpid()):
+            self._process = psutil.Process(self.pid)
+            self._children = {}
+            self._children_refreshed_at = None
+            self._last_ctx_switches = None
+            self._last_sampled_at = None
+        return self._process
+
+    def _current_children(self, process: psutil.Process, now: float) -> list[psutil.Process]:
+        """Return the child handles, rediscovering them only when the refresh interval has elapsed."""
+        if self._children_refreshed_at is None or now - self._children_refreshed_at >= self.children_refresh_seconds:
+            try:
+                found = process.children(recursive=True)
+            except psutil.Error:
+                found = []
+            # Keep the existing handle for a pid we already know so cpu_percent deltas stay continuous.
+            self._children = {child.pid: self._children.get(child.pid, child) for child in found}
+            self._children_refreshed_at = now
+        return list(self._children.values())
+
+    def is_running(self) -> bool:
+        """Return True if the monitored process still exists and is not a zombie."""
+        try:
+            process = self._handle()
+            return process.is_running() and process.status() != psutil.STATUS_ZOMBIE
+        except psutil.Error:
+            return False
+
+    def sample(self) -> dict[str, NumberType]:
+        """
+        Read all process metrics at once.
+
+        Returns:
+            dict[str, NumberType]: A reading for each name in PROCESS_METRICS, None when it could not be read.
+        """
+        readings: dict[str, NumberType] = dict.fromkeys(PROCESS_METRICS)
+        now = time.monotonic()
+        try:
+            process = self._handle()
+            totals = _read_process(process)
+        except psutil.Error:
+            return readings
+
+        if self.include_children:
+            for child in self._current_children(process, now):
+                try:
+                    child_totals = _read_process(child)
+                except psutil.Error:
+                    # Exited since discovery, drop it until the next refresh finds the survivors.
+                    self._children.pop(child.pid, None)
+                    continue
+                for key, value in child_totals.items():
+                    if value is not None:
+                        totals[key] = (totals[key] or 0) + value
+
+        readings["process_cpu"] = totals["cpu"]
+        readings["process_rss"] = None if totals["rss"] is None else totals["rss"] / (1024**2)
+        readings["process_threads"] = totals["threads"]
+        readings["process_fds"] = totals["fds"]
+
+        ctx_switches = totals["ctx_switches"]
+        if ctx_switches is not None and self._last_ctx_switches is not None and self._last_sampled_at is not None:
+            elapsed = now - self._last_sampled_at
+            delta = ctx_switches - self._last_ctx_switches
+            # Children leaving the tree can make the aggregate go backwards; that is not a negative rate.
+            if elapsed > 0 and delta >= 0:
+                readings["process_ctx_switches"] = delta / elapsed
+        self._last_ctx_switches = None if ctx_switches is None else int(ctx_switches)
+        self._last_sampled_at = now
+        return readings
+
+
+def _read_process(process: psutil.Process) -> dict[str, Any]:
+    """Read the raw counters for one process in a single oneshot() batch."""
+    with process.oneshot():
+        cpu = process.cpu_percent(interval=None)
+        rss = process.memory_info().rss
+        threads = process.num_threads()
+        ctx = process.num_ctx_switches()
+        try:
+            if hasattr(process, "num_fds"):
+                fds = process.num_fds()
+            else:  # Windows has handles, not file descriptors.
+                fds = process.num_handles()  # type: ignore[attr-defined]
+        except psutil.AccessDenied:
+            fds = None
+    return {
+        "cpu": cpu,
+        "rss": rss,
+        "threads": threads,
+        "fds": fds,
+        "ctx_switches": ctx.voluntary + ctx.involuntary,
+    }
+
+
+_SAMPLER: ProcessSampler | None = None
+
+
+def configure_process_metrics(
+    pid: int | None = None, include_children: bool = False, children_refresh_seconds: float = 30.0
+) -> ProcessSampler:
+    """
+    Choose which process the process_* metrics follow.
+
+    Args:
+        pid: Process to monitor, None for the current process.
+        include_children: Add the child process tree (e.g. multiprocessing workers) to the totals.
+        children_refresh_seconds: How often to rediscover child processes.
+
+    Returns:
+        ProcessSampler: The sampler now used by the process_* metrics.
+    """
+    global _SAMPLER  # pylint: disable=global-statement
+    _SAMPLER = ProcessSampler(pid, include_children, children_refresh_seconds)
+    return _SAMPLER
+
+
+def get_process_sampler() -> ProcessSampler:
+    """Return the sampler used by the process_* metrics, creating a default one for the current process."""
+    global _SAMPLER  # pylint: disable=global-statement
+    if _SAMPLER is None:
+        _SAMPLER = ProcessSampler()
+    return _SAMPLER
@@ -0,0 +1,135 @@
+# sparkle_log/process_monitor.py
+"""
+Monitor another process from the outside, until it exits. Used by the `run` and `attach` CLI subcommands.
+"""
+
+from __future__ import annotations
+
+import subprocess  # nosec
+import sys
+from typing import Callable, Sequence
+
+import psutil
+
+from sparkle_log.custom_types import GraphStyle, Metrics
+from sparkle_log.dashboard import LiveDashboard
+from sparkle_log.graphs import GLOBAL_LOGGER
+from sparkle_log.log_writer import collect_system_metrics, log_system_metrics, snapshot_readings
+from sparkle_log.process_metrics import configure_process_metrics
+from sparkle_log.summary import RunSummary
+
+
+def monitor_until_exit(
+    wait_for_exit: Callable[[float], bool],
+    metrics: tuple[Metrics, ...],
+    interval: float,
+    style: GraphStyle = "bar",
+    dashboard: LiveDashboard | None = None,
+) -> RunSummary:
+    """
+    Log metrics every interval until wait_for_exit reports the process is gone, then log a whole-run summary.
+
+    Args:
+        wait_for_exit: Waits up to the given number of seconds, returns True once the process has exited.
+        metrics: Metrics to log.
+        interval: Seconds between samples.
+        style: The style of the sparkline.
+        dashboard: Draw metrics on this live dashboard instead of writing a log line per metric.
+
+    Returns:
+        RunSummary: Aggregates for the whole run.
+    """
+    summary = RunSummary()
+    try:
+        while True:
+            if dashboard:
+                summary.update(collect_system_metrics(metrics))
+                dashboard.update(snapshot_readings(metrics))
+            else:
+                summary.update(log_system_metrics(metrics, style))
+            if wait_for_exit(interval):
+                break
+    finally:
+        if dashboard:
+            dashboard.update(snapshot_readings(metrics), force=True)
+            dashboard.close()
+        for line in summary.format_lines():
+            GLOBAL_LOGGER.info(line)
+    return summary
+
+
+def run_command(
+    command: Sequence[str],
+    metrics: tuple[Metrics, ...],
+    interval: float,
+    style: GraphStyle = "bar",
+    include_children: bool = False,
+    dashboard: LiveDashboard | None = None,
+) -> int:
+    """
+    Launch a command and monitor it until it exits.
+
+    Returns:
+        int: The exit code of the command, or the shell's 127 when it is not found and 126 when it cannot be run.
+    """
+    try:
+        process = subprocess.Popen(list(command))  # nosec
+    except FileNotFoundError:
+        print(f"sparkle_log run: command not found: {command[0]}", file=sys.stderr)
+        return 127
+    except OSError as error:
+        print(f"sparkle_log run: cannot run {command[0]}: {error.strerror or error}", file=sys.stderr)
+        return 126
+    configure_process_metrics(pid=process.pid, include_children=include_children)
+
+    def exited(timeout: float) -> bool:
+        """Wait for the command, True once it has exited."""
+        try:
+            process.wait(timeout=timeout)
+            return True
+        except subprocess.TimeoutExpired:
+            return False
+
+    try:
+        monitor_until_exit(exited, metrics, interval, style, dashboard)
+    except KeyboardInterrupt:
+        # The command shares our terminal, so it got the same Ctrl+C. Let it finish shutting down.
+        process.wait()
+    return process.returncode
+
+
+def attach_process(
+    pid: int,
+    metrics: tuple[Metrics, ...],
+    interval: float,
+    style: GraphStyle = "bar",
+    include_children: bool = False,
+    dashboard: LiveDashboard | None = None,
+) -> int:
+    """
+    Monitor an already running process until it exits.
+
+    Returns:
+        int: 0 when the process was monitored to completion, 1 if it does not exist.
+    """
+    try:
+        target = psutil.Process(pid)
+    except psutil.NoSuchProcess:
+        GLOBAL_LOGGER.error(f"No process with pid {pid}")
+        return 1
+    configure_process_metrics(pid=pid, include_children=include_children)
+
+    def exited(timeout: float) -> bool:
+        """Wait for the process, True once it has exited."""
+        try:
+            target.wait(timeout=timeout)
+            return True
+        except psutil.TimeoutExpired:
+            return False
+
+    try:
+        monitor_until_exit(exited, metrics, interval, style, dashboard)
+    except KeyboardInterrupt:
+        # Detaching leaves the target running.
+        pass
+    return 0
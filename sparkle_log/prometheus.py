@@ -0,0 +1,170 @@
+# sparkle_log/prometheus.py
+"""
+Prometheus scrape endpoint.
+
+An embedded HTTP server thread serves the current value and the window min, mean and max of every metric in OpenMetrics
+text format. The body is built on the first scrape after a sampling tick and cached, so any number of scrapes per tick
+cost one build.
+"""
+
+from __future__ import annotations
+
+import re
+import statistics
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sparkle_log.custom_types import NumberType
+from sparkle_log.log_writer import snapshot_readings
+from sparkle_log.sinks import add_sink, remove_sink
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PREFIX = "sparkle_log_"
+
+
+def metric_family(name: str) -> tuple[str, str]:
+    """
+    Prometheus family name and label set of a metric. Per-device metrics like net_rx:eth0 become a device label.
+
+    Returns:
+        tuple[str, str]: e.g. ("sparkle_log_net_rx", 'device="eth0",').
+    """
+    family, _, device = name.partition(":")
+    family = PREFIX + re.sub(r"[^a-zA-Z0-9_]", "_", family)
+    if not device:
+        return family, ""
+    escaped = device.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return family, f'device="{escaped}",'
+
+
+def format_value(value: int | float) -> str:
+    """A sample value in full precision. {:g} would round large counters like bytes per second to 6 digits."""
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def format_openmetrics(windows: dict[str, list[NumberType]]) -> str:
+    """OpenMetrics text for the current value and window min, mean and max of each metric."""
+    families: dict[str, list[str]] = {}
+    for name, series in windows.items():
+        values = [v for v in series if v is not None]
+        if not values:
+            continue
+        family, labels = metric_family(name)
+        current = series[-1]
+        stats = {"min": min(values), "mean": statistics.mean(values), "max": max(values)}
+        if current is not None:
+            stats = {"current": current, **stats}
+        lines = families.setdefault(family, [])
+        lines.extend(f'{family}{{{labels}stat="{stat}"}} {format_value(value)}' for stat, value in stats.items())
+    body = []
+    for family, lines in families.items():
+        body.append(f"# TYPE {family} gauge")
+        body.extend(lines)
+    body.append("# EOF")
+    return "\n".join(body) + "\n"
+
+
+class _ScrapeHandler(BaseHTTPRequestHandler):
+    """Serve the exporter's cached body on /metrics."""
+
+    server: _ExporterServer
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Handle a scrape."""
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.exporter.body()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:  # pylint: disable=redefined-builtin
+        """Scrapes are not worth a log line."""
+
+
+class _ExporterServer(ThreadingHTTPServer):
+    """HTTP server that knows its exporter."""
+
+    daemon_threads = True
+    exporter: PrometheusExporter
+
+
+class PrometheusExporter:
+    """Sink serving the metric windows to Prometheus scrapers."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9464) -> None:
+        """
+        Bind the server, call start() to serve.
+
+        Args:
+            host: Interface to listen on. The default only accepts scrapes from this host.
+            port: Port to listen on, 0 picks a free one.
+        """
+        self.names: dict[str, None] = {}
+        self.builds = 0
+        self.scrapes = 0
+        self._body = format_openmetrics({}).encode("utf-8")
+        self._stale = False
+        self._lock = threading.Lock()
+        self._server = _ExporterServer((host, port), _ScrapeHandler)
+        self._server.exporter = self
+        self._thread: threading.Thread | None = None
+
+    @property
+    def port(self) -> int:
+        """The port the server listens on."""
+        return self._server.server_address[1]
+
+    def start(self) -> PrometheusExporter:
+        """Serve scrapes on a daemon thread. Returns self."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, name="sparkle_log.prometheus", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def on_tick(self, samples: dict[str, NumberType], at: float) -> None:
+        """Mark the cached body stale, it is rebuilt on the next scrape."""
+        with self._lock:
+            for name in samples:
+                self.names.setdefault(name, None)
+            self._stale = True
+
+    def body(self) -> bytes:
+        """The OpenMetrics body, rebuilt at most once per tick."""
+        with self._lock:
+            self.scrapes += 1
+            if self._stale:
+                self._body = format_openmetrics(snapshot_readings(tuple(self.names))).encode("utf-8")
+                self._stale = False
+                self.builds += 1
+            return self._body
+
+    def close(self) -> None:
+        """Stop serving and release the port."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+
+def start_prometheus_exporter(host: str = "127.0.0.1", port: int = 9464) -> PrometheusExporter:
+    """
+    Serve every metric at http://host:port/metrics until stopped with stop_prometheus_exporter().
+
+    Returns:
+        PrometheusExporter: The running exporter, also registered as a sink.
+    """
+    exporter = PrometheusExporter(host, port).start()
+    add_sink(exporter)
+    return exporter
+
+
+def stop_prometheus_exporter(exporter: PrometheusExporter) -> None:
+    """Stop the exporter and unregister it."""
+    remove_sink(exporter)
@@ -0,0 +1,227 @@
+# sparkle_log/python_memory.py
+"""
+Python heap and garbage collector metrics.
+
+py_heap is the memory traced by tracemalloc, which only counts Python allocations, so allocation churn shows up even
+when it is lost in system memory%. Tracing slows allocations down, more so with deeper stacks, so it is started on
+first use with a configurable frame depth and can be turned off. GC pauses are timed from gc.callbacks, in
+microseconds as a young generation collection usually takes well under a millisecond.
+
+Both are undone when the last monitoring run using these metrics stops: tracemalloc is stopped if sparkle_log started
+it, and the gc.callbacks hook is removed. tracemalloc's peak is never reset, other users of tracemalloc keep theirs.
+"""
+
+from __future__ import annotations
+
+import gc
+import time
+import tracemalloc
+from threading import Lock
+from typing import Any
+
+from sparkle_log.custom_types import NumberType
+from sparkle_log.graphs import GLOBAL_LOGGER
+
+PY_HEAP_METRICS = ("py_heap", "py_heap_peak")
+GC_METRICS = ("gc_pause_us", "gc_collections")
+
+_MB = 1024 * 1024
+
+
+class HeapSampler:
+    """Sample tracemalloc's traced memory, logging the top allocating lines when the heap grows past a threshold."""
+
+    def __init__(
+        self, frames: int = 1, enabled: bool = True, growth_threshold_mb: float | None = None, top_lines: int = 10
+    ) -> None:
+        """
+        Initialize the sampler. tracemalloc is started on the first sample.
+
+        Args:
+            frames: Stack depth tracemalloc records per allocation. 1 is enough for top lines and costs least.
+            enabled: False leaves tracemalloc alone and reports py_heap as None.
+            growth_threshold_mb: Log a snapshot of the top allocating lines each time the heap exceeds its previous
+                high-water mark by this much. None to never snapshot.
+            top_lines: Number of lines in a snapshot.
+        """
+        self.frames = frames
+        self.enabled = enabled
+        self.growth_threshold_mb = growth_threshold_mb
+        self.top_lines = top_lines
+        self.high_water_mb: float | None = None
+        self.started_tracing = False
+        self._last_current = 0
+        self._last_peak = 0
+        self._lock = Lock()
+
+    def sample(self, names: list[str]) -> dict[str, NumberType]:
+        """
+        Read the requested py_heap metrics.
+
+        Returns:
+            dict[str, NumberType]: py_heap is the traced memory in MB, py_heap_peak the highest traced memory in MB
+            since the previous sample. None when disabled.
+        """
+        if not self.enabled:
+            return dict.fromkeys(names)
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                self.started_tracing = True
+                self._last_current = self._last_peak = 0
+            current, peak = tracemalloc.get_traced_memory()
+            # tracemalloc's peak is since tracing started. When it moved, the new peak was reached since the previous
+            # sample. When it did not, the highest reading seen at either end of the interval is the best we know.
+            interval_peak = peak if peak > self._last_peak else max(current, self._last_current)
+            self._last_current, self._last_peak = current, peak
+            current_mb = current / _MB
+            self._check_growth(current_mb)
+        values = {"py_heap": current_mb, "py_heap_peak": interval_peak / _MB}
+        return {name: values[name] for name in names}
+
+    def _check_growth(self, current_mb: float) -> None:
+        """Log the top allocating lines when the heap passes the high-water mark by the threshold."""
+        if self.high_water_mb is None:
+            self.high_water_mb = current_mb
+            return
+        if self.growth_threshold_mb is None or current_mb - self.high_water_mb < self.growth_threshold_mb:
+            return
+        self.high_water_mb = current_mb
+        for line in top_allocations(self.top_lines):
+            GLOBAL_LOGGER.info(line)
+
+    def stop(self) -> None:
+        """Stop tracemalloc if this sampler started it."""
+        with self._lock:
+            if self.started_tracing and tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self.started_tracing = False
+            self.high_water_mb = None
+
+
+def top_allocations(limit: int = 10) -> list[str]:
+    """
+    Describe the lines holding the most traced memory.
+
+    Returns:
+        list[str]: A header line and one line per source line, empty when tracemalloc is not tracing.
+    """
+    if not tracemalloc.is_tracing():
+        return []
+    statistics = tracemalloc.take_snapshot().statistics("lineno")
+    current_mb = tracemalloc.get_traced_memory()[0] / _MB
+    lines = [f"py_heap high-water {current_mb:.1f} MB, top allocating lines:"]
+    for stat in statistics[:limit]:
+        frame = stat.traceback[0]
+        lines.append(f"  {frame.filename}:{frame.lineno}: {stat.size / 1024:.1f} KB in {stat.count} blocks")
+    return lines
+
+
+class GCTracker:
+    """Count collections and time GC pauses with a gc.callbacks hook, installed on first use."""
+
+    def __init__(self) -> None:
+        """Initialize the tracker, nothing is hooked until install()."""
+        self.installed = False
+        self._started_ns = 0
+        self._pause_ns = 0
+        self._collections = 0
+        self._lock = Lock()
+
+    def _callback(self, phase: str, _info: dict[str, Any]) -> None:
+        """gc.callbacks hook. Runs inside the collection, so it only does clock reads and additions."""
+        if phase == "start":
+            self._started_ns = time.perf_counter_ns()
+        elif phase == "stop" and self._started_ns:
+            self._pause_ns += time.perf_counter_ns() - self._started_ns
+            self._collections += 1
+            self._started_ns = 0
+
+    def install(self) -> None:
+        """Add the hook to gc.callbacks."""
+        with self._lock:
+            if not self.installed:
+                gc.callbacks.append(self._callback)
+                self.installed = True
+
+    def uninstall(self) -> None:
+        """Remove the hook from gc.callbacks."""
+        with self._lock:
+            if self.installed:
+                gc.callbacks.remove(self._callback)
+                self.installed = False
+
+    def sample(self, names: list[str]) -> dict[str, NumberType]:
+        """
+        Read the requested GC metrics, installing the hook on first use.
+
+        Returns:
+            dict[str, NumberType]: gc_pause_us is the total GC pause and gc_collections the number of collections
+            since the previous sample. None on the first sample, before anything was measured.
+        """
+        if not self.installed:
+            self.install()
+            return dict.fromkeys(names)
+        with self._lock:
+            pause_ns, self._pause_ns = self._pause_ns, 0
+            collections, self._collections = self._collections, 0
+        values = {"gc_pause_us": pause_ns / 1000, "gc_collections": collections}
+        return {name: values[name] for name in names}
+
+
+_HEAP_SAMPLER: HeapSampler | None = None
+GC_TRACKER = GCTracker()
+# Monitoring runs currently sampling py_heap or GC metrics.
+_RUNS = 0
+_RUNS_LOCK = Lock()
+
+
+def acquire_python_metrics(metrics: tuple[str, ...]) -> bool:
+    """
+    Note a monitoring run starting, see release_python_metrics().
+
+    Returns:
+        bool: Whether the run samples any py_heap or GC metric and must call release_python_metrics() when it stops.
+    """
+    global _RUNS  # pylint: disable=global-statement
+    if not any(m in PY_HEAP_METRICS or m in GC_METRICS for m in metrics):
+        return False
+    with _RUNS_LOCK:
+        _RUNS += 1
+    return True
+
+
+def release_python_metrics() -> None:
+    """Note a run from acquire_python_metrics() stopping. The last one stops tracemalloc and removes the GC hook."""
+    global _RUNS  # pylint: disable=global-statement
+    with _RUNS_LOCK:
+        _RUNS = max(0, _RUNS - 1)
+        if _RUNS:
+            return
+        if _HEAP_SAMPLER is not None:
+            _HEAP_SAMPLER.stop()
+        GC_TRACKER.uninstall()
+
+
+def configure_python_memory(
+    frames: int = 1, enabled: bool = True, growth_threshold_mb: float | None = None, top_lines: int = 10
+) -> HeapSampler:
+    """
+    Configure the py_heap metrics, see HeapSampler. Stops tracemalloc if the previous sampler started it.
+
+    Returns:
+        HeapSampler: The sampler now used by the py_heap metrics.
+    """
+    global _HEAP_SAMPLER  # pylint: disable=global-statement
+    if _HEAP_SAMPLER is not None:
+        _HEAP_SAMPLER.stop()
+    _HEAP_SAMPLER = HeapSampler(frames, enabled, growth_threshold_mb, top_lines)
+    return _HEAP_SAMPLER
+
+
+def get_heap_sampler() -> HeapSampler:
+    """Return the sampler used by the py_heap metrics, creating a default one."""
+    global _HEAP_SAMPLER  # pylint: disable=global-statement
+    if _HEAP_SAMPLER is None:
+        _HEAP_SAMPLER = HeapSampler()
+    return _HEAP_SAMPLER
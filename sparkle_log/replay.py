@@ -0,0 +1,222 @@
+# sparkle_log/replay.py
+"""
+Offline rendering of recorded samples: CSV, JSON lines, store files (see sparkle_log.store) and sparkle_log's own log
+lines, parsed back into samples.
+
+Everything is a generator pipeline over buffered reads, one sample at a time into streaming summaries, so memory does
+not grow with the size of the input.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import math
+import os
+import re
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+
+from sparkle_log.custom_types import GraphStyle, NumberType
+from sparkle_log.log_writer import METRIC_UNIT_SUFFIXES, METRIC_UNITS
+from sparkle_log.store import SUFFIX, read_store
+from sparkle_log.summary import SUMMARY_PERCENTILES, RunSummary
+
+# A recorded sample: wall clock time (None if the input has none), metric name, value.
+Sample = tuple[float | None, str, NumberType]
+
+FORMATS = ("csv", "jsonl", "store", "log")
+TIME_FIELDS = ("time", "timestamp", "at", "ts")
+READ_BUFFER = 1024 * 1024
+
+_ANSI = re.compile(r"\x1b\[[0-9;]*m")
+_LOG_PREFIX = re.compile(
+    r"^(?:(?P<time>\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d(?:[,.]\d+)?)\s+)?"
+    r"(?:(?:DEBUG|INFO|WARNING|ERROR|CRITICAL)(?::[\w.]+:|\s+))?(?P<message>.*)$"
+)
+_VALUE = r"(?P<value>-?\d+(?:\.\d+)?)(?: (?P<rate>[KMG]?B)/s)?"
+# Labels may hold a device, e.g. net_rx:eth0.
+_METRIC_LINE = re.compile(r"^(?P<label>[\w.:]+?)\s*:\s*" + _VALUE + r".*\| min, mean, max \(")
+# Units written after a value, longest first. Byte rates are matched by _VALUE.
+_UNIT = "|".join(
+    re.escape(unit)
+    for unit in sorted(
+        {"%", *METRIC_UNITS.values(), *METRIC_UNIT_SUFFIXES.values()} - {"", "B/s"}, key=len, reverse=True
+    )
+)
+# A whole field of a combined line: label, value with its unit or "-" for a failed reading, then a sparkline. No
+# sparkline style uses lowercase letters, which keeps words in ordinary log lines from passing as one.
+_COMBINED_FIELD = re.compile(
+    r"^(?P<label>[\w.:]+)\s+(?:" + _VALUE + r"(?:" + _UNIT + r")?|-) (?P<graph>[^a-z]*\S[^a-z]*)$"
+)
+_LABELS = {"CPU": "cpu", "Memory": "memory", "Drive": "drive", "mem": "memory"}
+_RATE_SCALE = {"B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3}
+
+
+def parse_time(text: str | float | int) -> float:
+    """Seconds since the epoch from a number or an ISO 8601 date and time, e.g. 2026-10-19 12:00:00,123."""
+    if isinstance(text, (int, float)):
+        return float(text)
+    try:
+        return float(text)
+    except ValueError:
+        return datetime.fromisoformat(text.strip().replace(",", ".")).timestamp()
+
+
+def _number(value: object) -> NumberType:
+    """A sample value from CSV or JSON, None for empty or non-numeric values."""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = float(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(number):
+        return None
+    return int(number) if number.is_integer() else number
+
+
+def _time_field(names: Iterable[str]) -> str | None:
+    """The field holding the time, if any."""
+    return next((name for name in names if name.lower() in TIME_FIELDS), None)
+
+
+def _records(row: dict, time_field: str | None) -> Iterator[Sample]:
+    """Samples of one CSV row or JSON object, in long (metric, value) or wide (one field per metric) form."""
+    at = parse_time(row[time_field]) if time_field and row.get(time_field) not in (None, "") else None
+    name = row.get("metric", row.get("name"))
+    if name is not None and "value" in row:
+        yield at, str(name), _number(row["value"])
+        return
+    for field, value in row.items():
+        if field != time_field:
+            yield at, field, _number(value)
+
+
+def iter_csv(path: str) -> Iterator[Sample]:
+    """Samples from a CSV file with a header row, long (time, metric, value) or wide (time, cpu, memory, ...)."""
+    with open(path, encoding="utf-8", newline="", buffering=READ_BUFFER) as handle:
+        reader = csv.DictReader(handle)
+        time_field = _time_field(reader.fieldnames or ())
+        for row in reader:
+            yield from _records(row, time_field)
+
+
+def iter_jsonl(path: str) -> Iterator[Sample]:
+    """Samples from JSON lines, one object per line in long or wide form as for CSV."""
+    with open(path, encoding="utf-8", buffering=READ_BUFFER) as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            yield from _records(row, _time_field(row))
+
+
+def parse_log_line(line: str) -> tuple[float | None, dict[str, NumberType]]:
+    """
+    Parse one of sparkle_log's own metric lines, per-metric or combined, back into samples.
+
+    A line is only taken as a combined line when every field has the combined layout, so other log lines that happen to
+    start with a word and a number are not mistaken for samples. Failed readings, shown as "-", are skipped.
+
+    Returns:
+        tuple[float | None, dict[str, NumberType]]: The time from the line's timestamp, if any, and the current value
+        of each metric on it. No metrics if it is not a metric line.
+    """
+    prefix = _LOG_PREFIX.match(_ANSI.sub("", line.rstrip("\r\n")))
+    if not prefix:
+        return None, {}
+    at = parse_time(prefix["time"]) if prefix["time"] else None
+    message = prefix["message"].strip()
+    single = _METRIC_LINE.match(message)
+    matches = [single] if single else [_COMBINED_FIELD.match(field) for field in message.split(" | ")]
+    samples: dict[str, NumberType] = {}
+    for match in matches:
+        if match is None:
+            return at, {}
+        if match["value"] is None:
+            continue
+        value = float(match["value"]) * _RATE_SCALE[match["rate"]] if match["rate"] else float(match["value"])
+        samples[_LABELS.get(match["label"], match["label"])] = int(value) if value.is_integer() else value
+    return at, samples
+
+
+def iter_log(path: str) -> Iterator[Sample]:
+    """Samples parsed back from a log file written by sparkle_log, other lines are skipped."""
+    with open(path, encoding="utf-8", errors="replace", buffering=READ_BUFFER) as handle:
+        for line in handle:
+            at, samples = parse_log_line(line)
+            for name, value in samples.items():
+                yield at, name, value
+
+
+def detect_format(path: str) -> str:
+    """Guess the input format from the file extension, defaulting to log."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    if extension == SUFFIX:
+        return "store"
+    return "log"
+
+
+def read_samples(path: str, input_format: str | None = None) -> Iterator[Sample]:
+    """
+    Stream the samples of a recorded file.
+
+    Args:
+        path: The file.
+        input_format: One of FORMATS, guessed from the extension if None.
+    """
+    input_format = input_format or detect_format(path)
+    if input_format == "csv":
+        return iter_csv(path)
+    if input_format == "jsonl":
+        return iter_jsonl(path)
+    if input_format == "store":
+        return iter(read_store(path))
+    if input_format == "log":
+        return iter_log(path)
+    raise ValueError(f"Unknown format {input_format}, expected one of {', '.join(FORMATS)}")
+
+
+def render_samples(
+    samples: Iterable[Sample],
+    metrics: tuple[str, ...] = (),
+    start: float | None = None,
+    end: float | None = None,
+    style: GraphStyle = "bar",
+    percentiles: tuple[float, ...] = SUMMARY_PERCENTILES,
+    points: int = 30,
+) -> list[str]:
+    """
+    Summarize recorded samples as one line per metric: count, min, mean, max, percentiles and a downsampled sparkline.
+
+    Args:
+        samples: The samples, e.g. from read_samples().
+        metrics: Only these metrics, all if empty.
+        start: Skip samples before this time. Samples without a time are skipped when start or end is given.
+        end: Skip samples after this time.
+        style: Graph style of the sparklines.
+        percentiles: Percentiles to show.
+        points: Width of the sparklines, an even number.
+
+    Returns:
+        list[str]: One line per metric, in the order they first appear.
+    """
+    summary = RunSummary(style, percentiles, points)
+    first = last = None
+    for at, name, value in samples:
+        if metrics and name not in metrics:
+            continue
+        if start is not None or end is not None:
+            if at is None or (start is not None and at < start) or (end is not None and at > end):
+                continue
+        if at is not None:
+            first = at if first is None else min(first, at)
+            last = at if last is None else max(last, at)
+        summary.update({name: value})
+    duration = last - first if first is not None and last is not None else 0.0
+    return summary.format_lines(duration)
@@ -5,11 +5,24 @@ from __future__ import annotations
 
 import time
 from threading import Event
+from typing import cast
 
 import schedule
 
+from sparkle_log.adaptive import INTERVAL_METRIC, AdaptiveInterval
+from sparkle_log.burst import get_burst_capture
 from sparkle_log.custom_types import CustomMetricsCallBacks, GraphStyle, Metrics
+from sparkle_log.graphs import GLOBAL_LOGGER
+from sparkle_log.lag import WAKEUP_LAG
 from sparkle_log.log_writer import log_system_metrics
+from sparkle_log.overhead import OVERHEAD
+from sparkle_log.python_memory import acquire_python_metrics, release_python_metrics
+from sparkle_log.sketch import QuantileSketch
+from sparkle_log.stack_sampler import get_stack_sampler
+from sparkle_log.summary import RunSummary
+
+# Name of the threads running run_scheduler, so the stack sampler can tell them from the application's threads.
+SCHEDULER_THREAD_NAME = "sparkle_log.scheduler"
 
 
 def run_scheduler(
@@ -18,10 +31,86 @@ def run_scheduler(
     seconds: int,
     style: GraphStyle = "bar",
     custom_metrics: CustomMetricsCallBacks = None,
+    percentiles: tuple[float, ...] = (),
+    summary: bool = True,
+    adaptive: tuple[float, float] | None = None,
 ):
-    """Run scheduled tasks until the stop_event is set."""
-    schedule.every(seconds).seconds.do(lambda: log_system_metrics(metrics, style, custom_metrics))
+    """
+    Run scheduled tasks until the stop_event is set.
+
+    With summary=True, one line per metric covering the whole run is logged once the stop_event is set. When stack
+    sampling is configured and a tick crosses its threshold, the thread samples stacks instead of sleeping until the
+    next tick logs the hot functions. When burst capture is configured, the trigger metrics are read once per
+    second between ticks and a breach switches the thread to high-rate sampling for the burst window.
+
+    adaptive, a (min_interval, max_interval) pair in seconds, lets the interval grow while metrics are steady and
+    shrink when they change, see AdaptiveInterval. The interval in use is logged as the sample_interval_ms metric.
+    """
+    run_summary = RunSummary(style)
+    # The percentiles on each line cover this run only.
+    sketches: dict[str, QuantileSketch] = {}
+    controller = AdaptiveInterval(seconds, *adaptive) if adaptive else None
+    interval: float = controller.interval if controller else seconds
+    if controller:
+        custom_metrics = {**(custom_metrics or {}), INTERVAL_METRIC: lambda: controller.interval * 1000}
+    # Wake up often enough to honour the shortest interval.
+    poll = min(1, controller.min_interval) if controller else 1
+    # schedule sets the next run one interval after the previous run finished, track the same deadline.
+    deadline = time.monotonic() + interval
+
+    def tick():
+        """Log one round of metrics and add them to the run summary."""
+        nonlocal deadline, interval
+        OVERHEAD.add_lateness(int((time.monotonic() - deadline) * 1e9))
+        samples = log_system_metrics(metrics, style, custom_metrics, percentiles, sketches)
+        if summary:
+            run_summary.update(samples)
+        profiler = get_stack_sampler()
+        if profiler:
+            for line in profiler.roll(samples):
+                GLOBAL_LOGGER.info(line)
+        if controller:
+            interval = controller.update(samples)
+            # schedule computes the next run from job.interval right after this returns.
+            job.interval = interval
+        deadline = time.monotonic() + interval
+        return samples
+
+    # A scheduler per run, so jobs of finished or concurrent runs never fire here.
+    scheduler = schedule.Scheduler()
+    # schedule declares an int interval but adds timedelta(seconds=interval), so fractional intervals are honoured.
+    job = scheduler.every(cast(int, interval)).seconds.do(tick)
+    python_metrics = acquire_python_metrics(metrics)
+    try:
+        _run_until_stopped(stop_event, scheduler, poll)
+    finally:
+        scheduler.clear()
+        if python_metrics:
+            release_python_metrics()
+        burst = get_burst_capture()
+        if burst and burst.bursting:
+            # Log the incident so far rather than leave the capture bursting after monitoring stopped.
+            burst.finish()
+
+    if summary:
+        for line in run_summary.format_lines():
+            GLOBAL_LOGGER.info(line)
+
 
+def _run_until_stopped(stop_event: Event, scheduler: schedule.Scheduler, poll: float) -> None:
+    """Run the scheduler's pending jobs, and spend the time between them sleeping or sampling, until stop_event."""
     while not stop_event.is_set():
-        schedule.run_pending()
-        time.sleep(1)
+        scheduler.run_pending()
+        profiler = get_stack_sampler()
+        if profiler and profiler.active:
+            # Above the threshold, spend the sleep sampling stacks. Below it, stack sampling costs nothing.
+            profiler.sample_for(poll)
+            continue
+        burst = get_burst_capture()
+        if burst and burst.watch():
+            burst.capture_for(poll)
+            continue
+        slept_from = time.monotonic()
+        time.sleep(poll)
+        # Sleep overshoot, the time spent sampling is not part of it. overhead_late_ms covers lateness against deadline.
+        WAKEUP_LAG.record(time.monotonic() - slept_from - poll)
@@ -0,0 +1,87 @@
+# sparkle_log/sinks.py
+"""
+Sinks receive every tick's samples, next to the log lines, e.g. to persist or export them.
+
+A sink is any object with on_tick(samples, at) and close(). at is the wall clock time (time.time()) of the tick.
+Sinks still registered at interpreter exit are closed then, so stores are flushed and exporters send their last batch.
+"""
+
+from __future__ import annotations
+
+import atexit
+import time
+from threading import Lock
+from typing import Protocol
+
+from sparkle_log.custom_types import NumberType
+from sparkle_log.graphs import GLOBAL_LOGGER
+
+
+class Sink(Protocol):
+    """What a sink implements."""
+
+    def on_tick(self, samples: dict[str, NumberType], at: float) -> None:
+        """Receive the samples taken on one tick."""
+
+    def close(self) -> None:
+        """Flush and release resources."""
+
+
+SINKS: list[Sink] = []
+# Failed on_tick() calls per registered sink, by id() since sinks need not be hashable.
+_FAILURES: dict[int, int] = {}
+_SINKS_LOCK = Lock()
+
+
+def add_sink(sink: Sink) -> Sink:
+    """Send every tick's samples to sink. Returns the sink."""
+    with _SINKS_LOCK:
+        SINKS.append(sink)
+    return sink
+
+
+def remove_sink(sink: Sink) -> None:
+    """Stop sending samples to sink and close it."""
+    with _SINKS_LOCK:
+        if sink in SINKS:
+            SINKS.remove(sink)
+        _FAILURES.pop(id(sink), None)
+    sink.close()
+
+
+def sink_failures(sink: Sink) -> int:
+    """Number of on_tick() calls of a registered sink that raised."""
+    with _SINKS_LOCK:
+        return _FAILURES.get(id(sink), 0)
+
+
+def notify_sinks(samples: dict[str, NumberType]) -> None:
+    """Hand one tick's samples to every sink."""
+    if not SINKS:
+        return
+    at = time.time()
+    with _SINKS_LOCK:
+        sinks = list(SINKS)
+    for sink in sinks:
+        try:
+            sink.on_tick(samples, at)
+        # A failing sink must not stop sampling or the other sinks.
+        except Exception:  # nosec
+            with _SINKS_LOCK:
+                failures = _FAILURES[id(sink)] = _FAILURES.get(id(sink), 0) + 1
+            if failures == 1:
+                # Once per sink, a sink failing on every tick would flood the log.
+                GLOBAL_LOGGER.debug(f"Sink {sink!r} failed, later failures are only counted", exc_info=True)
+
+
+@atexit.register
+def close_sinks() -> None:
+    """Unregister and close every sink. Runs at interpreter exit."""
+    with _SINKS_LOCK:
+        sinks = list(SINKS)
+    for sink in sinks:
+        try:
+            remove_sink(sink)
+        # Exit must go on for the other sinks.
+        except Exception:  # nosec
+            GLOBAL_LOGGER.debug(f"Closing sink {sink!r} failed", exc_info=True)
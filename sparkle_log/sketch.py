@@ -0,0 +1,158 @@
+# sparkle_log/sketch.py
+"""
+Bounded-memory quantile sketch, in the style of DDSketch.
+
+Values are counted in logarithmically sized buckets, so any quantile is estimated within a relative error of
+relative_accuracy, using memory that depends on the range of the values rather than on how many there are. Sketches
+with the same accuracy can be merged, e.g. across sessions or processes via to_dict() and from_dict().
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any
+
+from sparkle_log.custom_types import NumberType
+
+
+class QuantileSketch:
+    """Streaming quantile estimates with a relative error guarantee and a cap on the number of buckets."""
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048) -> None:
+        """
+        Initialize an empty sketch.
+
+        Args:
+            relative_accuracy: Maximum relative error of a quantile estimate, e.g. 0.01 for 1%.
+            max_buckets: Cap on buckets per sign. Past it, the lowest buckets are merged, which only costs accuracy
+                for the lowest quantiles.
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.positive: dict[int, int] = {}
+        self.negative: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.minimum: float | None = None
+        self.maximum: float | None = None
+
+    def _key(self, value: float) -> int:
+        """Bucket index for a positive value."""
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        """Representative value of a bucket, the one with the least relative error to anything in it."""
+        return 2 * self._gamma**key / (self._gamma + 1)
+
+    def add(self, value: NumberType) -> None:
+        """Add one value. None (a failed reading) is ignored."""
+        if value is None:
+            return
+        if value > 0:
+            key = self._key(value)
+            self.positive[key] = self.positive.get(key, 0) + 1
+            self._collapse(self.positive)
+        elif value < 0:
+            key = self._key(-value)
+            self.negative[key] = self.negative.get(key, 0) + 1
+            self._collapse(self.negative)
+        else:
+            self.zero_count += 1
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    def _collapse(self, buckets: dict[int, int]) -> None:
+        """Merge the lowest magnitude buckets until the cap is respected."""
+        while len(buckets) > self.max_buckets:
+            lowest, second = sorted(buckets)[:2]
+            buckets[second] += buckets.pop(lowest)
+
+    def quantile(self, q: float) -> float | None:
+        """
+        Estimate a quantile.
+
+        Args:
+            q: Quantile between 0 and 1, e.g. 0.99.
+
+        Returns:
+            float | None: The estimate, None if the sketch is empty.
+        """
+        if not self.count:
+            return None
+        if q <= 0:
+            return self.minimum
+        if q >= 1:
+            return self.maximum
+        rank = q * (self.count - 1)
+        seen = 0
+        # Most negative first: the largest magnitude negative bucket holds the smallest values.
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                # Clamp so an estimate never falls outside what was actually seen.
+                return min(self._value(key), self.maximum if self.maximum is not None else math.inf)
+        return self.maximum
+
+    @property
+    def mean(self) -> float | None:
+        """Exact mean of all values added."""
+        return self.total / self.count if self.count else None
+
+    def merge(self, other: QuantileSketch) -> None:
+        """Add all values of another sketch with the same relative accuracy to this one."""
+        if not math.isclose(other.relative_accuracy, self.relative_accuracy):
+            raise ValueError("Can only merge sketches with the same relative_accuracy")
+        for key, count in other.positive.items():
+            self.positive[key] = self.positive.get(key, 0) + count
+        for key, count in other.negative.items():
+            self.negative[key] = self.negative.get(key, 0) + count
+        self._collapse(self.positive)
+        self._collapse(self.negative)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.minimum, other.maximum):
+            if value is not None:
+                self.minimum = value if self.minimum is None else min(self.minimum, value)
+                self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON serializable form, for merging across processes."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "positive": {str(k): v for k, v in self.positive.items()},
+            "negative": {str(k): v for k, v in self.negative.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "total": self.total,
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> QuantileSketch:
+        """Rebuild a sketch from to_dict() output."""
+        sketch = cls(data["relative_accuracy"], data["max_buckets"])
+        sketch.positive = {int(k): v for k, v in data["positive"].items()}
+        sketch.negative = {int(k): v for k, v in data["negative"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.total = data["total"]
+        sketch.minimum = data["minimum"]
+        sketch.maximum = data["maximum"]
+        return sketch
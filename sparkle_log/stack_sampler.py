@@ -0,0 +1,154 @@
+# sparkle_log/stack_sampler.py
+"""
+Sampling profiler that runs in the scheduler thread while CPU is above a threshold.
+
+Below the threshold the scheduler sleeps as usual and nothing is sampled. Above it, the scheduler spends its sleep
+reading sys._current_frames() at rate_hz and counting the innermost function of every other thread. The next tick logs
+the hottest functions next to the metric lines that show the spike, as a share of the thread samples taken.
+
+Threads waiting on a lock, queue or selector, and sparkle_log's own threads, are not counted: they use no CPU and would
+crowd out the functions that do.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+
+from sparkle_log.custom_types import NumberType
+
+# Threads named with this prefix are sparkle_log's: schedulers, the Prometheus server.
+OWN_THREAD_PREFIX = "sparkle_log."
+# Innermost frames of threads blocked in the standard library, by file name and function.
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("socketserver.py", "serve_forever"),
+    ("socket.py", "accept"),
+}
+
+
+class StackSampler:
+    """Count the functions other threads are running, in a bounded counter."""
+
+    def __init__(
+        self,
+        threshold: float = 80.0,
+        metric: str = "cpu",
+        rate_hz: float = 50.0,
+        top_n: int = 5,
+        max_functions: int = 1000,
+    ) -> None:
+        """
+        Initialize the sampler.
+
+        Args:
+            threshold: Start sampling once the metric reaches this value.
+            metric: Metric that triggers sampling, usually cpu or process_cpu. It must be one of the logged metrics.
+            rate_hz: Stack samples per second while triggered.
+            top_n: Number of hot functions logged per tick.
+            max_functions: Cap on distinct functions counted. Samples of functions seen after that are dropped.
+        """
+        self.threshold = threshold
+        self.metric = metric
+        self.rate_hz = rate_hz
+        self.top_n = top_n
+        self.max_functions = max_functions
+        self.active = False
+        self.counts: dict[str, int] = {}
+        self.samples = 0
+        self.thread_samples = 0
+        self.dropped = 0
+        # Concurrent monitoring runs share the configured sampler.
+        self._lock = threading.Lock()
+
+    def sample_once(self, skip_thread: int | None = None) -> None:
+        """Count the innermost function of each busy application thread except skip_thread."""
+        own = {t.ident for t in threading.enumerate() if t.name.startswith(OWN_THREAD_PREFIX)}
+        # _current_frames is the only way to see other threads' stacks, it is what faulthandler-like tools use.
+        frames = sys._current_frames()  # pylint: disable=protected-access
+        with self._lock:
+            self.samples += 1
+            for thread_id, frame in frames.items():
+                if thread_id == skip_thread or thread_id in own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                self.thread_samples += 1
+                key = f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+                if key in self.counts:
+                    self.counts[key] += 1
+                elif len(self.counts) < self.max_functions:
+                    self.counts[key] = 1
+                else:
+                    self.dropped += 1
+
+    def sample_for(self, seconds: float) -> None:
+        """Sample stacks at rate_hz for the given number of seconds, standing in for the scheduler's sleep."""
+        deadline = time.monotonic() + seconds
+        period = 1 / self.rate_hz
+        own_thread = threading.get_ident()
+        while time.monotonic() < deadline:
+            self.sample_once(own_thread)
+            time.sleep(period)
+
+    def roll(self, samples: dict[str, NumberType]) -> list[str]:
+        """
+        Report what was sampled since the previous tick and decide whether to keep sampling.
+
+        Args:
+            samples: The metric samples of this tick.
+
+        Returns:
+            list[str]: Log lines listing the top_n functions with their share of the busy thread samples, empty if no
+            busy thread was sampled.
+        """
+        lines = []
+        with self._lock:
+            counts, stacks, thread_samples = self.counts, self.samples, self.thread_samples
+            self.counts = {}
+            self.samples = 0
+            self.thread_samples = 0
+            self.dropped = 0
+        if thread_samples:
+            lines.append(f"Hot functions, {self.metric} >= {self.threshold:g}, {stacks} stack samples:")
+            ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)[: self.top_n]
+            for key, count in ranked:
+                lines.append(f"  {count / thread_samples * 100:5.1f}% {key}")
+        value = samples.get(self.metric)
+        self.active = value is not None and value >= self.threshold
+        return lines
+
+
+_SAMPLER: StackSampler | None = None
+_SAMPLER_LOCK = threading.Lock()
+
+
+def configure_stack_sampling(
+    threshold: float | None = 80.0,
+    metric: str = "cpu",
+    rate_hz: float = 50.0,
+    top_n: int = 5,
+    max_functions: int = 1000,
+) -> StackSampler | None:
+    """
+    Turn on stack sampling while metric is at or above threshold, see StackSampler. A threshold of None turns it off.
+
+    Returns:
+        StackSampler | None: The sampler now used by the scheduler.
+    """
+    global _SAMPLER  # pylint: disable=global-statement
+    with _SAMPLER_LOCK:
+        _SAMPLER = None if threshold is None else StackSampler(threshold, metric, rate_hz, top_n, max_functions)
+        return _SAMPLER
+
+
+def get_stack_sampler() -> StackSampler | None:
+    """Return the configured stack sampler, None when stack sampling is off."""
+    with _SAMPLER_LOCK:
+        return _SAMPLER
@@ -0,0 +1,132 @@
+# sparkle_log/statsd.py
+"""
+StatsD sink.
+
+Each tick's samples are sent as gauges (`sparkle_log.cpu:43|g`), packed newline-separated into as few UDP datagrams as
+fit in max_datagram bytes. The socket is persistent and non-blocking: a datagram the kernel cannot take right away is
+dropped and counted, so a slow or missing agent never blocks or breaks the scheduler thread.
+
+A signed gauge value means "change by", so a negative value is sent as a reset to 0 followed by the value. NaN and
+infinity, which a custom metric can return but agents reject, are not sent and count as dropped metrics.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import socket
+
+from sparkle_log.custom_types import NumberType
+from sparkle_log.sinks import add_sink
+
+# Fits in a 1500 byte Ethernet MTU after IP and UDP headers, with room for IP options.
+DEFAULT_MAX_DATAGRAM = 1432
+
+
+def format_gauge(prefix: str, name: str, value: int | float) -> str:
+    """
+    One StatsD gauge. Per-device names like net_rx:eth0 become net_rx.eth0.
+
+    StatsD reads a signed gauge value as a change, so a negative value is sent as a reset to 0 followed by the value,
+    two lines that must stay in one datagram.
+    """
+    name = re.sub(r"[:|@\s]", "_", name.replace(":", ".", 1))
+    number = str(int(value)) if float(value).is_integer() else f"{value:.6f}".rstrip("0").rstrip(".")
+    if number.startswith("-"):
+        return f"{prefix}{name}:0|g\n{prefix}{name}:{number}|g"
+    return f"{prefix}{name}:{number}|g"
+
+
+def _pack(gauges: list[str], max_datagram: int) -> list[tuple[bytes, int]]:
+    """Datagrams for pack_datagrams(), each with the number of gauges in it."""
+    datagrams: list[tuple[bytes, int]] = []
+    current = b""
+    count = 0
+    for gauge in gauges:
+        encoded = gauge.encode("utf-8")
+        if current and len(current) + 1 + len(encoded) <= max_datagram:
+            current += b"\n" + encoded
+            count += 1
+            continue
+        if current:
+            datagrams.append((current, count))
+        # A gauge longer than max_datagram still goes out, on its own.
+        current = encoded
+        count = 1
+    if current:
+        datagrams.append((current, count))
+    return datagrams
+
+
+def pack_datagrams(gauges: list[str], max_datagram: int = DEFAULT_MAX_DATAGRAM) -> list[bytes]:
+    """Join gauges with newlines into as few datagrams of at most max_datagram bytes as possible, in order."""
+    return [datagram for datagram, _ in _pack(gauges, max_datagram)]
+
+
+class StatsdSink:
+    """Send every tick's samples to a StatsD agent over UDP."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8125,
+        prefix: str = "sparkle_log.",
+        max_datagram: int = DEFAULT_MAX_DATAGRAM,
+    ) -> None:
+        """
+        Open the socket.
+
+        Args:
+            host: The agent's address, resolved once here.
+            port: The agent's port.
+            prefix: Prepended to every metric name.
+            max_datagram: Largest datagram to send, in bytes. Raise it for jumbo frames or loopback.
+        """
+        self.prefix = prefix
+        self.max_datagram = max_datagram
+        self.sent_datagrams = 0
+        self.sent_metrics = 0
+        self.dropped_datagrams = 0
+        self.dropped_metrics = 0
+        address = socket.getaddrinfo(host, port, type=socket.SOCK_DGRAM)[0]
+        self._socket: socket.socket | None = socket.socket(address[0], socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+        self._address = address[4]
+
+    def on_tick(self, samples: dict[str, NumberType], at: float) -> None:
+        """Send one tick's samples, skipping failed readings and dropping NaN and infinity. Never blocks or raises."""
+        gauges = []
+        for name, value in samples.items():
+            if value is None:
+                continue
+            if not math.isfinite(value):
+                self.dropped_metrics += 1
+                continue
+            gauges.append(format_gauge(self.prefix, name, value))
+        for datagram, metrics in _pack(gauges, self.max_datagram):
+            try:
+                if self._socket is None:
+                    raise OSError("StatsD sink is closed")
+                self._socket.sendto(datagram, self._address)
+            except OSError:
+                # Includes BlockingIOError when the send buffer is full.
+                self.dropped_datagrams += 1
+                self.dropped_metrics += metrics
+                continue
+            self.sent_datagrams += 1
+            self.sent_metrics += metrics
+
+    def close(self) -> None:
+        """Close the socket, later ticks are counted as dropped."""
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+def open_statsd_sink(
+    host: str = "127.0.0.1", port: int = 8125, prefix: str = "sparkle_log.", max_datagram: int = DEFAULT_MAX_DATAGRAM
+) -> StatsdSink:
+    """Create a StatsdSink and register it as a sink, see StatsdSink for the options. Stop it with remove_sink()."""
+    sink = StatsdSink(host, port, prefix, max_datagram)
+    add_sink(sink)
+    return sink
@@ -0,0 +1,235 @@
+# sparkle_log/store.py
+"""
+Memory-mapped, on-disk history of every sample.
+
+Each session writes fixed-size records to a preallocated file that is memory-mapped for writing, so appending a sample
+is a struct.pack_into and nothing accumulates on the Python heap. The mapping is flushed (msync) every few ticks and
+when the file is full the session rotates to a new file, deleting the oldest beyond max_files. Files can be read back
+with read_store() after a restart, e.g. to replay or render the history.
+
+Metric names are stored in a fixed 32 byte field. A longer name is rejected rather than cut, so two names can never
+end up stored as the same one.
+"""
+
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import struct
+import time
+from collections.abc import Iterator
+from threading import Lock
+
+from sparkle_log.custom_types import NumberType
+
+MAGIC = b"SPKL"
+VERSION = 1
+# Magic, version, record size, number of records written.
+HEADER = struct.Struct("<4sHHQ")
+# Longest metric name a record holds, in UTF-8 bytes.
+NAME_BYTES = 32
+# Wall clock time, value (NaN for None), metric name.
+RECORD = struct.Struct(f"<dd{NAME_BYTES}s")
+# Where the name starts within a record.
+NAME_OFFSET = RECORD.size - NAME_BYTES
+SUFFIX = ".spkl"
+
+
+class MmapStore:
+    """Append-only sink writing every sample to rotating memory-mapped files."""
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 16 * 1024 * 1024,
+        max_files: int = 10,
+        sync_every: int = 10,
+        session: str | None = None,
+    ) -> None:
+        """
+        Create the first file of the session.
+
+        Args:
+            directory: Where to write the files, created if missing.
+            max_bytes: Size of each file, the session rotates to a new file when one is full.
+            max_files: Files of this session to keep, older ones are deleted on rotation.
+            sync_every: Flush the mapping to disk every this many ticks.
+            session: File name prefix, by default the start time and pid.
+        """
+        if max_bytes < HEADER.size + RECORD.size:
+            raise ValueError("max_bytes is too small to hold a single record")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.sync_every = sync_every
+        self.session = session or f"sparkle-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.files: list[str] = []
+        self.count = 0
+        self.ticks = 0
+        self._map: mmap.mmap | None = None
+        self._lock = Lock()
+        self._open_next()
+
+    @property
+    def path(self) -> str:
+        """The file being written."""
+        return self.files[-1]
+
+    def _open_next(self) -> None:
+        """Close the current file, if any, and start the next one."""
+        self._close_current()
+        path = os.path.join(self.directory, f"{self.session}-{len(self.files):04d}{SUFFIX}")
+        with open(path, "wb") as handle:
+            handle.truncate(self.max_bytes)
+        with open(path, "r+b") as handle:
+            self._map = mmap.mmap(handle.fileno(), self.max_bytes)
+        self.count = 0
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, RECORD.size, 0)
+        self.files.append(path)
+        while len([f for f in self.files if os.path.exists(f)]) > self.max_files:
+            oldest = next(f for f in self.files if os.path.exists(f))
+            os.remove(oldest)
+
+    def _close_current(self) -> None:
+        """Flush and unmap the current file, cutting it down to the records written."""
+        if self._map is None:
+            return
+        self._map.flush()
+        self._map.close()
+        self._map = None
+        os.truncate(self.path, HEADER.size + self.count * RECORD.size)
+
+    def append(self, name: str, value: NumberType, at: float) -> None:
+        """
+        Write one sample.
+
+        Raises:
+            ValueError: The store is closed, or the name is longer than NAME_BYTES.
+        """
+        key = _encode_name(name)
+        with self._lock:
+            if self._map is None:
+                raise ValueError("Store is closed")
+            offset = HEADER.size + self.count * RECORD.size
+            if offset + RECORD.size > self.max_bytes:
+                self._open_next()
+                offset = HEADER.size
+            value = math.nan if value is None else float(value)
+            RECORD.pack_into(self._map, offset, at, value, key)
+            self.count += 1
+            # The count is written last, so a reader never sees a half-written record.
+            HEADER.pack_into(self._map, 0, MAGIC, VERSION, RECORD.size, self.count)
+
+    def on_tick(self, samples: dict[str, NumberType], at: float) -> None:
+        """
+        Write one tick's samples, flushing every sync_every ticks.
+
+        Raises:
+            ValueError: After writing the rest of the tick, if any names were too long to store.
+        """
+        too_long = []
+        for name, value in samples.items():
+            if len(name.encode("utf-8")) > NAME_BYTES:
+                too_long.append(name)
+                continue
+            self.append(name, value, at)
+        self.ticks += 1
+        if self.ticks % self.sync_every == 0:
+            with self._lock:
+                if self._map is not None:
+                    self._map.flush()
+        if too_long:
+            raise ValueError(f"Metric names longer than {NAME_BYTES} bytes cannot be stored: {', '.join(too_long)}")
+
+    def tail(self, name: str, n: int = 30) -> list[NumberType]:
+        """
+        The last n samples of a metric, oldest first, going back into rotated files that are still kept.
+
+        A window without heap-resident history: the padded name is searched for backwards in C with mmap.rfind, and
+        only the matching records are unpacked.
+        """
+        key = _encode_name(name)
+        found: list[NumberType] = []
+        with self._lock:
+            if self._map is not None:
+                found = _tail_records(self._map, self.count, key, n)
+            for path in reversed(self.files[:-1]):
+                if len(found) >= n:
+                    break
+                try:
+                    with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        found += _tail_records(mapped, _record_count(mapped, path), key, n - len(found))
+                except (OSError, ValueError):
+                    # Deleted by rotation, or cut down to nothing.
+                    continue
+        found.reverse()
+        return found
+
+    def close(self) -> None:
+        """Flush, unmap and trim the current file."""
+        with self._lock:
+            self._close_current()
+
+
+def _encode_name(name: str) -> bytes:
+    """The stored form of a metric name, NUL padded to NAME_BYTES."""
+    encoded = name.encode("utf-8")
+    if len(encoded) > NAME_BYTES:
+        raise ValueError(f"Metric name {name!r} is longer than {NAME_BYTES} bytes and cannot be stored")
+    return encoded.ljust(NAME_BYTES, b"\0")
+
+
+def _record_count(mapped: mmap.mmap, path: str) -> int:
+    """Records in a mapped store file, checking the header."""
+    magic, _, record_size, count = HEADER.unpack_from(mapped, 0)
+    if magic != MAGIC or record_size != RECORD.size:
+        raise ValueError(f"{path} is not a sparkle_log store")
+    return min(count, (len(mapped) - HEADER.size) // RECORD.size)
+
+
+def _tail_records(mapped: mmap.mmap, count: int, key: bytes, n: int) -> list[NumberType]:
+    """The last n values stored under key among the first count records of a mapping, newest first."""
+    found: list[NumberType] = []
+    end = HEADER.size + count * RECORD.size
+    while len(found) < n:
+        at = mapped.rfind(key, HEADER.size, end)
+        if at < 0:
+            break
+        start = at - NAME_OFFSET
+        if start >= HEADER.size and (start - HEADER.size) % RECORD.size == 0:
+            _, value, _ = RECORD.unpack_from(mapped, start)
+            found.append(None if math.isnan(value) else value)
+            end = start
+        else:
+            # The bytes happened to match across record fields, look further back.
+            end = at + len(key) - 1
+    return found
+
+
+def read_store(path: str) -> Iterator[tuple[float, str, NumberType]]:
+    """
+    Read back a store file, memory-mapped so even large files cost little heap.
+
+    Yields:
+        tuple[float, str, NumberType]: Wall clock time, metric name and value of each record, in write order.
+    """
+    with open(path, "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size < HEADER.size:
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for index in range(_record_count(mapped, path)):
+                at, value, raw = RECORD.unpack_from(mapped, HEADER.size + index * RECORD.size)
+                yield at, raw.rstrip(b"\0").decode("utf-8", "replace"), None if math.isnan(value) else value
+
+
+def open_store(directory: str, **kwargs) -> MmapStore:
+    """Create an MmapStore and register it as a sink, see MmapStore for the options."""
+    # Imported here so the store can be used on its own without the sink registry.
+    from sparkle_log.sinks import add_sink  # pylint: disable=import-outside-toplevel
+
+    store = MmapStore(directory, **kwargs)
+    add_sink(store)
+    return store
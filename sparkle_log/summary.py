@@ -0,0 +1,129 @@
+# sparkle_log/summary.py
+"""
+Whole-run summaries. Aggregates are streaming, so memory does not grow with the length of the run.
+"""
+
+from __future__ import annotations
+
+import time
+
+from sparkle_log.custom_types import GraphStyle, NumberType
+from sparkle_log.io_metrics import format_bytes_rate
+from sparkle_log.log_writer import metric_unit
+from sparkle_log.sketch import QuantileSketch
+from sparkle_log.ui import sparkline
+
+SUMMARY_PERCENTILES = (50, 95, 99)
+
+
+class Downsampler:
+    """
+    A fixed number of points covering every value added so far.
+
+    Each point is the mean of bucket_width consecutive values. When all points are used, neighbours are merged in
+    pairs and bucket_width doubles, so a run of any length fits in at most `points` floats.
+    """
+
+    def __init__(self, points: int = 30) -> None:
+        """Initialize an empty series of at most points values, points must be even."""
+        if points < 2 or points % 2:
+            raise ValueError("points must be an even number of at least 2")
+        self.points = points
+        self.bucket_width = 1
+        self.buckets: list[float] = []
+        self._pending_total = 0.0
+        self._pending_count = 0
+
+    def add(self, value: float) -> None:
+        """Add one value."""
+        self._pending_total += value
+        self._pending_count += 1
+        if self._pending_count < self.bucket_width:
+            return
+        self.buckets.append(self._pending_total / self._pending_count)
+        self._pending_total = 0.0
+        self._pending_count = 0
+        if len(self.buckets) == self.points:
+            self.buckets = [(a + b) / 2 for a, b in zip(self.buckets[::2], self.buckets[1::2], strict=True)]
+            self.bucket_width *= 2
+
+    def values(self) -> list[float]:
+        """The downsampled series, including the partly filled last bucket."""
+        if self._pending_count:
+            return [*self.buckets, self._pending_total / self._pending_count]
+        return list(self.buckets)
+
+
+class MetricSummary:
+    """Streaming count, min, mean, max, percentiles and a downsampled series for one metric."""
+
+    def __init__(self, points: int = 30) -> None:
+        """Initialize an empty summary, the downsampled series has at most points values."""
+        self.count = 0
+        self.total = 0.0
+        self.minimum: float | None = None
+        self.maximum: float | None = None
+        self.sketch = QuantileSketch()
+        self.series = Downsampler(points)
+
+    def add(self, value: NumberType) -> None:
+        """Add one sample. None (a failed reading) is ignored."""
+        if value is None:
+            return
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+        self.sketch.add(value)
+        self.series.add(value)
+
+    @property
+    def mean(self) -> float | None:
+        """Mean of all samples, None if there were none."""
+        return self.total / self.count if self.count else None
+
+
+class RunSummary:
+    """Summaries for every metric seen during one monitored run."""
+
+    def __init__(
+        self, style: GraphStyle = "bar", percentiles: tuple[float, ...] = SUMMARY_PERCENTILES, points: int = 30
+    ) -> None:
+        """
+        Start the clock on the run. style, percentiles and the points of the sparkline set how format_lines() shows
+        each metric.
+        """
+        self.started_at = time.monotonic()
+        self.style = style
+        self.percentiles = percentiles
+        self.points = points
+        self.metrics: dict[str, MetricSummary] = {}
+
+    def update(self, samples: dict[str, NumberType]) -> None:
+        """Add the samples taken on one tick."""
+        for name, value in samples.items():
+            self.metrics.setdefault(name, MetricSummary(self.points)).add(value)
+
+    def format_lines(self, duration: float | None = None) -> list[str]:
+        """One human-readable line per metric with samples. duration defaults to the time since the summary started."""
+        if duration is None:
+            duration = time.monotonic() - self.started_at
+        lines = []
+        for name, summary in self.metrics.items():
+            if not summary.count:
+                continue
+            unit = metric_unit(name)
+            estimates = [summary.sketch.quantile(p / 100) for p in self.percentiles]
+            if unit == "B/s":
+                stats = ", ".join(format_bytes_rate(v) for v in (summary.minimum, summary.mean, summary.maximum))
+                stats = f"({stats})"
+                tails = ", ".join(format_bytes_rate(v) for v in estimates)
+            else:
+                stats = f"({summary.minimum:g}, {summary.mean:.1f}, {summary.maximum:g}){unit}"
+                tails = ", ".join(f"{round(v or 0)}" for v in estimates)
+            line = f"Summary {name}: {duration:.1f}s, {summary.count} samples | min, mean, max {stats}"
+            if self.percentiles:
+                line += f" | {', '.join(f'p{p:g}' for p in self.percentiles)} ({tails})"
+            series: list[NumberType] = list(summary.series.values())
+            lines.append(f"{line} | {sparkline(series, self.style)}")
+        return lines
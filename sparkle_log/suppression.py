@@ -0,0 +1,144 @@
+# sparkle_log/suppression.py
+"""
+Log-volume reduction.
+
+A metric line is only written when its current value, min, mean or max moved by more than delta since the line last
+written for that metric, or when a heartbeat is due. A token bucket caps the lines per second across all metrics.
+
+In combined mode every metric of a tick shares one line, so there is one decision per line: it is written when any of
+its metrics changed, takes one token and has one heartbeat.
+"""
+
+from __future__ import annotations
+
+import time
+from threading import Lock
+
+from sparkle_log.custom_types import NumberType
+
+# Heartbeat key of the combined line, which has one decision for all of its metrics.
+COMBINED_LINE = "__combined__"
+
+
+class SuppressionPolicy:
+    """Decide which metric lines are worth writing, counting the ones that are not."""
+
+    def __init__(
+        self,
+        delta: float = 1.0,
+        heartbeat: int = 10,
+        max_lines_per_second: float | None = None,
+        burst: int = 20,
+    ) -> None:
+        """
+        Initialize the policy.
+
+        Args:
+            delta: Write a line when the current value, min, mean or max changed by more than this.
+            heartbeat: Write a metric's line at least every heartbeat intervals, even if nothing changed and even past
+                the rate limit.
+            max_lines_per_second: Token bucket refill rate across all metrics, None for no rate limit.
+            burst: Token bucket size, the most lines written at once after a quiet spell.
+        """
+        self.delta = delta
+        self.heartbeat = heartbeat
+        self.max_lines_per_second = max_lines_per_second
+        self.burst = burst
+        self.suppressed = 0
+        self.emitted = 0
+        self._last: dict[str, tuple[NumberType, ...]] = {}
+        self._quiet_intervals: dict[str, int] = {}
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._lock = Lock()
+
+    def _take_token(self) -> bool:
+        """Take a token from the bucket, False if it is empty. Always True without a rate limit."""
+        if self.max_lines_per_second is None:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.max_lines_per_second)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _changed(self, metric: str, stats: tuple[NumberType, ...]) -> bool:
+        """True if any of the stats moved by more than delta since the last line written for this metric."""
+        last = self._last.get(metric)
+        if last is None or len(last) != len(stats):
+            return True
+        for new, old in zip(stats, last, strict=True):
+            if (new is None) != (old is None):
+                return True
+            if new is not None and old is not None and abs(new - old) > self.delta:
+                return True
+        return False
+
+    def _decide(self, key: str, stats_by_metric: dict[str, tuple[NumberType, ...]]) -> bool:
+        """Decide on one line showing these metrics, key tracks its heartbeat. A written line resets every baseline."""
+        with self._lock:
+            quiet = self._quiet_intervals.get(key, 0) + 1
+            heartbeat_due = quiet >= self.heartbeat
+            changed = any(self._changed(metric, stats) for metric, stats in stats_by_metric.items())
+            emit = heartbeat_due or (changed and self._take_token())
+            if not emit:
+                self._quiet_intervals[key] = quiet
+                self.suppressed += 1
+                return False
+            self._quiet_intervals[key] = 0
+            self._last.update(stats_by_metric)
+            self.emitted += 1
+            return True
+
+    def should_emit(self, metric: str, stats: tuple[NumberType, ...]) -> bool:
+        """
+        Decide whether to write this interval's line for a metric.
+
+        Args:
+            metric: The metric name.
+            stats: What the line shows, e.g. (current, min, mean, max).
+
+        Returns:
+            bool: True to write the line. False means it was counted in suppressed.
+        """
+        return self._decide(metric, {metric: stats})
+
+    def should_emit_line(self, stats_by_metric: dict[str, tuple[NumberType, ...]]) -> bool:
+        """
+        Decide whether to write this interval's combined line, one decision for all of its metrics.
+
+        Args:
+            stats_by_metric: What the line shows for each metric, e.g. (current, min, max).
+
+        Returns:
+            bool: True to write the line, after which every metric's stats are the baseline for the next decision.
+            False means the line was counted in suppressed.
+        """
+        return self._decide(COMBINED_LINE, stats_by_metric)
+
+
+_POLICY: SuppressionPolicy | None = None
+
+
+def configure_suppression(
+    delta: float | None = 1.0,
+    heartbeat: int = 10,
+    max_lines_per_second: float | None = None,
+    burst: int = 20,
+) -> SuppressionPolicy | None:
+    """
+    Only write metric lines that changed, see SuppressionPolicy. A delta of None writes every line again.
+
+    Returns:
+        SuppressionPolicy | None: The policy now in use.
+    """
+    global _POLICY  # pylint: disable=global-statement
+    _POLICY = None if delta is None else SuppressionPolicy(delta, heartbeat, max_lines_per_second, burst)
+    return _POLICY
+
+
+def get_suppression_policy() -> SuppressionPolicy | None:
+    """Return the policy in use, None when every line is written."""
+    return _POLICY
@@ -0,0 +1,118 @@
+# sparkle_log/thread_metrics.py
+"""
+Per-thread CPU of the current process, attributed to Python thread names.
+
+psutil.Process().threads() returns the CPU times of every OS thread. On Linux and Windows the ids match
+threading.Thread.native_id, so they can be named after the Python thread that owns them. Names are looked up with
+threading.enumerate() only when the set of thread ids changes.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+import psutil
+
+from sparkle_log.custom_types import NumberType
+
+THREAD_METRICS = ("threads",)
+
+
+class ThreadSampler:
+    """Sample per-thread CPU usage and rank the busiest threads."""
+
+    def __init__(self, top_k: int = 3) -> None:
+        """Initialize the sampler, top_k is how many threads are listed per interval."""
+        self.top_k = top_k
+        self.top: list[tuple[str, float]] = []
+        self._process: psutil.Process | None = None
+        self._last_times: dict[int, float] = {}
+        self._last_sampled_at: float | None = None
+        self._names: dict[int, str] = {}
+        self._known_ids: frozenset[int] = frozenset()
+
+    def _handle(self) -> psutil.Process:
+        """Return the cached handle of the current process, recreated after a fork."""
+        if self._process is None or self._process.pid != os.getpid():
+            self._process = psutil.Process()
+            self._last_times = {}
+            self._last_sampled_at = None
+        return self._process
+
+    def _name(self, thread_id: int) -> str:
+        """Python name of an OS thread, or its id for threads Python did not start."""
+        return self._names.get(thread_id, f"tid {thread_id}")
+
+    def _refresh_names(self, thread_ids: frozenset[int]) -> None:
+        """Rebuild the id to name map if threads were started or stopped since the last lookup."""
+        if thread_ids == self._known_ids:
+            return
+        self._names = {t.native_id: t.name for t in threading.enumerate() if t.native_id is not None}
+        self._known_ids = thread_ids
+
+    def sample(self) -> dict[str, NumberType]:
+        """
+        Read the CPU time of every thread and rank them by use since the previous sample.
+
+        Returns:
+            dict[str, NumberType]: threads is the CPU % of the busiest thread, None on the first sample or when
+            threads cannot be read. The ranking is kept in self.top.
+        """
+        now = time.monotonic()
+        try:
+            threads = self._handle().threads()
+        except psutil.Error:
+            self.top = []
+            return {"threads": None}
+        times = {thread.id: thread.user_time + thread.system_time for thread in threads}
+        self._refresh_names(frozenset(times))
+
+        previous, self._last_times = self._last_times, times
+        last_sampled_at, self._last_sampled_at = self._last_sampled_at, now
+        if last_sampled_at is None or now <= last_sampled_at:
+            self.top = []
+            return {"threads": None}
+        elapsed = now - last_sampled_at
+        usage = [
+            (self._name(thread_id), (cpu - previous[thread_id]) / elapsed * 100)
+            for thread_id, cpu in times.items()
+            if thread_id in previous
+        ]
+        usage.sort(key=lambda item: item[1], reverse=True)
+        self.top = usage[: self.top_k]
+        return {"threads": self.top[0][1] if self.top else 0}
+
+    def format_top(self) -> str | None:
+        """The 'threads top 3: worker-1 85%, ...' log line for the latest sample, None if there is none."""
+        if not self.top:
+            return None
+        ranked = ", ".join(f"{name} {cpu:.0f}%" for name, cpu in self.top)
+        return f"threads top {len(self.top)}: {ranked}"
+
+
+_SAMPLER: ThreadSampler | None = None
+
+
+def configure_thread_metrics(top_k: int = 3) -> ThreadSampler:
+    """
+    Configure the threads metric.
+
+    Args:
+        top_k: Number of busiest threads listed each interval.
+
+    Returns:
+        ThreadSampler: The sampler now used by the threads metric.
+    """
+    global _SAMPLER  # pylint: disable=global-statement
+    _SAMPLER = ThreadSampler(top_k)
+    return _SAMPLER
+
+
+def get_thread_sampler() -> ThreadSampler:
+    """Return the sampler used by the threads metric, creating a default one."""
+    global _SAMPLER  # pylint: disable=global-statement
+    if _SAMPLER is None:
+        _SAMPLER = ThreadSampler()
+    return _SAMPLER
@@ -2,7 +2,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from sparkle_log.__main__ import log_memory_and_cpu_cli
+from sparkle_log.__main__ import log_memory_and_cpu_cli, main
 
 
 @pytest.mark.parametrize(
@@ -184,3 +184,91 @@ def test_log_memory_and_cpu_cli_empty_metrics(mock_system):
     ), "MetricsLoggingContext context manager was not entered"
     assert MockMetricsLoggingContext.return_value.__exit__.called, "MetricsLoggingContext context manager did not exit"
     mock_sleep.assert_called(), "Expected time.sleep to be called, indicating the function proceeded with execution."
+
+
+def test_main_run_subcommand():
+    with (
+        patch("sparkle_log.__main__.run_command", return_value=3) as mock_run,
+        patch("sparkle_log.__main__.configure_logging") as mock_logging,
+    ):
+        exit_code = main(["run", "--interval", "0.5", "--children", "--", "python", "-c", "pass"])
+
+    assert exit_code == 3
+    mock_logging.assert_called_once_with(None)
+    mock_run.assert_called_once_with(
+        ["python", "-c", "pass"], ("process_cpu", "process_rss", "process_threads"), 0.5, "bar", True, None
+    )
+
+
+def test_main_attach_subcommand(tmp_path):
+    output = str(tmp_path / "out.log")
+    with (
+        patch("sparkle_log.__main__.attach_process", return_value=0) as mock_attach,
+        patch("sparkle_log.__main__.configure_logging") as mock_logging,
+    ):
+        exit_code = main(["attach", "--pid", "42", "--metrics", "process_cpu,cpu", "--output", output])
+
+    assert exit_code == 0
+    mock_logging.assert_called_once_with(output)
+    mock_attach.assert_called_once_with(42, ("process_cpu", "cpu"), 1.0, "bar", False, None)
+
+
+def test_main_attach_live():
+    with (
+        patch("sparkle_log.__main__.attach_process", return_value=0) as mock_attach,
+        patch("sparkle_log.__main__.configure_logging"),
+    ):
+        main(["attach", "--pid", "42", "--live", "--max-fps", "5"])
+
+    dashboard = mock_attach.call_args[0][5]
+    assert dashboard.min_frame_seconds == pytest.approx(0.2)
+
+
+def test_main_live_demo():
+    with (
+        patch("sparkle_log.__main__.monitor_until_exit") as mock_monitor,
+        patch("sparkle_log.__main__.configure_logging"),
+    ):
+        assert main(["--live", "--duration", "0", "--metrics", "memory"]) == 0
+
+    assert mock_monitor.call_args[0][1] == ("memory",)
+    assert mock_monitor.call_args.kwargs["dashboard"] is not None
+
+
+def test_main_run_without_command():
+    with patch("sparkle_log.__main__.configure_logging"):
+        assert main(["run"]) == 2
+
+
+def test_main_run_rejects_unknown_metrics(capsys):
+    with (
+        patch("sparkle_log.__main__.configure_logging"),
+        patch("sparkle_log.__main__.run_command") as mock_run,
+    ):
+        assert main(["run", "--metrics", "process_cpu,proces_rss", "--", "python", "-c", "pass"]) == 2
+    mock_run.assert_not_called()
+    assert "unknown --metrics proces_rss" in capsys.readouterr().err
+
+
+def test_main_attach_accepts_per_device_metrics():
+    with (
+        patch("sparkle_log.__main__.configure_logging"),
+        patch("sparkle_log.__main__.attach_process", return_value=0) as mock_attach,
+    ):
+        assert main(["attach", "--pid", "42", "--metrics", "net_rx:eth0,cpu"]) == 0
+    assert mock_attach.call_args[0][1] == ("net_rx:eth0", "cpu")
+
+
+def test_main_render_subcommand(tmp_path, capsys):
+    path = tmp_path / "samples.csv"
+    path.write_text("time,cpu,memory\n" + "".join(f"{t},{t % 5},50\n" for t in range(100)), encoding="utf-8")
+
+    assert main(["render", str(path), "--metrics", "cpu", "--start", "10", "--percentiles", ""]) == 0
+
+    out = capsys.readouterr().out
+    assert out.startswith("Summary cpu: 89.0s, 90 samples | min, mean, max (0, 2.0, 4)%")
+    assert "memory" not in out
+
+
+def test_main_render_missing_file(tmp_path):
+    assert main(["render", str(tmp_path / "missing.csv")]) == 2
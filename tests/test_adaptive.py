@@ -0,0 +1,101 @@
+import math
+import time
+from threading import Event
+from unittest.mock import patch
+
+import pytest
+
+from sparkle_log import log_writer as LW
+from sparkle_log.adaptive import INTERVAL_METRIC, AdaptiveInterval
+from sparkle_log.scheduler import run_scheduler
+
+
+def test_interval_grows_while_calm_and_shrinks_on_change():
+    controller = AdaptiveInterval(10, 1, 60, window=3)
+    for _ in range(3):
+        interval = controller.update({"cpu": 20, "memory": 50})
+    assert interval == 15
+    assert controller.update({"cpu": 21, "memory": 50}) == 22.5
+    assert controller.update({"cpu": 80, "memory": 50}) == 15
+    for i in range(10):
+        controller.update({"cpu": 5 if i % 2 else 95})
+    assert controller.interval == 1
+
+
+def test_interval_clamped_and_ignores_its_own_metric():
+    controller = AdaptiveInterval(100, 1, 60, window=2)
+    assert controller.interval == 60
+    controller.update({INTERVAL_METRIC: 1000, "cpu": None})
+    assert controller.update({INTERVAL_METRIC: 60000}) == 60
+    assert INTERVAL_METRIC not in controller.history
+    with pytest.raises(ValueError):
+        AdaptiveInterval(10, 5, 1)
+
+
+def test_scheduler_reschedules_and_reports_interval():
+    stop_event = Event()
+    calm = {"cpu": 10}
+
+    def run_ticks(_seconds):
+        tick = mock_schedule.Scheduler.return_value.every.return_value.seconds.do.call_args[0][0]
+        for _ in range(5):
+            tick()
+        stop_event.set()
+
+    with (
+        patch("sparkle_log.scheduler.schedule") as mock_schedule,
+        patch("sparkle_log.scheduler.log_system_metrics", return_value=calm) as mock_log,
+        patch("sparkle_log.scheduler.time.sleep", side_effect=run_ticks) as mock_sleep,
+    ):
+        run_scheduler(stop_event, ("cpu",), 2, summary=False, adaptive=(0.5, 30))
+
+    job = mock_schedule.Scheduler.return_value.every.return_value.seconds.do.return_value
+    assert job.interval == 3
+    mock_sleep.assert_called_once_with(0.5)
+    custom_metrics = mock_log.call_args[0][2]
+    assert custom_metrics[INTERVAL_METRIC]() == 3000
+
+
+def test_samples_are_timestamped():
+    LW.READINGS.clear()
+    with patch.object(LW.psutil, "virtual_memory") as vm:
+        vm.return_value.percent = 40
+        LW.collect_system_metrics(("memory",))
+        LW.collect_system_metrics(("memory",))
+    times = LW.snapshot_timestamps(("memory",))["memory"]
+    assert len(times) == len(LW.READINGS["memory"]) == 30
+    assert all(math.isnan(t) for t in times[:-2])
+    assert times[-2] <= times[-1]
+    LW.READINGS.clear()
+
+
+def test_byte_rates_are_judged_relative_to_their_mean():
+    controller = AdaptiveInterval(10, 1, 60, window=3)
+    # A few KB/s of jitter on a 50 MB/s stream is steady, although far above any absolute threshold.
+    for value in (50_000_000, 50_004_000, 49_998_000):
+        interval = controller.update({"net_rx": value})
+    assert interval == 15
+    assert controller.update({"net_rx": 20_000_000}) == 10
+    # An idle disk going from 0 to a trickle is a change.
+    controller = AdaptiveInterval(10, 1, 60, window=2)
+    controller.update({"disk_read": 0})
+    controller.update({"disk_read": 0})
+    assert controller.update({"disk_read": 0}) == 22.5
+    assert controller.update({"disk_read": 4096}) == 15
+
+
+def test_scheduler_honours_fractional_intervals():
+    ticks = []
+    stop_event = Event()
+
+    def count(*_args, **_kwargs):
+        ticks.append(1)
+        if len(ticks) == 2:
+            stop_event.set()
+        return {"cpu": 20}
+
+    with patch("sparkle_log.scheduler.log_system_metrics", side_effect=count):
+        started = time.monotonic()
+        run_scheduler(stop_event, ("cpu",), 1, summary=False, adaptive=(0.2, 0.3))
+    # Two ticks at most 0.3s apart; an interval rounded to whole seconds would take at least 2s.
+    assert time.monotonic() - started < 1.5
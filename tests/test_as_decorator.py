@@ -3,6 +3,7 @@ from unittest.mock import Mock, patch
 import pytest
 
 from sparkle_log.as_decorator import monitor_metrics_on_call
+from sparkle_log.timing import CallTimer
 
 
 @pytest.fixture
@@ -75,3 +76,66 @@ def test_monitor_metrics_handles_exception_from_logger_enabled_check(
     assert not mock_thread.called
     assert not mock_run_scheduler.called
     assert not mock_func.called
+
+
+def test_call_timer_roll():
+    timer = CallTimer("work")
+    for wall_us in (10, 30, 20, 1000):
+        timer.record(wall_us * 1000, 5000)
+
+    interval = timer.roll()
+
+    assert interval == {"work_calls": 4, "work_p50_us": 20, "work_max_us": 1000, "work_cpu_us": 5}
+    assert timer.roll() == {"work_calls": 0, "work_p50_us": None, "work_max_us": None, "work_cpu_us": None}
+
+
+def test_call_timer_custom_metrics_share_one_roll():
+    timer = CallTimer("work")
+    timer.record(2000, 1000)
+    callbacks = timer.custom_metrics()
+
+    assert [fn() for fn in callbacks.values()] == [1, 2, 2, 1]
+
+
+def test_timing_records_calls_without_thread_per_call(mock_graphs_enabled, mock_thread, mock_run_scheduler):
+    mock_graphs_enabled.return_value = True
+
+    @monitor_metrics_on_call(metrics=("cpu",), interval=1, timing=True)
+    def work(x):
+        return x + 1
+
+    assert [work(i) for i in range(5)] == [1, 2, 3, 4, 5]
+
+    mock_thread.assert_called_once()
+    assert mock_thread.call_args.kwargs["daemon"] is True
+    custom_metrics = mock_thread.call_args.kwargs["args"][4]
+    assert list(custom_metrics) == ["work_calls", "work_p50_us", "work_max_us", "work_cpu_us"]
+    assert work.sparkle_timer.roll()["work_calls"] == 5
+
+
+@pytest.mark.asyncio
+async def test_timing_async(mock_graphs_enabled, mock_thread, mock_run_scheduler):
+    mock_graphs_enabled.return_value = True
+
+    @monitor_metrics_on_call(timing=True)
+    async def work():
+        return "done"
+
+    assert await work() == "done"
+    assert work.sparkle_timer.roll()["work_calls"] == 1
+
+
+def test_timing_monitor_restarts_after_stop(mock_graphs_enabled, mock_thread, mock_run_scheduler):
+    mock_graphs_enabled.return_value = True
+
+    @monitor_metrics_on_call(metrics=("cpu",), interval=1, timing=True)
+    def work():
+        return 1
+
+    work()
+    first_stop = mock_thread.call_args.kwargs["args"][0]
+    work.sparkle_monitor.stop()
+    assert first_stop.is_set()
+    work()
+    assert mock_thread.call_count == 2
+    assert not mock_thread.call_args.kwargs["args"][0].is_set()
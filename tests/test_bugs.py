@@ -97,48 +97,34 @@ class TestBug3BarStyleFallthrough:
 
 
 # ---------------------------------------------------------------------------
-# Bug 4: scheduler uses global schedule — concurrent instances interfere
-# File: sparkle_log/scheduler.py, line 23
-# schedule.every() uses the module-level default scheduler. Multiple
-# concurrent context managers/decorators share it, causing job leakage.
-# Jobs are also never cleared when the stop event is set.
+# Bug 4 (fixed): scheduler used the global schedule — concurrent instances interfered
+# File: sparkle_log/scheduler.py
+# schedule.every() used the module-level default scheduler, so concurrent
+# context managers/decorators shared it and jobs were never cleared when the
+# stop event was set. Each run now has its own scheduler, cleared on stop.
 # ---------------------------------------------------------------------------
 class TestBug4GlobalScheduler:
-    def test_scheduler_uses_global_schedule(self):
-        """Jobs accumulate in the global scheduler and are never cleaned up."""
-        # Clear any pre-existing jobs
+    def test_scheduler_does_not_use_global_schedule(self):
+        """No job goes to the global scheduler, before or after stop."""
         schedule_mod.clear()
-        initial_jobs = len(schedule_mod.jobs)
 
         stop_event = threading.Event()
 
-        # Start scheduler in a thread
         t = threading.Thread(
             target=run_scheduler,
             args=(stop_event, ("cpu",), 60, "bar", None),
         )
         t.start()
 
-        # Let it register the job
         time.sleep(0.1)
+        assert not schedule_mod.jobs, "Job should live in the run's own scheduler"
 
-        # Job was registered globally
-        jobs_after_start = len(schedule_mod.jobs)
-        assert jobs_after_start > initial_jobs, "Job should be registered"
-
-        # Stop the scheduler
         stop_event.set()
         t.join(timeout=5)
+        assert not schedule_mod.jobs
 
-        # Bug: job is NEVER removed from the global scheduler
-        jobs_after_stop = len(schedule_mod.jobs)
-        assert jobs_after_stop > initial_jobs, "Demonstrating the bug: job remains in global scheduler after stop"
-
-        # Clean up for other tests
-        schedule_mod.clear()
-
-    def test_two_schedulers_share_global_state(self):
-        """Two concurrent schedulers interfere via the shared global scheduler."""
+    def test_two_schedulers_do_not_share_state(self):
+        """Two concurrent schedulers keep their jobs apart."""
         schedule_mod.clear()
 
         stop1 = threading.Event()
@@ -157,19 +143,14 @@ class TestBug4GlobalScheduler:
         t2.start()
 
         time.sleep(0.1)
-
-        # Bug: both jobs are in the same global scheduler
-        assert len(schedule_mod.jobs) == 2, "Demonstrating the bug: both schedulers share the global job list"
+        assert not schedule_mod.jobs
 
         stop1.set()
         stop2.set()
         t1.join(timeout=5)
         t2.join(timeout=5)
 
-        # Bug: both jobs still linger
-        assert len(schedule_mod.jobs) == 2, "Demonstrating the bug: jobs are never cleaned up"
-
-        schedule_mod.clear()
+        assert not schedule_mod.jobs
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,117 @@
+import logging
+import os
+from threading import Event
+from unittest.mock import patch
+
+import psutil
+import pytest
+
+from sparkle_log import process_metrics
+from sparkle_log.burst import BurstCapture, TriggerReader, configure_burst_capture, get_burst_capture
+from sparkle_log.graphs import GLOBAL_LOGGER
+from sparkle_log.scheduler import run_scheduler
+
+
+@pytest.fixture(autouse=True)
+def _no_capture():
+    configure_burst_capture(None)
+    yield
+    configure_burst_capture(None)
+
+
+def test_watch_fills_ring_until_trigger(caplog):
+    capture = BurstCapture({"cpu": 90}, rate_hz=100, burst_seconds=0.05, pre_trigger_seconds=2)
+    readings = iter([{"cpu": 10}, {"cpu": 20}, {"cpu": 30}, {"cpu": 95}])
+    with (
+        caplog.at_level(logging.INFO, logger=GLOBAL_LOGGER.name),
+        patch.object(capture.reader, "read", side_effect=lambda: next(readings)),
+    ):
+        assert not capture.watch()
+        assert not capture.watch()
+        assert not capture.watch()
+        assert list(capture.ring["cpu"]) == [20, 30]
+        assert capture.watch()
+
+    assert capture.pre_trigger == {"cpu": [20, 30]}
+    assert "Burst capture started: cpu 95 > 90" in caplog.text
+
+
+def test_capture_logs_incident_and_drops_back(caplog):
+    capture = BurstCapture({"cpu": 90}, rate_hz=200, burst_seconds=0.05)
+    with (
+        caplog.at_level(logging.INFO, logger=GLOBAL_LOGGER.name),
+        patch.object(capture.reader, "read", return_value={"cpu": 95}),
+    ):
+        assert capture.watch()
+        capture.capture_for(1)
+
+    assert not capture.bursting
+    (line,) = [r.message for r in caplog.records if r.message.startswith("Burst cpu:")]
+    assert "at 200 Hz (cpu 95 > 90) | min, mean, max (95, 95, 95)% | before - | " in line
+    assert len(capture.burst["cpu"]) == 0
+
+
+def test_burst_window_is_bounded():
+    capture = BurstCapture({"memory": 85}, rate_hz=10, burst_seconds=1)
+    assert capture.burst["memory"].maxlen == 10
+
+
+def test_scheduler_watches_between_ticks():
+    configure_burst_capture({"cpu": 90})
+    stop_event = Event()
+    with (
+        patch("sparkle_log.scheduler.schedule"),
+        patch("sparkle_log.scheduler.time.sleep", side_effect=lambda _: stop_event.set()),
+        patch.object(get_burst_capture(), "watch", return_value=True) as mock_watch,
+        patch.object(get_burst_capture(), "capture_for", side_effect=lambda _: stop_event.set()) as mock_capture,
+    ):
+        run_scheduler(stop_event, ("cpu",), 10, summary=False)
+    mock_watch.assert_called_once()
+    mock_capture.assert_called_once_with(1)
+
+
+def test_trigger_reader_leaves_shared_cpu_baseline_alone():
+    times = psutil.cpu_times()
+    with (
+        patch("sparkle_log.burst.psutil.cpu_percent") as mock_cpu_percent,
+        patch("sparkle_log.burst.psutil.cpu_times", return_value=times) as mock_cpu_times,
+    ):
+        reader = TriggerReader(("cpu", "memory", "process_rss"))
+        mock_cpu_times.return_value = times._replace(user=times.user + 3, idle=times.idle + 1)
+        readings = reader.read()
+    mock_cpu_percent.assert_not_called()
+    assert readings["cpu"] == 75
+    assert readings["memory"] is not None
+    assert readings["process_rss"] > 0
+
+
+def test_trigger_reader_watches_configured_process(monkeypatch):
+    monkeypatch.setattr(process_metrics, "_SAMPLER", None)
+    parent = os.getppid()
+    reader = TriggerReader(("process_rss",))
+    process_metrics.configure_process_metrics(pid=parent)
+    readings = reader.read()
+
+    assert reader._process.pid == parent
+    assert abs(readings["process_rss"] - psutil.Process(parent).memory_info().rss // 1024**2) <= 5
+
+
+def test_stateful_metrics_cannot_trigger():
+    with pytest.raises(ValueError):
+        BurstCapture({"net_rx": 1000})
+
+
+def test_scheduler_finishes_burst_on_stop(caplog):
+    capture = configure_burst_capture({"cpu": 90})
+    stop_event = Event()
+    with (
+        caplog.at_level(logging.INFO, logger=GLOBAL_LOGGER.name),
+        patch("sparkle_log.scheduler.schedule"),
+        patch.object(capture.reader, "read", return_value={"cpu": 99}),
+        patch.object(capture, "capture_for", side_effect=lambda _: stop_event.set()),
+    ):
+        capture.watch()
+        capture.burst["cpu"].append(99)
+        run_scheduler(stop_event, ("cpu",), 10, summary=False)
+    assert not capture.bursting
+    assert "Burst cpu: 1 samples" in caplog.text
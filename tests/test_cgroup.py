@@ -0,0 +1,70 @@
+from unittest.mock import patch
+
+import pytest
+
+from sparkle_log.cgroup import CgroupSampler, PreadFile, find_cgroup_dir
+
+
+@pytest.fixture
+def cgroup_dir(tmp_path):
+    (tmp_path / "cgroup.controllers").write_text("cpu memory io\n")
+    group = tmp_path / "kubepods" / "pod1"
+    group.mkdir(parents=True)
+    (group / "cpu.max").write_text("200000 100000\n")
+    (group / "cpu.stat").write_text("usage_usec 1000000\nnr_periods 100\nnr_throttled 0\nthrottled_usec 0\n")
+    (group / "memory.max").write_text("1000\n")
+    (group / "memory.current").write_text("250\n")
+    (group / "memory.events").write_text("low 0\nhigh 0\nmax 3\noom 1\noom_kill 1\n")
+    proc_self_cgroup = tmp_path / "proc_self_cgroup"
+    proc_self_cgroup.write_text("0::/kubepods/pod1\n")
+    return tmp_path, group, proc_self_cgroup
+
+
+def test_find_cgroup_dir(cgroup_dir):
+    root, group, proc_self_cgroup = cgroup_dir
+    assert find_cgroup_dir(str(root), str(proc_self_cgroup)) == str(group)
+
+
+def test_find_cgroup_dir_not_v2(tmp_path):
+    assert find_cgroup_dir(str(tmp_path), str(tmp_path / "missing")) is None
+
+
+def test_pread_file_sees_new_contents(tmp_path):
+    path = tmp_path / "memory.current"
+    path.write_text("1\n")
+    handle = PreadFile(str(path))
+    assert handle.read() == "1\n"
+    with open(path, "r+", encoding="utf-8") as f:
+        f.write("22\n")
+    assert handle.read() == "22\n"
+    handle.close()
+
+
+def test_sampler_reads_limits_and_deltas(cgroup_dir):
+    _, group, _ = cgroup_dir
+    sampler = CgroupSampler(str(group))
+    names = ["container_cpu", "container_throttled", "container_memory", "container_oom_kills"]
+    with patch("sparkle_log.cgroup.time.monotonic", side_effect=[10.0, 12.0]):
+        first = sampler.sample(names)
+        (group / "cpu.stat").write_text("usage_usec 3000000\nnr_periods 120\nnr_throttled 5\nthrottled_usec 9\n")
+        (group / "memory.events").write_text("low 0\nhigh 0\nmax 3\noom 2\noom_kill 3\n")
+        second = sampler.sample(names)
+    sampler.close()
+
+    assert first == {
+        "container_cpu": None,
+        "container_throttled": None,
+        "container_memory": 25,
+        "container_oom_kills": None,
+    }
+    # 2 CPU seconds over 2 wall seconds against a 2 CPU quota.
+    assert second["container_cpu"] == pytest.approx(50)
+    assert second["container_throttled"] == pytest.approx(25)
+    assert second["container_oom_kills"] == 2
+
+
+def test_sampler_outside_cgroup():
+    assert CgroupSampler(None).sample(["container_memory", "container_cpu"]) == {
+        "container_memory": None,
+        "container_cpu": None,
+    }
@@ -0,0 +1,78 @@
+import io
+import os
+from unittest.mock import patch
+
+from sparkle_log.dashboard import LiveDashboard, diff_row, format_row
+
+
+def test_diff_row_unchanged_is_empty():
+    assert diff_row(3, "cpu 10%", "cpu 10%") == ""
+
+
+def test_diff_row_rewrites_only_changed_cells():
+    old = "cpu        10%   1/5/10 ▁▂▃"
+    new = "cpu        12%   1/5/12 ▁▂▃"
+    output = diff_row(1, old, new)
+    assert output.startswith("\x1b[2;13H")
+    assert "cpu" not in output
+    assert len(output) < len(new)
+
+
+def test_diff_row_clears_shorter_row():
+    output = diff_row(0, "memory 100%", "memory 9%")
+    assert output.endswith("9%  ")
+
+
+def test_diff_row_wide_characters_rewrite_row():
+    assert diff_row(0, "faces 😞😐", "faces 😐😁") == "\x1b[1;1Hfaces 😐😁\x1b[K"
+
+
+def test_format_row_all_none():
+    assert format_row("cpu", [None, None], name_width=4) == "cpu       -"
+
+
+def test_dashboard_caps_redraw_rate():
+    stream = io.StringIO()
+    dashboard = LiveDashboard(stream=stream, max_fps=0.001)
+
+    assert dashboard.update({"cpu": [None, 10]})
+    assert not dashboard.update({"cpu": [10, 20]})
+    assert dashboard.frames_skipped == 1
+    assert dashboard.update({"cpu": [10, 20]}, force=True)
+
+
+def test_dashboard_second_frame_is_a_diff():
+    stream = io.StringIO()
+    readings = {f"metric_{i}": [i, i + 1] for i in range(200)}
+    dashboard = LiveDashboard(stream=stream, max_fps=0)
+    with patch("sparkle_log.dashboard.shutil.get_terminal_size", return_value=os.terminal_size((120, 300))):
+        dashboard.update(readings)
+        first_frame = len(stream.getvalue())
+
+        readings["metric_7"] = [8, 50]
+        dashboard.update(readings)
+    second_frame = len(stream.getvalue()) - first_frame
+
+    assert second_frame < first_frame / 100
+    dashboard.close()
+    assert stream.getvalue().endswith("\x1b[?25h\n")
+
+
+def test_dashboard_clips_rows_to_terminal():
+    stream = io.StringIO()
+    dashboard = LiveDashboard(stream=stream, max_fps=0)
+    with patch("sparkle_log.dashboard.shutil.get_terminal_size", return_value=os.terminal_size((80, 6))):
+        dashboard.update({f"metric_{i}": [i] for i in range(10)})
+    rows = stream.getvalue().split("\n")
+    assert len(rows) == 5
+    assert rows[-1] == "... 7 more metrics, enlarge the terminal to see them"
+
+
+def test_dashboard_close_draws_skipped_frame():
+    stream = io.StringIO()
+    dashboard = LiveDashboard(stream=stream, max_fps=0.001)
+    dashboard.update({"cpu": [10]})
+    assert not dashboard.update({"cpu": [10, 77]})
+    dashboard.close()
+    assert "77" in stream.getvalue()
+    assert dashboard.frames_drawn == 2
@@ -0,0 +1,62 @@
+import pytest
+
+from sparkle_log.encoding import (
+    BLOCK_HEADER,
+    BlockEncoder,
+    archive_store,
+    encode_samples,
+    iter_samples,
+    summarize_block,
+)
+from sparkle_log.store import MmapStore
+
+
+def test_round_trip_keeps_times_values_and_gaps():
+    samples = [
+        (1000.0, 10),
+        (1001.0, 10),
+        (1002.003, 11),
+        (1003.0, None),
+        (1010.0, 12.5),
+        (1011.0, -3),
+        (5_000_000.0, 1e12),
+        (5_000_000.5, 0),
+    ]
+    assert list(iter_samples(encode_samples(samples))) == samples
+
+
+def test_steady_series_takes_few_bytes_per_sample():
+    block = encode_samples((1_700_000_000 + second, 40 + (second // 100) % 3) for second in range(3600))
+    assert (len(block) - BLOCK_HEADER.size) / 3600 < 0.5
+
+
+def test_encoder_can_append_after_to_bytes():
+    encoder = BlockEncoder()
+    assert not list(iter_samples(encoder.to_bytes()))
+    encoder.append(1.0, 1)
+    encoder.append(2.0, 2)
+    encoder.to_bytes()
+    encoder.append(3.0, 3)
+    assert [value for _, value in iter_samples(encoder.to_bytes())] == [1, 2, 3]
+
+
+def test_truncated_block_raises():
+    block = encode_samples((float(t), t * 7) for t in range(10))
+    with pytest.raises(ValueError):
+        list(iter_samples(block[:-3]))
+
+
+def test_summarize_block_streams_stats():
+    summary = summarize_block(encode_samples((float(t), v) for t, v in enumerate([1, None, 3, 5])))
+    assert (summary.count, summary.minimum, summary.mean, summary.maximum) == (3, 1, 3, 5)
+    assert summary.series.values() == [1, 3, 5]
+
+
+def test_archive_store_compresses_per_metric(tmp_path):
+    store = MmapStore(str(tmp_path), session="s")
+    for at in range(5):
+        store.on_tick({"cpu": at, "memory": 50}, float(at))
+    store.close()
+    blocks = archive_store(store.path)
+    assert [v for _, v in iter_samples(blocks["cpu"])] == [0, 1, 2, 3, 4]
+    assert [v for _, v in iter_samples(blocks["memory"])] == [50] * 5
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from sparkle_log import log_writer as LW
+from sparkle_log.as_context_manager import MetricsLoggingContext
+from sparkle_log.io_metrics import CounterRates, IOSampler, format_bytes_rate
+
+
+def test_counter_rates_per_second():
+    rates = CounterRates()
+    assert rates.rate("net_rx", 1000, now=10.0) is None
+    assert rates.rate("net_rx", 3000, now=12.0) == 1000
+
+
+def test_counter_rates_reset_is_unknown():
+    rates = CounterRates()
+    rates.rate("net_tx", 2**40, now=0.0)
+    assert rates.rate("net_tx", 5, now=1.0) is None
+    # A small counter going backwards is a reset too, not a 32-bit wrap: psutil already corrects wraps.
+    rates.rate("disk_read", 2**32 - 100, now=2.0)
+    assert rates.rate("disk_read", 100, now=3.0) is None
+    assert rates.rate("disk_read", 300, now=4.0) == 200
+
+
+def _net(rx, tx):
+    return SimpleNamespace(bytes_recv=rx, bytes_sent=tx)
+
+
+def test_io_sampler_total_and_per_nic():
+    sampler = IOSampler()
+    totals = iter([_net(0, 0), _net(4096, 1024)])
+    per_nic = iter([{"eth0": _net(0, 0)}, {"eth0": _net(2048, 0)}])
+
+    def fake_net_io_counters(pernic=False):
+        return next(per_nic) if pernic else next(totals)
+
+    with (
+        patch("sparkle_log.io_metrics.psutil.net_io_counters", side_effect=fake_net_io_counters),
+        patch("sparkle_log.io_metrics.psutil.disk_io_counters") as disk,
+        patch("sparkle_log.io_metrics.time.monotonic", side_effect=[0.0, 2.0]),
+    ):
+        first = sampler.sample(["net_rx", "net_tx", "net_rx:eth0", "net_rx:wlan9"])
+        second = sampler.sample(["net_rx", "net_tx", "net_rx:eth0", "net_rx:wlan9"])
+
+    assert first == {"net_rx": None, "net_tx": None, "net_rx:eth0": None, "net_rx:wlan9": None}
+    assert second == {"net_rx": 2048, "net_tx": 512, "net_rx:eth0": 1024, "net_rx:wlan9": None}
+    disk.assert_not_called()
+
+
+def test_io_sampler_no_disks():
+    with patch("sparkle_log.io_metrics.psutil.disk_io_counters", return_value=None):
+        assert IOSampler().sample(["disk_iops"]) == {"disk_iops": None}
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [(512, "512 B/s"), (1536, "1.5 KB/s"), (5 * 1024**2, "5.0 MB/s"), (3 * 1024**3, "3.0 GB/s")],
+)
+def test_format_bytes_rate(value, expected):
+    assert format_bytes_rate(value) == expected
+
+
+def test_log_line_scales_units(monkeypatch):
+    LW.READINGS.clear()
+    LW.READINGS["net_rx"] = [None] * 28 + [1024 * 1024]
+    monkeypatch.setattr(LW.IO_SAMPLER, "sample", lambda names: {"net_rx": 3 * 1024 * 1024})
+    with (
+        patch.object(LW.GLOBAL_LOGGER, "isEnabledFor", return_value=True),
+        patch.object(LW.GLOBAL_LOGGER, "info") as mock_info,
+    ):
+        LW.log_system_metrics(("net_rx",))
+    LW.READINGS.clear()
+
+    assert mock_info.call_args[0][0].startswith("net_rx: 3.0 MB/s | min, mean, max (1.0 MB/s, 2.0 MB/s, 3.0 MB/s) |")
+
+
+def test_context_manager_accepts_per_device_metrics():
+    with patch("sparkle_log.as_context_manager.GLOBAL_LOGGER.isEnabledFor", return_value=False):
+        with MetricsLoggingContext(metrics=("net_rx:eth0", "disk_iops"), interval=1):
+            pass
+    with pytest.raises(TypeError):
+        MetricsLoggingContext(metrics=("memory:eth0",), interval=1)
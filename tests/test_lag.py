@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from sparkle_log import log_writer as LW
+from sparkle_log.as_context_manager import MetricsLoggingContext
+from sparkle_log.graphs import GLOBAL_LOGGER
+from sparkle_log.lag import LOOP_LAG, WAKEUP_LAG, LagTracker, sample_lag, start_loop_lag_probe
+
+
+@pytest.fixture(autouse=True)
+def _clean_lag():
+    WAKEUP_LAG.take()
+    LOOP_LAG.take()
+    LW.READINGS.clear()
+    yield
+    LW.READINGS.clear()
+
+
+def test_lag_tracker_keeps_worst_until_taken():
+    tracker = LagTracker()
+    assert tracker.take() is None
+    tracker.record(0.002)
+    tracker.record(0.010)
+    tracker.record(-0.5)
+    assert tracker.take() == pytest.approx(10_000)
+    assert tracker.take() is None
+
+
+def test_start_loop_lag_probe_without_loop():
+    assert start_loop_lag_probe() is None
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_measures_blocked_loop():
+    probe = start_loop_lag_probe(period=0.01)
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)  # block the loop
+    await asyncio.sleep(0.02)
+    probe.cancel()
+
+    assert sample_lag(["loop_lag_us"])["loop_lag_us"] >= 50_000
+
+
+@pytest.mark.asyncio
+async def test_context_manager_starts_and_stops_probe():
+    prev_level = GLOBAL_LOGGER.level
+    GLOBAL_LOGGER.setLevel(logging.INFO)
+    try:
+        with MetricsLoggingContext(metrics=("loop_lag_us",), interval=1) as context:
+            probe = context.loop_lag_probe
+            assert probe is not None
+            await asyncio.sleep(0)
+    finally:
+        GLOBAL_LOGGER.setLevel(prev_level)
+    await asyncio.sleep(0)
+    assert probe.cancelled()
+
+
+def test_lag_metrics_log_in_us():
+    WAKEUP_LAG.record(0.025)
+    assert LW.collect_system_metrics(("wakeup_lag_us",)) == {"wakeup_lag_us": 25_000}
+
+
+def test_sub_millisecond_lag_is_not_truncated():
+    WAKEUP_LAG.record(0.0005)
+    assert LW.collect_system_metrics(("wakeup_lag_us",)) == {"wakeup_lag_us": 500}
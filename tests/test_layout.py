@@ -0,0 +1,70 @@
+from unittest.mock import patch
+
+import pytest
+
+from sparkle_log import log_writer as LW
+from sparkle_log.layout import CombinedLayout, configure_combined_output
+from sparkle_log.suppression import configure_suppression
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    LW.READINGS.clear()
+    yield
+    LW.READINGS.clear()
+    configure_combined_output(enabled=False)
+    configure_suppression(None)
+
+
+def test_fixed_columns_and_field_order():
+    layout = CombinedLayout(order=("memory", "cpu"), label_width=5, value_width=4)
+    line = layout.format_line({"cpu": ("43%", "▁▂▅"), "drive": ("22%", "▁▁▁"), "memory": ("61%", "▃▃▄")})
+    assert line == "mem    61% ▃▃▄ | cpu    43% ▁▂▅ | drive  22% ▁▁▁"
+
+
+def test_one_record_per_tick():
+    configure_combined_output(order=("memory",))
+    with (
+        patch.object(LW.GLOBAL_LOGGER, "info") as mock_info,
+        patch.object(LW.GLOBAL_LOGGER, "isEnabledFor", return_value=True),
+        patch.object(LW.psutil, "virtual_memory") as vm,
+    ):
+        vm.return_value.percent = 61
+        LW.log_system_metrics(("cpu", "memory"), custom_metrics={"queue": lambda: 7})
+        LW.log_system_metrics(("cpu", "memory"), custom_metrics={"queue": lambda: 7})
+
+    assert mock_info.call_count == 2
+    line = mock_info.call_args[0][0]
+    assert line.startswith("mem        61% ")
+    assert "| queue       7% " in line
+
+
+def test_combined_line_suppressed_when_nothing_changed():
+    configure_combined_output()
+    configure_suppression(delta=1, heartbeat=10)
+    with (
+        patch.object(LW.GLOBAL_LOGGER, "info") as mock_info,
+        patch.object(LW.GLOBAL_LOGGER, "isEnabledFor", return_value=True),
+        patch.object(LW.psutil, "virtual_memory") as vm,
+    ):
+        vm.return_value.percent = 61
+        for _ in range(3):
+            LW.log_system_metrics(("memory",))
+    assert mock_info.call_count == 1
+
+
+def test_threads_top_only_alongside_a_written_line():
+    configure_combined_output()
+    configure_suppression(delta=1, heartbeat=10)
+    with (
+        patch.object(LW.GLOBAL_LOGGER, "info") as mock_info,
+        patch.object(LW.GLOBAL_LOGGER, "isEnabledFor", return_value=True),
+        patch.object(LW, "get_thread_sampler") as mock_sampler,
+    ):
+        mock_sampler.return_value.sample.return_value = {"threads": 50}
+        mock_sampler.return_value.format_top.return_value = "threads top 1: main 50%"
+        for _ in range(3):
+            LW.log_system_metrics(("threads",))
+    lines = [call[0][0] for call in mock_info.call_args_list]
+    assert len(lines) == 2
+    assert lines[1] == "threads top 1: main 50%"
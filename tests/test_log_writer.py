@@ -1,7 +1,9 @@
 import logging
+import math
 from unittest.mock import Mock, patch
 
-from sparkle_log.log_writer import READINGS, log_system_metrics
+from sparkle_log import log_writer as LW
+from sparkle_log.log_writer import READINGS, log_system_metrics, place_in_time
 
 
 def test_log_system_metrics_does_not_log_when_logger_disabled(caplog):
@@ -33,3 +35,46 @@ def test_log_system_metrics_handles_metric_not_included(caplog):
         log_system_metrics(())  # Metrics list is empty
 
         assert len(caplog.records) == 0
+
+
+def test_place_in_time_shows_skipped_ticks():
+    nan = math.nan
+    series = [None, 1, 2, 3, 4]
+    times = [nan, 10.0, 20.0, 30.0, 60.0]
+    assert place_in_time(series, times) == [None, 1, 2, 3, None, None, 4]
+
+
+def test_place_in_time_ignores_jitter_and_missing_times():
+    series = [1, 2, 3, 4]
+    assert place_in_time(series, [0.0, 0.01, 0.05, 0.06]) == series
+    assert place_in_time(series, [1.0, 2.1, 2.9, 4.3]) == series
+    assert place_in_time(series, []) == series
+
+
+def test_paused_ticks_render_as_gap():
+    LW.READINGS.clear()
+    LW.TIMESTAMPS.clear()
+    with (
+        patch.object(LW.GLOBAL_LOGGER, "info") as mock_info,
+        patch.object(LW.GLOBAL_LOGGER, "isEnabledFor", return_value=True),
+        patch.object(LW.psutil, "virtual_memory") as vm,
+        patch("sparkle_log.log_writer.time.monotonic", side_effect=[1.0, 2.0, 3.0, 10.0]),
+    ):
+        vm.return_value.percent = 50
+        for _ in range(4):
+            log_system_metrics(("memory",))
+    assert LW.TIMESTAMPS["memory"].typecode == "d"
+    assert mock_info.call_args[0][0].endswith(" ▄▄▄      ▄")
+    LW.READINGS.clear()
+    LW.TIMESTAMPS.clear()
+
+
+def test_only_original_metrics_cut_to_two_characters():
+    with patch.object(LW.GLOBAL_LOGGER, "info") as mock_info:
+        LW._log_metric_series("cpu", [100], "bar")
+        LW._log_metric_series("process_cpu", [350], "bar")
+        LW._log_metric_series("loadavg", [120], "bar")
+    lines = [call[0][0] for call in mock_info.call_args_list]
+    assert lines[0].startswith("CPU   : 00% |")
+    assert lines[1].startswith("process_cpu: 350% |")
+    assert lines[2].startswith("loadavg: 120% |")
@@ -0,0 +1,187 @@
+import gc
+import importlib.util
+import json
+import socket
+import threading
+import weakref
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from sparkle_log.custom_types import BUILTIN_METRICS
+from sparkle_log.log_writer import metric_unit
+from sparkle_log.otlp import UNITS, OtlpExporter, open_otlp_exporter
+from sparkle_log.sinks import close_sinks
+
+
+def _metrics(request):
+    return {m["name"]: m for m in request["resourceMetrics"][0]["scopeMetrics"][0]["metrics"]}
+
+
+def test_batches_ticks_into_file_requests(tmp_path):
+    path = tmp_path / "otlp.jsonl"
+    exporter = OtlpExporter(path=str(path), flush_interval=10, bounds=(50.0,))
+    exporter.on_tick({"cpu": 40, "net_rx:eth0": 1024, "drive": None}, 100.0)
+    exporter.on_tick({"cpu": 60, "net_rx:eth0": 2048}, 105.0)
+    assert not path.exists()
+    exporter.on_tick({"cpu": 50}, 110.0)
+    exporter.on_tick({"cpu": 70}, 111.0)
+    exporter.close()
+
+    first, second = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    metrics = _metrics(first)
+    assert [p["asDouble"] for p in metrics["cpu"]["gauge"]["dataPoints"]] == [40.0, 60.0, 50.0]
+    assert metrics["cpu"]["unit"] == "%"
+    histogram = metrics["cpu.histogram"]["histogram"]["dataPoints"][0]
+    assert histogram["count"] == "3"
+    assert histogram["bucketCounts"] == ["2", "1"]
+    assert (histogram["min"], histogram["max"], histogram["sum"]) == (40.0, 60.0, 150.0)
+    assert histogram["startTimeUnixNano"] == str(100 * 10**9)
+    assert histogram["timeUnixNano"] == str(110 * 10**9)
+    assert metrics["net_rx"]["unit"] == "By/s"
+    assert metrics["net_rx"]["gauge"]["dataPoints"][0]["attributes"] == [
+        {"key": "device", "value": {"stringValue": "eth0"}}
+    ]
+    second_histogram = _metrics(second)["cpu.histogram"]["histogram"]["dataPoints"][0]
+    assert second_histogram["startTimeUnixNano"] == str(110 * 10**9)
+    assert exporter.exported_requests == 2
+
+
+def test_posts_to_http_endpoint():
+    received = []
+
+    class Collector(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append((self.headers["Content-Type"], self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Collector)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        exporter = OtlpExporter(endpoint=f"http://127.0.0.1:{server.server_address[1]}/v1/metrics", flush_interval=0)
+        exporter.on_tick({"queue": 3}, 1.0)
+    finally:
+        server.shutdown()
+        server.server_close()
+    content_type, body = received[0]
+    assert content_type == "application/json"
+    assert _metrics(json.loads(body))["queue"]["gauge"]["dataPoints"][0]["asDouble"] == 3.0
+    assert exporter.exported_requests == 1
+
+
+def test_retry_buffer_is_bounded():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    exporter = OtlpExporter(endpoint=f"http://127.0.0.1:{port}/v1/metrics", flush_interval=0, max_buffered=2)
+    for at in range(5):
+        exporter.on_tick({"cpu": at}, float(at))
+    assert len(exporter.buffer) == 2
+    assert (exporter.failed_exports, exporter.dropped_requests, exporter.exported_requests) == (5, 3, 0)
+    assert _metrics(exporter.buffer[0])["cpu"]["gauge"]["dataPoints"][0]["asDouble"] == 3.0
+
+
+def test_requires_one_destination():
+    with pytest.raises(ValueError):
+        OtlpExporter()
+    with pytest.raises(ValueError):
+        OtlpExporter(endpoint="http://127.0.0.1:4318/v1/metrics", path="x")
+
+
+@pytest.mark.skipif(importlib.util.find_spec("opentelemetry") is not None, reason="opentelemetry-proto is installed")
+def test_protobuf_needs_optional_package(tmp_path):
+    with pytest.raises(ImportError):
+        OtlpExporter(path=str(tmp_path / "out.bin"), encoding="protobuf")
+
+
+def test_every_builtin_metric_has_a_ucum_unit():
+    for metric in BUILTIN_METRICS:
+        assert metric_unit(metric).strip() in UNITS, metric
+    assert UNITS[metric_unit("process_rss").strip()] == "MiBy"
+    assert UNITS[metric_unit("disk_iops").strip()] == "1/s"
+    assert UNITS[metric_unit("handler_p50_us").strip()] == "us"
+
+
+def test_concurrent_ticks_and_flushes_lose_no_samples(tmp_path):
+    path = tmp_path / "otlp.jsonl"
+    exporter = OtlpExporter(path=str(path), flush_interval=1000)
+
+    def tick(offset):
+        for i in range(200):
+            exporter.on_tick({"cpu": 1}, float(offset * 1000 + i))
+
+    def flush():
+        for _ in range(50):
+            exporter.flush()
+
+    threads = [threading.Thread(target=tick, args=(n,)) for n in range(4)] + [threading.Thread(target=flush)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    exporter.close()
+
+    requests = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    points = sum(len(_metrics(r)["cpu"]["gauge"]["dataPoints"]) for r in requests)
+    assert points == 800
+    assert exporter.exported_requests == len(requests)
+
+
+def test_registered_exporter_is_flushed_at_exit(tmp_path):
+    path = tmp_path / "otlp.jsonl"
+    exporter = open_otlp_exporter(path=str(path), flush_interval=60)
+    exporter.on_tick({"cpu": 5}, 1.0)
+    close_sinks()
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 1
+
+
+def test_unregistered_exporter_is_not_kept_alive(tmp_path):
+    exporter = OtlpExporter(path=str(tmp_path / "otlp.jsonl"))
+    collected = weakref.ref(exporter)
+    del exporter
+    gc.collect()
+    assert collected() is None
+
+
+def test_protobuf_request_round_trips(tmp_path):
+    pytest.importorskip("opentelemetry.proto")
+    from opentelemetry.proto.collector.metrics.v1.metrics_service_pb2 import ExportMetricsServiceRequest
+
+    path = tmp_path / "otlp.bin"
+    exporter = OtlpExporter(path=str(path), encoding="protobuf", flush_interval=60)
+    exporter.on_tick({"cpu": 43, "net_rx:eth0": 1536.5}, 1.0)
+    exporter.on_tick({"cpu": 45, "net_rx:eth0": 2048}, 2.0)
+    exporter.close()
+
+    data = path.read_bytes()
+    size = int.from_bytes(data[:4], "big")
+    assert len(data) == 4 + size
+    request = ExportMetricsServiceRequest.FromString(data[4:])
+    assert request.resource_metrics[0].resource.attributes[0].value.string_value == "sparkle_log"
+    metrics = {m.name: m for m in request.resource_metrics[0].scope_metrics[0].metrics}
+    assert [p.as_double for p in metrics["cpu"].gauge.data_points] == [43, 45]
+    assert metrics["net_rx"].unit == "By/s"
+    assert metrics["net_rx"].gauge.data_points[0].attributes[0].value.string_value == "eth0"
+    histogram = metrics["cpu.histogram"].histogram
+    assert histogram.aggregation_temporality == 1
+    assert (histogram.data_points[0].count, histogram.data_points[0].sum) == (2, 88)
+    assert exporter.exported_requests == 1
+
+
+def test_unencodable_request_is_dropped_not_retried(tmp_path):
+    pytest.importorskip("opentelemetry.proto")
+    path = tmp_path / "otlp.bin"
+    exporter = OtlpExporter(path=str(path), encoding="protobuf")
+    with patch.object(exporter, "_request", return_value={"notAField": 1}):
+        exporter.on_tick({"cpu": 1}, 1.0)
+        exporter.flush()
+    assert (exporter.dropped_requests, exporter.failed_exports, len(exporter.buffer)) == (1, 0, 0)
+    exporter.on_tick({"cpu": 2}, 2.0)
+    exporter.flush()
+    assert exporter.exported_requests == 1
@@ -0,0 +1,56 @@
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from sparkle_log import log_writer as LW
+from sparkle_log.custom_types import is_builtin_metric
+from sparkle_log.graphs import GLOBAL_LOGGER
+from sparkle_log.overhead import OverheadCounters, get_overhead_counters, reset_overhead_counters
+
+
+@pytest.fixture(autouse=True)
+def _info_logging():
+    prev_level = GLOBAL_LOGGER.level
+    GLOBAL_LOGGER.setLevel(logging.INFO)
+    LW.READINGS.clear()
+    reset_overhead_counters()
+    yield
+    LW.READINGS.clear()
+    GLOBAL_LOGGER.setLevel(prev_level)
+
+
+def test_counters_accumulate():
+    counters = OverheadCounters()
+    counters.add_phase("render", 1000)
+    counters.add_phase("render", 500)
+    counters.add_tick(4000, 3000)
+    counters.add_lateness(2_000_000)
+    counters.add_lateness(-5)
+
+    snapshot = counters.snapshot()
+    assert snapshot["ticks"] == 1
+    assert snapshot["phases_ns"] == {"render": 1500}
+    assert snapshot["cpu_ns_total"] == 3000
+    assert snapshot["late_ms_last"] == 0
+    assert snapshot["late_ms_max"] == 2
+    assert counters.sample(["sparkle_log.overhead_tick_us"]) == {"sparkle_log.overhead_tick_us": 4}
+
+
+def test_log_system_metrics_times_its_phases():
+    with patch.object(LW.psutil, "virtual_memory") as vm:
+        vm.return_value.percent = 50
+        LW.log_system_metrics(("memory",), custom_metrics={"queue": lambda: 3})
+
+    counters = get_overhead_counters()
+    assert counters["ticks"] == 1
+    assert counters["tick_ns_last"] > 0
+    assert {"sample.memory", "custom", "stats", "render", "emit"} <= set(counters["phases_ns"])
+    assert 0 <= counters["cpu_percent"]
+
+
+def test_overhead_metrics_are_logged_with_units():
+    assert is_builtin_metric("sparkle_log.overhead_tick_us")
+    with patch.object(GLOBAL_LOGGER, "info") as mock_info:
+        LW.log_system_metrics(("sparkle_log.overhead_late_ms",))
+    assert mock_info.call_args[0][0].startswith("sparkle_log.overhead_late_ms:  0 ms |")
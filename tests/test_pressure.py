@@ -0,0 +1,51 @@
+from unittest.mock import patch
+
+import pytest
+
+from sparkle_log.pressure import PressureSampler, parse_pressure
+
+PSI = "some avg10=12.50 avg60=2.22 avg300=1.64 total=11107432\nfull avg10=3.00 avg60=0.00 avg300=0.00 total=0\n"
+
+
+def test_parse_pressure():
+    assert parse_pressure(PSI) == 12.5
+    assert parse_pressure(PSI, line="full") == 3.0
+    assert parse_pressure("garbage") is None
+
+
+@pytest.fixture
+def proc(tmp_path):
+    pressure = tmp_path / "pressure"
+    pressure.mkdir()
+    (pressure / "cpu").write_text(PSI)
+    (pressure / "memory").write_text(PSI.replace("12.50", "40.00"))
+    (tmp_path / "loadavg").write_text("2.00 1.50 1.00 3/900 12345\n")
+    return tmp_path
+
+
+def test_sampler_reads_system_psi_and_load(proc):
+    sampler = PressureSampler(None, str(proc / "pressure"), str(proc / "loadavg"))
+    with patch("sparkle_log.pressure.psutil.cpu_count", return_value=4):
+        readings = sampler.sample(["cpu_pressure", "memory_pressure", "io_pressure", "loadavg"])
+    sampler.close()
+
+    # No io file: a kernel without PSI for that resource.
+    assert readings == {"cpu_pressure": 12.5, "memory_pressure": 40.0, "io_pressure": None, "loadavg": 50.0}
+
+
+def test_sampler_prefers_cgroup_psi(proc, tmp_path):
+    group = tmp_path / "group"
+    group.mkdir()
+    (group / "cpu.pressure").write_text(PSI.replace("12.50", "77.00"))
+    sampler = PressureSampler(str(group), str(proc / "pressure"), str(proc / "loadavg"))
+
+    assert sampler.sample(["cpu_pressure", "memory_pressure"]) == {"cpu_pressure": 77.0, "memory_pressure": 40.0}
+
+
+def test_sampler_without_psi(tmp_path):
+    sampler = PressureSampler(None, str(tmp_path / "nope"), str(tmp_path / "nope"))
+    with (
+        patch("sparkle_log.pressure.psutil.getloadavg", return_value=(1.0, 1.0, 1.0)),
+        patch("sparkle_log.pressure.psutil.cpu_count", return_value=2),
+    ):
+        assert sampler.sample(["io_pressure", "loadavg"]) == {"io_pressure": None, "loadavg": 50.0}
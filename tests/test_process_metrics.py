@@ -0,0 +1,84 @@
+import multiprocessing
+import time
+from unittest.mock import patch
+
+import psutil
+import pytest
+
+from sparkle_log import log_writer as LW
+from sparkle_log import process_metrics
+from sparkle_log.as_context_manager import MetricsLoggingContext
+from sparkle_log.process_metrics import PROCESS_METRICS, ProcessSampler, configure_process_metrics
+
+
+@pytest.fixture(autouse=True)
+def _reset_sampler():
+    saved = process_metrics._SAMPLER
+    yield
+    process_metrics._SAMPLER = saved
+
+
+def _sleeper():
+    time.sleep(5)
+
+
+def test_sample_current_process():
+    sampler = ProcessSampler()
+    sampler.sample()
+    readings = sampler.sample()
+
+    assert set(readings) == set(PROCESS_METRICS)
+    assert readings["process_rss"] > 0
+    assert readings["process_threads"] >= 1
+    assert readings["process_ctx_switches"] is not None
+
+
+def test_handle_is_cached():
+    sampler = ProcessSampler()
+    with patch("sparkle_log.process_metrics.psutil.Process", wraps=psutil.Process) as mock_process:
+        sampler.sample()
+        sampler.sample()
+        sampler.sample()
+    assert mock_process.call_count == 1
+
+
+def test_children_discovery_is_cached_and_aggregated():
+    child = multiprocessing.get_context("spawn").Process(target=_sleeper)
+    child.start()
+    try:
+        alone = ProcessSampler().sample()
+        sampler = ProcessSampler(include_children=True, children_refresh_seconds=60)
+        with patch.object(psutil.Process, "children", autospec=True, side_effect=psutil.Process.children) as children:
+            tree = sampler.sample()
+            sampler.sample()
+        assert children.call_count == 1
+        assert tree["process_rss"] > alone["process_rss"]
+    finally:
+        child.terminate()
+        child.join()
+
+
+def test_vanished_process_reads_none():
+    sampler = ProcessSampler(pid=2**22 + 12345)
+    assert sampler.sample() == dict.fromkeys(PROCESS_METRICS)
+    assert not sampler.is_running()
+
+
+def test_process_metrics_logged_with_units(monkeypatch):
+    LW.READINGS.clear()
+    sampler = configure_process_metrics()
+    monkeypatch.setattr(sampler, "sample", lambda: dict(dict.fromkeys(PROCESS_METRICS), process_rss=1234))
+    with (
+        patch.object(LW.GLOBAL_LOGGER, "isEnabledFor", return_value=True),
+        patch.object(LW.GLOBAL_LOGGER, "info") as mock_info,
+    ):
+        LW.log_system_metrics(("process_rss",))
+    assert mock_info.call_args[0][0].startswith("process_rss: 1234 MB |")
+    LW.READINGS.clear()
+
+
+@pytest.mark.parametrize("metric", PROCESS_METRICS)
+def test_context_manager_accepts_process_metrics(metric):
+    with patch("sparkle_log.as_context_manager.GLOBAL_LOGGER.isEnabledFor", return_value=False):
+        with MetricsLoggingContext(metrics=(metric,), interval=1) as monitor:
+            assert monitor.metrics == (metric,)
@@ -0,0 +1,79 @@
+import logging
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from sparkle_log import log_writer as LW
+from sparkle_log.graphs import GLOBAL_LOGGER
+from sparkle_log.process_metrics import configure_process_metrics
+from sparkle_log.process_monitor import attach_process, monitor_until_exit, run_command
+from sparkle_log.summary import RunSummary
+
+
+@pytest.fixture(autouse=True)
+def _info_logging():
+    prev_level = GLOBAL_LOGGER.level
+    GLOBAL_LOGGER.setLevel(logging.INFO)
+    LW.READINGS.clear()
+    yield
+    LW.READINGS.clear()
+    GLOBAL_LOGGER.setLevel(prev_level)
+    configure_process_metrics()
+
+
+def test_monitor_until_exit_logs_summary(caplog):
+    waits = iter([False, False, True])
+    with caplog.at_level(logging.INFO, logger=GLOBAL_LOGGER.name):
+        summary = monitor_until_exit(lambda timeout: next(waits), ("memory",), 0.01)
+
+    assert summary.metrics["memory"].count == 3
+    assert "Summary memory:" in caplog.text
+    assert "3 samples" in caplog.text
+
+
+def test_run_command_returns_exit_code(caplog):
+    with caplog.at_level(logging.INFO, logger=GLOBAL_LOGGER.name):
+        code = run_command(
+            [sys.executable, "-c", "import time; time.sleep(0.3); raise SystemExit(7)"], ("process_rss",), 0.1
+        )
+
+    assert code == 7
+    assert "Summary process_rss:" in caplog.text
+
+
+def test_attach_missing_process():
+    assert attach_process(2**22 + 12345, ("process_cpu",), 0.1) == 1
+
+
+def test_run_summary_streaming_aggregates():
+    summary = RunSummary()
+    summary.update({"cpu": 10, "memory": None})
+    summary.update({"cpu": 30, "memory": None})
+
+    assert summary.metrics["cpu"].mean == 20
+    assert summary.metrics["memory"].count == 0
+    (line,) = summary.format_lines()
+    assert line.startswith("Summary cpu:")
+    assert "(10, 20.0, 30)%" in line
+
+
+def test_monitor_until_exit_summarises_on_interrupt(caplog):
+    def interrupted(timeout):
+        raise KeyboardInterrupt
+
+    with caplog.at_level(logging.INFO, logger=GLOBAL_LOGGER.name), patch.object(LW.psutil, "virtual_memory") as vm:
+        vm.return_value.percent = 50
+        with pytest.raises(KeyboardInterrupt):
+            monitor_until_exit(interrupted, ("memory",), 0.01)
+    assert "Summary memory:" in caplog.text
+
+
+def test_run_command_not_found_or_not_executable(tmp_path, capsys):
+    assert run_command([str(tmp_path / "missing")], ("process_rss",), 0.1) == 127
+    assert "command not found" in capsys.readouterr().err
+    script = tmp_path / "script.sh"
+    script.write_text("#!/bin/sh\n", encoding="utf-8")
+    script.chmod(0o644)
+    assert run_command([str(script)], ("process_rss",), 0.1) == 126
+    assert "cannot run" in capsys.readouterr().err
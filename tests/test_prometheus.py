@@ -0,0 +1,66 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from sparkle_log import log_writer as LW
+from sparkle_log.prometheus import CONTENT_TYPE, format_openmetrics, start_prometheus_exporter, stop_prometheus_exporter
+from sparkle_log.sinks import SINKS
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    LW.READINGS.clear()
+    LW.TIMESTAMPS.clear()
+    yield
+    LW.READINGS.clear()
+    LW.TIMESTAMPS.clear()
+
+
+def test_format_openmetrics():
+    body = format_openmetrics({"cpu": [None, 10, 20], "net_rx:eth0": [1024], "empty": [None]})
+    assert body == (
+        "# TYPE sparkle_log_cpu gauge\n"
+        'sparkle_log_cpu{stat="current"} 20\n'
+        'sparkle_log_cpu{stat="min"} 10\n'
+        'sparkle_log_cpu{stat="mean"} 15\n'
+        'sparkle_log_cpu{stat="max"} 20\n'
+        "# TYPE sparkle_log_net_rx gauge\n"
+        'sparkle_log_net_rx{device="eth0",stat="current"} 1024\n'
+        'sparkle_log_net_rx{device="eth0",stat="min"} 1024\n'
+        'sparkle_log_net_rx{device="eth0",stat="mean"} 1024\n'
+        'sparkle_log_net_rx{device="eth0",stat="max"} 1024\n'
+        "# EOF\n"
+    )
+
+
+def test_scrapes_share_one_build_per_tick():
+    exporter = start_prometheus_exporter(port=0)
+    url = f"http://127.0.0.1:{exporter.port}/metrics"
+    try:
+        assert exporter in SINKS
+        LW.collect_system_metrics((), {"queue": lambda: 7})
+        for _ in range(3):
+            with urllib.request.urlopen(url, timeout=5) as response:  # nosec
+                assert response.headers["Content-Type"] == CONTENT_TYPE
+                body = response.read().decode("utf-8")
+        assert 'sparkle_log_queue{stat="current"} 7' in body
+        assert (exporter.builds, exporter.scrapes) == (1, 3)
+
+        LW.collect_system_metrics((), {"queue": lambda: 9})
+        with urllib.request.urlopen(url, timeout=5) as response:  # nosec
+            assert 'sparkle_log_queue{stat="max"} 9' in response.read().decode("utf-8")
+        assert exporter.builds == 2
+
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://127.0.0.1:{exporter.port}/other", timeout=5)  # nosec
+    finally:
+        stop_prometheus_exporter(exporter)
+    assert exporter not in SINKS
+
+
+def test_values_keep_full_precision():
+    body = format_openmetrics({"net_rx": [123456789, 123456790], "queue": [0.25, 0.5]})
+    assert 'sparkle_log_net_rx{stat="current"} 123456790\n' in body
+    assert 'sparkle_log_net_rx{stat="mean"} 123456789.5\n' in body
+    assert 'sparkle_log_queue{stat="mean"} 0.375\n' in body
@@ -0,0 +1,127 @@
+import gc
+import logging
+import tracemalloc
+
+import pytest
+
+from sparkle_log import log_writer as LW
+from sparkle_log.graphs import GLOBAL_LOGGER
+from sparkle_log.python_memory import (
+    GC_TRACKER,
+    GCTracker,
+    HeapSampler,
+    acquire_python_metrics,
+    configure_python_memory,
+    release_python_metrics,
+    top_allocations,
+)
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    LW.READINGS.clear()
+    yield
+    LW.READINGS.clear()
+    configure_python_memory()
+    GC_TRACKER.uninstall()
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def test_heap_sampler_starts_tracing_and_stops():
+    sampler = HeapSampler()
+    sampler.sample(["py_heap"])
+    assert tracemalloc.is_tracing()
+    hoard = [bytearray(1024) for _ in range(2048)]
+    readings = sampler.sample(["py_heap", "py_heap_peak"])
+    assert readings["py_heap"] >= 2
+    assert readings["py_heap_peak"] >= readings["py_heap"]
+    del hoard
+    sampler.stop()
+    assert not tracemalloc.is_tracing()
+
+
+def test_heap_sampler_disabled():
+    sampler = HeapSampler(enabled=False)
+    assert sampler.sample(["py_heap"]) == {"py_heap": None}
+    assert not tracemalloc.is_tracing()
+
+
+def test_heap_growth_logs_top_lines(caplog):
+    sampler = HeapSampler(growth_threshold_mb=1, top_lines=3)
+    sampler.sample(["py_heap"])
+    hoard = [bytearray(1024) for _ in range(2048)]
+    with caplog.at_level(logging.INFO, logger=GLOBAL_LOGGER.name):
+        sampler.sample(["py_heap"])
+    assert "top allocating lines" in caplog.text
+    assert "test_python_memory.py" in caplog.text
+    del hoard
+    sampler.stop()
+
+
+def test_top_allocations_not_tracing():
+    assert top_allocations() == []
+
+
+def test_gc_tracker_counts_collections():
+    tracker = GCTracker()
+    assert tracker.sample(["gc_collections"]) == {"gc_collections": None}
+    try:
+        gc.collect()
+        gc.collect()
+        readings = tracker.sample(["gc_pause_us", "gc_collections"])
+    finally:
+        tracker.uninstall()
+    assert readings["gc_collections"] >= 2
+    assert readings["gc_pause_us"] >= 0
+    assert tracker._callback not in gc.callbacks
+
+
+def test_gc_pause_sub_millisecond_not_truncated():
+    GC_TRACKER.install()
+    GC_TRACKER._pause_ns = 350_000
+    GC_TRACKER._collections = 1
+    assert LW.read_builtin_metrics(("gc_pause_us",))["gc_pause_us"] >= 350
+
+
+def test_py_heap_sampled_into_windows():
+    LW.collect_system_metrics(("py_heap", "gc_collections"))
+    assert "py_heap" in LW.READINGS
+    assert LW.metric_unit("py_heap") == " MB"
+
+
+def test_heap_peak_leaves_tracemalloc_peak_alone():
+    sampler = HeapSampler()
+    sampler.sample(["py_heap"])
+    hoard = [bytearray(1024) for _ in range(2048)]
+    del hoard
+    first = sampler.sample(["py_heap_peak"])["py_heap_peak"]
+    _, global_peak = tracemalloc.get_traced_memory()
+    second = sampler.sample(["py_heap_peak"])["py_heap_peak"]
+    assert first >= 2
+    assert second < first
+    assert tracemalloc.get_traced_memory()[1] >= global_peak
+    sampler.stop()
+
+
+def test_last_run_stops_tracing_and_removes_gc_hook():
+    assert not acquire_python_metrics(("cpu",))
+    assert acquire_python_metrics(("py_heap",))
+    assert acquire_python_metrics(("gc_collections",))
+    LW.collect_system_metrics(("py_heap", "gc_collections"))
+    assert tracemalloc.is_tracing() and GC_TRACKER.installed
+
+    release_python_metrics()
+    assert tracemalloc.is_tracing() and GC_TRACKER.installed
+    release_python_metrics()
+    assert not tracemalloc.is_tracing()
+    assert not GC_TRACKER.installed
+    assert GC_TRACKER._callback not in gc.callbacks
+
+
+def test_tracing_started_elsewhere_is_left_running():
+    tracemalloc.start()
+    acquire_python_metrics(("py_heap",))
+    LW.collect_system_metrics(("py_heap",))
+    release_python_metrics()
+    assert tracemalloc.is_tracing()
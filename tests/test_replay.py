@@ -0,0 +1,101 @@
+import json
+from unittest.mock import patch
+
+from sparkle_log import log_writer as LW
+from sparkle_log.layout import CombinedLayout
+from sparkle_log.replay import parse_log_line, parse_time, read_samples, render_samples
+from sparkle_log.store import MmapStore
+
+
+def test_parse_time_accepts_epoch_and_iso():
+    assert parse_time("12.5") == 12.5
+    assert parse_time("2026-10-19 12:00:00,500") - parse_time("2026-10-19 12:00:00") == 0.5
+
+
+def test_csv_long_and_wide_forms(tmp_path):
+    wide = tmp_path / "wide.csv"
+    wide.write_text("timestamp,cpu,memory\n1,10,\n2,11.5,60\n", encoding="utf-8")
+    assert list(read_samples(str(wide))) == [
+        (1.0, "cpu", 10),
+        (1.0, "memory", None),
+        (2.0, "cpu", 11.5),
+        (2.0, "memory", 60),
+    ]
+    long = tmp_path / "long.csv"
+    long.write_text("time,metric,value\n1,cpu,10\n2,queue,3\n", encoding="utf-8")
+    assert list(read_samples(str(long))) == [(1.0, "cpu", 10), (2.0, "queue", 3)]
+
+
+def test_jsonl_input(tmp_path):
+    path = tmp_path / "samples.jsonl"
+    rows = [{"at": 1, "name": "cpu", "value": 5}, {}, {"ts": 2, "cpu": 6, "memory": "n/a"}]
+    path.write_text("\n".join(json.dumps(row) for row in rows) + "\n\n", encoding="utf-8")
+    assert list(read_samples(str(path))) == [(1.0, "cpu", 5), (2.0, "cpu", 6), (2.0, "memory", None)]
+
+
+def test_store_input(tmp_path):
+    store = MmapStore(str(tmp_path), session="s")
+    store.on_tick({"cpu": 7}, 3.0)
+    store.close()
+    assert list(read_samples(store.path)) == [(3.0, "cpu", 7)]
+
+
+def test_parse_log_lines_back_into_samples():
+    line = "2026-10-19 12:00:01,000 INFO     CPU   : 43% | min, mean, max (1, 20, 43) | ▁▂▅"
+    assert parse_log_line(line)[1] == {"cpu": 43}
+    assert parse_log_line("INFO     net_rx: 1.5 KB/s | min, mean, max (0 B/s, 1 KB/s, 2 KB/s) | ▁▂")[1] == {
+        "net_rx": 1536
+    }
+    assert parse_log_line("\x1b[32mINFO    \x1b[0m cpu        43% ▁▂▅ | mem        61% ▃▃▄")[1] == {
+        "cpu": 43,
+        "memory": 61,
+    }
+    assert parse_log_line("INFO     Summary cpu: 10.0s, 5 samples | min, mean, max (1, 2.0, 3)% | ▁▂")[1] == {}
+    assert parse_log_line("Demo of Sparkle Monitoring system metrics during operations...")[1] == {}
+
+
+def test_render_log_file_with_time_range(tmp_path):
+    path = tmp_path / "job.log"
+    lines = [
+        f"2026-10-19 12:00:{s:02d},000 INFO     Memory: {40 + s}% | min, mean, max (1, 2, 3) | ▁" for s in range(10)
+    ]
+    path.write_text("\n".join(["some other line", *lines]) + "\n", encoding="utf-8")
+    start = parse_time("2026-10-19 12:00:02")
+    end = parse_time("2026-10-19 12:00:05")
+    rendered = render_samples(read_samples(str(path)), start=start, end=end, percentiles=(), points=4)
+    assert len(rendered) == 1
+    assert rendered[0].startswith("Summary memory: 3.0s, 4 samples | min, mean, max (42, 43.5, 45)%")
+
+
+def test_parse_real_metric_lines_back():
+    series = {"cpu": [12, 43], "net_rx:eth0": [100, 1536], "process_rss": [80, 96], "handler_p50_us": [7, 9]}
+    with patch.object(LW.GLOBAL_LOGGER, "info") as mock_info:
+        for metric, values in series.items():
+            LW._log_metric_series(metric, values, "bar")
+    parsed = {}
+    for call in mock_info.call_args_list:
+        parsed.update(parse_log_line(f"INFO     {call[0][0]}")[1])
+    assert parsed == {"cpu": 43, "net_rx:eth0": 1536, "process_rss": 96, "handler_p50_us": 9}
+
+
+def test_parse_real_combined_line_skips_failed_readings():
+    fields = {}
+    for metric, values in {"cpu": [12, 43], "memory": [60, None], "disk_read:sda": [0, 2048]}.items():
+        fields[metric] = LW._combined_field(metric, values, "bar", None)
+    line = CombinedLayout().format_line(fields)
+    assert " - " in line
+    assert parse_log_line(f"INFO     {line}")[1] == {"cpu": 43, "disk_read:sda": 2048}
+
+
+def test_application_lines_are_not_samples(tmp_path):
+    assert parse_log_line("2026-10-19 12:00:00,123 INFO     Retrying 3 times")[1] == {}
+    assert parse_log_line("INFO     Processed 500 rows | 2 failed")[1] == {}
+    assert parse_log_line("INFO     threads top 2: worker-1 85%, MainThread 5%")[1] == {}
+    path = tmp_path / "app.log"
+    lines = []
+    for s in range(4):
+        lines.append(f"2026-10-19 12:00:{s:02d},000 INFO     Processed {500 + s} rows")
+        lines.append(f"2026-10-19 12:00:{s:02d},000 INFO     cpu        {40 + s}% ▁▂▅ | mem        61% ▃▃▄")
+        lines.append(f"2026-10-19 12:00:{s:02d},000 WARNING  Retrying {s} times")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    assert sorted({name for _, name, _ in read_samples(str(path))}) == ["cpu", "memory"]
@@ -33,12 +33,12 @@ def test_run_scheduler_with_multiple_inputs(metrics, seconds):
         # Simulate running the scheduler with mocked dependencies
         run_scheduler(stop_event, metrics, seconds)
 
-        # Assert schedule.every was called with the passed seconds
-        mock_schedule.every.assert_called_once_with(seconds)
+        # Assert the run's own scheduler was given the passed seconds
+        mock_schedule.Scheduler.return_value.every.assert_called_once_with(seconds)
 
         # Assert that seconds.do was called
         # Since this is a chained call in the actual implementation, we mimic that with MagicMock
-        seconds_do_mock = mock_schedule.every(seconds).seconds.do
+        seconds_do_mock = mock_schedule.Scheduler.return_value.every(seconds).seconds.do
 
         # Verifying that the do method was called with a function that, when called,
         # invokes log_system_metrics with the correct metrics.
@@ -64,7 +64,7 @@ def test_run_scheduler_with_zero_seconds():
         # Execute the scheduler with zero seconds
         run_scheduler(stop_event, (), 0)
 
-        mock_schedule.every.assert_called_with(0)
+        mock_schedule.Scheduler.return_value.every.assert_called_with(0)
         assert mock_sleep.called  # The loop will enter at least once
 
 
@@ -0,0 +1,108 @@
+import logging
+from datetime import datetime
+from threading import Event
+from unittest.mock import patch
+
+import pytest
+import schedule
+
+from sparkle_log import log_writer as LW
+from sparkle_log.graphs import GLOBAL_LOGGER
+from sparkle_log.overhead import get_overhead_counters, reset_overhead_counters
+from sparkle_log.scheduler import run_scheduler
+
+
+@pytest.fixture(autouse=True)
+def _info_logging():
+    prev_level = GLOBAL_LOGGER.level
+    GLOBAL_LOGGER.setLevel(logging.INFO)
+    LW.READINGS.clear()
+    yield
+    LW.READINGS.clear()
+    GLOBAL_LOGGER.setLevel(prev_level)
+
+
+@pytest.fixture()
+def schedulers():
+    """Every schedule.Scheduler the runs create, real ones."""
+    created = []
+    real_scheduler = schedule.Scheduler
+
+    def create():
+        created.append(real_scheduler())
+        return created[-1]
+
+    with patch("sparkle_log.scheduler.schedule.Scheduler", side_effect=create):
+        yield created
+
+
+def test_run_scheduler_logs_summary_on_stop(caplog):
+    stop_event = Event()
+
+    def tick_then_stop(_seconds):
+        mock_schedule.Scheduler.return_value.every.return_value.seconds.do.call_args[0][0]()
+        stop_event.set()
+
+    with (
+        caplog.at_level(logging.INFO, logger=GLOBAL_LOGGER.name),
+        patch("sparkle_log.scheduler.schedule") as mock_schedule,
+        patch("sparkle_log.scheduler.time.sleep", side_effect=tick_then_stop),
+        patch.object(LW.psutil, "virtual_memory") as vm,
+    ):
+        vm.return_value.percent = 42
+        run_scheduler(stop_event, ("memory",), 1)
+        stop_event.clear()
+        run_scheduler(stop_event, ("memory",), 1, summary=False)
+
+    summaries = [r.message for r in caplog.records if r.message.startswith("Summary")]
+    assert len(summaries) == 1
+    assert "Summary memory:" in summaries[0]
+    assert "1 samples | min, mean, max (42, 42.0, 42)%" in summaries[0]
+
+
+def test_finished_runs_leave_no_jobs(schedulers):
+    stop_event = Event()
+
+    def fire_every_job(_seconds):
+        # Force every job of every run so far, and of the global scheduler, to fire now.
+        for scheduler in [schedule.default_scheduler, *schedulers]:
+            for job in scheduler.jobs:
+                job.next_run = datetime.min
+            scheduler.run_pending()
+        stop_event.set()
+
+    with (
+        patch("sparkle_log.scheduler.log_system_metrics", return_value={}) as mock_log,
+        patch("sparkle_log.scheduler.time.sleep", side_effect=fire_every_job),
+    ):
+        run_scheduler(stop_event, ("cpu",), 1, summary=False)
+        stop_event.clear()
+        run_scheduler(stop_event, ("memory",), 1, summary=False)
+
+    assert [c[0][0] for c in mock_log.call_args_list] == [("cpu",), ("memory",)]
+    assert not schedule.jobs
+    assert all(not scheduler.jobs for scheduler in schedulers)
+
+
+def test_overhead_counters_only_move_for_the_live_run(schedulers):
+    stop_event = Event()
+
+    def fire_every_job(_seconds=None):
+        for scheduler in [schedule.default_scheduler, *schedulers]:
+            for job in scheduler.jobs:
+                job.next_run = datetime.min
+            scheduler.run_pending()
+        stop_event.set()
+
+    reset_overhead_counters()
+    with patch("sparkle_log.scheduler.time.sleep", side_effect=fire_every_job):
+        run_scheduler(stop_event, (), 1, custom_metrics={"queue": lambda: 1}, summary=False)
+        assert get_overhead_counters()["ticks"] == 1
+        stop_event.clear()
+        run_scheduler(stop_event, (), 1, custom_metrics={"queue": lambda: 2}, summary=False)
+        assert get_overhead_counters()["ticks"] == 2
+
+    before = get_overhead_counters()
+    fire_every_job()
+    after = get_overhead_counters()
+    assert (after["ticks"], after["late_ms_max"]) == (before["ticks"], before["late_ms_max"])
@@ -0,0 +1,122 @@
+import json
+import random
+from threading import Event
+from unittest.mock import patch
+
+import pytest
+
+from sparkle_log import log_writer as LW
+from sparkle_log.scheduler import run_scheduler
+from sparkle_log.sketch import QuantileSketch
+
+
+def _exact(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+@pytest.mark.parametrize("q", [0.5, 0.95, 0.99])
+def test_quantiles_within_relative_accuracy(q):
+    rng = random.Random(42)
+    values = [rng.lognormvariate(3, 1) for _ in range(20000)]
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    assert sketch.quantile(q) == pytest.approx(_exact(values, q), rel=0.011)
+    assert sketch.count == len(values)
+    assert len(sketch.positive) < 1000
+
+
+def test_zero_negative_and_none():
+    sketch = QuantileSketch()
+    for value in (-10, 0, 0, None, 5):
+        sketch.add(value)
+
+    assert sketch.count == 4
+    assert sketch.quantile(0) == -10
+    assert sketch.quantile(0.5) == 0
+    assert sketch.quantile(1) == 5
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_bucket_cap_bounds_memory():
+    sketch = QuantileSketch(relative_accuracy=0.01, max_buckets=50)
+    for exponent in range(200):
+        sketch.add(1.1**exponent)
+
+    assert len(sketch.positive) == 50
+    assert sketch.quantile(0.99) == pytest.approx(1.1**197, rel=0.02)
+
+
+def test_merge_across_processes_via_dict():
+    left, right, both = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for value in range(1, 1001):
+        (left if value % 2 else right).add(value)
+        both.add(value)
+
+    restored = QuantileSketch.from_dict(json.loads(json.dumps(right.to_dict())))
+    left.merge(restored)
+
+    assert left.count == both.count
+    assert left.quantile(0.95) == both.quantile(0.95)
+    with pytest.raises(ValueError):
+        left.merge(QuantileSketch(relative_accuracy=0.05))
+
+
+def test_log_line_includes_percentiles():
+    LW.READINGS.clear()
+    LW.SKETCHES.clear()
+    values = iter(range(1, 100))
+    with (
+        patch.object(LW.GLOBAL_LOGGER, "isEnabledFor", return_value=True),
+        patch.object(LW.GLOBAL_LOGGER, "info") as mock_info,
+        patch.object(LW, "sparkline", return_value="[sparkline]"),
+    ):
+        for _ in range(99):
+            LW.log_system_metrics((), custom_metrics={"queue": lambda: next(values)}, percentiles=(95, 99))
+    LW.READINGS.clear()
+    LW.SKETCHES.clear()
+
+    assert mock_info.call_args[0][0] == "queue: 99% | min, mean, max (70, 84, 99) | p95, p99 (95, 99) | [sparkline]"
+
+
+def test_sketches_only_fed_when_percentiles_requested():
+    LW.READINGS.clear()
+    LW.SKETCHES.clear()
+    own: dict = {}
+    with (
+        patch.object(LW.GLOBAL_LOGGER, "isEnabledFor", return_value=True),
+        patch.object(LW.GLOBAL_LOGGER, "info"),
+    ):
+        LW.log_system_metrics((), custom_metrics={"queue": lambda: 5})
+        assert not LW.SKETCHES
+        LW.log_system_metrics((), custom_metrics={"queue": lambda: 5}, percentiles=(50,), sketches=own)
+    LW.READINGS.clear()
+    assert not LW.SKETCHES
+    assert own["queue"].count == 1
+
+
+def test_each_run_starts_new_sketches():
+    stop_event = Event()
+    seen = []
+
+    def capture(*args):
+        seen.append(args[4])
+        stop_event.set()
+        return {}
+
+    def run_job(_seconds):
+        mock_schedule.Scheduler.return_value.every.return_value.seconds.do.call_args[0][0]()
+
+    with (
+        patch("sparkle_log.scheduler.log_system_metrics", side_effect=capture),
+        patch("sparkle_log.scheduler.time.sleep", side_effect=run_job),
+        patch("sparkle_log.scheduler.schedule") as mock_schedule,
+    ):
+        run_scheduler(stop_event, ("cpu",), 1, percentiles=(95,), summary=False)
+        stop_event.clear()
+        run_scheduler(stop_event, ("cpu",), 1, percentiles=(95,), summary=False)
+    assert len(seen) == 2
+    assert seen[0] is not seen[1]
+    assert seen[0] is not LW.SKETCHES
@@ -0,0 +1,138 @@
+import logging
+import threading
+import time
+from threading import Event
+from unittest.mock import patch
+
+import pytest
+
+from sparkle_log.graphs import GLOBAL_LOGGER
+from sparkle_log.scheduler import run_scheduler
+from sparkle_log.stack_sampler import StackSampler, configure_stack_sampling, get_stack_sampler
+
+
+@pytest.fixture(autouse=True)
+def _no_sampler():
+    configure_stack_sampling(None)
+    yield
+    configure_stack_sampling(None)
+
+
+def busy_loop(stop: Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sample_once_counts_other_threads():
+    stop = Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,))
+    worker.start()
+    try:
+        sampler = StackSampler()
+        for _ in range(20):
+            sampler.sample_once(threading.get_ident())
+            time.sleep(0.001)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert sampler.samples == 20
+    assert any(key.startswith("busy_loop (") for key in sampler.counts)
+    assert not any("test_sample_once_counts_other_threads" in key for key in sampler.counts)
+
+
+def test_counter_is_bounded():
+    sampler = StackSampler(max_functions=1)
+    sampler.counts = {"existing": 1}
+    sampler.sample_once()
+    assert len(sampler.counts) == 1
+    assert sampler.dropped >= 1
+
+
+def test_roll_logs_top_functions_and_arms_on_threshold():
+    sampler = StackSampler(threshold=80, top_n=1)
+    assert sampler.roll({"cpu": 50}) == []
+    assert not sampler.active
+    assert sampler.roll({"cpu": 95}) == []
+    assert sampler.active
+
+    sampler.samples = 4
+    sampler.thread_samples = 4
+    sampler.counts = {"hot (a.py:1)": 3, "cold (b.py:1)": 1}
+    lines = sampler.roll({"cpu": 10})
+    assert lines == ["Hot functions, cpu >= 80, 4 stack samples:", "   75.0% hot (a.py:1)"]
+    assert not sampler.active
+    assert sampler.counts == {}
+
+
+def test_scheduler_sleeps_when_below_threshold():
+    configure_stack_sampling(threshold=80)
+    stop_event = Event()
+    with (
+        patch("sparkle_log.scheduler.schedule"),
+        patch("sparkle_log.scheduler.time.sleep", side_effect=lambda _: stop_event.set()) as mock_sleep,
+        patch.object(get_stack_sampler(), "sample_for") as mock_sample_for,
+    ):
+        run_scheduler(stop_event, ("cpu",), 1, summary=False)
+    mock_sleep.assert_called_once_with(1)
+    mock_sample_for.assert_not_called()
+
+
+def test_scheduler_samples_stacks_during_spike(caplog):
+    sampler = configure_stack_sampling(threshold=80)
+    stop_event = Event()
+
+    def run_tick():
+        mock_schedule.Scheduler.return_value.every.return_value.seconds.do.call_args[0][0]()
+
+    def sample_then_tick(_seconds):
+        sampler.samples = 1
+        sampler.thread_samples = 1
+        sampler.counts = {"hot (a.py:1)": 1}
+        run_tick()
+        stop_event.set()
+
+    with (
+        caplog.at_level(logging.INFO, logger=GLOBAL_LOGGER.name),
+        patch("sparkle_log.scheduler.schedule") as mock_schedule,
+        patch("sparkle_log.scheduler.log_system_metrics", return_value={"cpu": 99}),
+        patch("sparkle_log.scheduler.time.sleep", side_effect=lambda _: run_tick()),
+        patch.object(sampler, "sample_for", side_effect=sample_then_tick) as mock_sample_for,
+    ):
+        run_scheduler(stop_event, ("cpu",), 1, summary=False)
+
+    mock_sample_for.assert_called_once_with(1)
+    assert "Hot functions, cpu >= 80, 1 stack samples:" in caplog.text
+    assert "100.0% hot (a.py:1)" in caplog.text
+
+
+def test_idle_and_own_threads_are_not_counted():
+    stop = Event()
+    idle = threading.Thread(target=stop.wait)
+    own = threading.Thread(target=busy_loop, args=(stop,), name="sparkle_log.scheduler")
+    worker = threading.Thread(target=busy_loop, args=(stop,))
+    for thread in (idle, own, worker):
+        thread.start()
+    try:
+        sampler = StackSampler()
+        for _ in range(10):
+            sampler.sample_once(threading.get_ident())
+            time.sleep(0.001)
+    finally:
+        stop.set()
+        for thread in (idle, own, worker):
+            thread.join()
+
+    assert not any(key.startswith("wait (") for key in sampler.counts)
+    # The worker and the sparkle_log thread run the same function, at most one sample per stack means only one counted.
+    busy = [count for key, count in sampler.counts.items() if key.startswith("busy_loop (")]
+    assert busy and 1 <= busy[0] <= 10
+    assert sampler.thread_samples == sum(sampler.counts.values())
+
+
+def test_shares_are_of_thread_samples():
+    sampler = StackSampler(top_n=2)
+    sampler.samples = 2
+    sampler.thread_samples = 4
+    sampler.counts = {"a (a.py:1)": 2, "b (b.py:1)": 2}
+    assert sampler.roll({"cpu": 10})[1:] == ["   50.0% a (a.py:1)", "   50.0% b (b.py:1)"]
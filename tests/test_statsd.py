@@ -0,0 +1,67 @@
+import socket
+from unittest.mock import patch
+
+import pytest
+
+from sparkle_log.statsd import StatsdSink, format_gauge, pack_datagrams
+
+
+@pytest.fixture()
+def agent():
+    listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.settimeout(5)
+    yield listener
+    listener.close()
+
+
+def test_format_gauge():
+    assert format_gauge("sparkle_log.", "cpu", 43) == "sparkle_log.cpu:43|g"
+    assert format_gauge("", "net_rx:eth0", 1.25) == "net_rx.eth0:1.25|g"
+    assert format_gauge("", "disk_read:sda:1", 2.0) == "disk_read.sda_1:2|g"
+    assert format_gauge("", "queue_delta", -5) == "queue_delta:0|g\nqueue_delta:-5|g"
+    assert pack_datagrams([format_gauge("", "a", -1), "b:2|g"], 12) == [b"a:0|g\na:-1|g", b"b:2|g"]
+
+
+def test_pack_datagrams_respects_size():
+    lines = ["a:1|g", "b:22|g", "c:333|g", "too_long_for_one:1|g"]
+    assert pack_datagrams(lines, 14) == [b"a:1|g\nb:22|g", b"c:333|g", b"too_long_for_one:1|g"]
+    assert pack_datagrams([], 14) == []
+
+
+def test_sink_sends_packed_gauges(agent):
+    sink = StatsdSink("127.0.0.1", agent.getsockname()[1], max_datagram=50)
+    sink.on_tick({"cpu": 43, "memory": 61, "drive": None, "queue": 7}, 0.0)
+    received = [agent.recv(2048), agent.recv(2048)]
+    sink.close()
+    assert received == [b"sparkle_log.cpu:43|g\nsparkle_log.memory:61|g", b"sparkle_log.queue:7|g"]
+    assert (sink.sent_datagrams, sink.sent_metrics, sink.dropped_datagrams) == (2, 3, 0)
+
+
+def test_sink_drops_instead_of_blocking(agent):
+    sink = StatsdSink("127.0.0.1", agent.getsockname()[1])
+    real_socket = sink._socket
+    with patch.object(sink, "_socket") as mock_socket:
+        mock_socket.sendto.side_effect = BlockingIOError
+        sink.on_tick({"cpu": 1, "memory": 2}, 0.0)
+    assert sink._socket is real_socket
+    assert (sink.sent_datagrams, sink.dropped_datagrams, sink.dropped_metrics) == (0, 1, 2)
+    sink.close()
+    sink.on_tick({"cpu": 1}, 0.0)
+    assert sink.dropped_datagrams == 2
+
+
+def test_sink_sends_negative_gauge_as_reset_and_value(agent):
+    sink = StatsdSink("127.0.0.1", agent.getsockname()[1], prefix="")
+    sink.on_tick({"drift": -3}, 0.0)
+    assert agent.recv(2048) == b"drift:0|g\ndrift:-3|g"
+    assert sink.sent_metrics == 1
+    sink.close()
+
+
+def test_sink_drops_non_finite_values(agent):
+    sink = StatsdSink("127.0.0.1", agent.getsockname()[1], prefix="")
+    sink.on_tick({"ratio": float("nan"), "cpu": 43, "spike": float("inf"), "dip": float("-inf")}, 0.0)
+    assert agent.recv(2048) == b"cpu:43|g"
+    assert (sink.sent_metrics, sink.dropped_metrics, sink.dropped_datagrams) == (1, 3, 0)
+    sink.close()
@@ -0,0 +1,133 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from sparkle_log import log_writer as LW
+from sparkle_log.graphs import GLOBAL_LOGGER
+from sparkle_log.sinks import SINKS, add_sink, close_sinks, remove_sink, sink_failures
+from sparkle_log.store import HEADER, RECORD, MmapStore, open_store, read_store
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    LW.READINGS.clear()
+    LW.TIMESTAMPS.clear()
+    yield
+    for sink in list(SINKS):
+        remove_sink(sink)
+    LW.READINGS.clear()
+    LW.TIMESTAMPS.clear()
+
+
+def test_store_round_trips_samples(tmp_path):
+    store = MmapStore(str(tmp_path), session="s")
+    store.on_tick({"cpu": 10, "memory": None}, 100.0)
+    store.on_tick({"cpu": 12, "memory": 50}, 101.0)
+    assert store.tail("cpu") == [10, 12]
+    assert store.tail("memory", 1) == [50]
+    store.close()
+    assert os.path.getsize(store.path) == HEADER.size + 4 * RECORD.size
+    assert list(read_store(store.path)) == [
+        (100.0, "cpu", 10),
+        (100.0, "memory", None),
+        (101.0, "cpu", 12),
+        (101.0, "memory", 50),
+    ]
+
+
+def test_store_is_readable_before_close(tmp_path):
+    store = MmapStore(str(tmp_path), session="s", sync_every=1)
+    store.on_tick({"cpu": 1}, 1.0)
+    assert list(read_store(store.path)) == [(1.0, "cpu", 1)]
+    store.close()
+
+
+def test_store_rotates_and_keeps_max_files(tmp_path):
+    store = MmapStore(str(tmp_path), max_bytes=HEADER.size + 2 * RECORD.size, max_files=2, session="s")
+    for at in range(7):
+        store.on_tick({"cpu": at}, float(at))
+    store.close()
+    assert sorted(os.listdir(tmp_path)) == ["s-0002.spkl", "s-0003.spkl"]
+    assert [value for _, _, value in read_store(store.path)] == [6]
+    with pytest.raises(ValueError):
+        store.append("cpu", 1, 1.0)
+
+
+def test_tail_reaches_into_rotated_files(tmp_path):
+    store = MmapStore(str(tmp_path), max_bytes=HEADER.size + 2 * RECORD.size, max_files=3, session="s")
+    for at in range(7):
+        store.on_tick({"cpu": at}, float(at))
+    assert store.tail("cpu", 4) == [3, 4, 5, 6]
+    # s-0000 was deleted on rotation, the rest of the history is still there.
+    assert store.tail("cpu", 100) == [2, 3, 4, 5, 6]
+    store.close()
+
+
+def test_tail_ignores_matches_across_records(tmp_path):
+    store = MmapStore(str(tmp_path), session="s")
+    store.append("cpu", 1, 1.0)
+    # "cpu" and padding, then the zero timestamp of the next record: the name's bytes, but not a cpu record.
+    store.append("zzzcpu", 2, 2.0)
+    store.append("memory", 3, 0.0)
+    assert store.tail("cpu") == [1]
+    store.close()
+
+
+def test_long_names_are_rejected_not_truncated(tmp_path):
+    store = MmapStore(str(tmp_path), session="s")
+    long_name = "handle_incoming_request_batch_p50_us"
+    with pytest.raises(ValueError, match=long_name):
+        store.on_tick({"cpu": 1, long_name: 2}, 1.0)
+    assert store.tail("cpu") == [1]
+    with pytest.raises(ValueError):
+        store.append(long_name, 2, 1.0)
+    store.append("x" * 32, 3, 1.0)
+    assert store.tail("x" * 32) == [3]
+    store.close()
+
+
+def test_read_store_rejects_other_files(tmp_path):
+    path = tmp_path / "other.spkl"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        list(read_store(str(path)))
+
+
+def test_collect_system_metrics_notifies_sinks(tmp_path):
+    store = open_store(str(tmp_path), session="s")
+
+    class Broken:
+        def on_tick(self, samples, at):
+            raise RuntimeError("boom")
+
+        def close(self):
+            pass
+
+    broken = add_sink(Broken())
+    with patch.object(GLOBAL_LOGGER, "debug") as mock_debug:
+        LW.collect_system_metrics((), {"queue": lambda: 7})
+        LW.collect_system_metrics((), {"queue": lambda: 8})
+    assert store.tail("queue") == [7, 8]
+    assert sink_failures(broken) == 2
+    mock_debug.assert_called_once()
+
+
+def test_close_sinks_closes_every_registered_sink(tmp_path):
+    store = open_store(str(tmp_path), session="s")
+    closed = []
+
+    class Failing:
+        def on_tick(self, samples, at):
+            pass
+
+        def close(self):
+            closed.append(self)
+            raise OSError("disk gone")
+
+    add_sink(Failing())
+    store.on_tick({"cpu": 1}, 1.0)
+    close_sinks()
+    assert not SINKS
+    assert len(closed) == 1
+    assert list(read_store(store.path)) == [(1.0, "cpu", 1)]
@@ -0,0 +1,22 @@
+from sparkle_log.summary import Downsampler, RunSummary
+
+
+def test_run_summary_percentiles_and_sparkline():
+    summary = RunSummary(percentiles=(50, 99))
+    for value in range(1, 101):
+        summary.update({"cpu": value})
+
+    (line,) = summary.format_lines()
+    assert "100 samples | min, mean, max (1, 50.5, 100)% | p50, p99 (50, 99) | " in line
+    assert len(summary.metrics["cpu"].series.values()) <= 30
+
+
+def test_downsampler_constant_memory():
+    series = Downsampler(points=4)
+    for value in range(16):
+        series.add(value)
+
+    assert series.bucket_width == 8
+    assert series.values() == [3.5, 11.5]
+    series.add(100)
+    assert series.values() == [3.5, 11.5, 100]
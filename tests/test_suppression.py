@@ -0,0 +1,69 @@
+from unittest.mock import patch
+
+import pytest
+
+from sparkle_log import log_writer as LW
+from sparkle_log.suppression import SuppressionPolicy, configure_suppression
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    LW.READINGS.clear()
+    yield
+    LW.READINGS.clear()
+    configure_suppression(None)
+
+
+def test_only_changes_and_heartbeats_are_emitted():
+    policy = SuppressionPolicy(delta=2, heartbeat=3)
+    decisions = [policy.should_emit("cpu", (v, v, v, v)) for v in (10, 11, 12, 13, 20, 20, 20, 20)]
+    assert decisions == [True, False, False, True, True, False, False, True]
+    assert policy.suppressed == 4
+    assert policy.emitted == 4
+
+
+def test_token_bucket_limits_lines_across_metrics():
+    policy = SuppressionPolicy(delta=0, heartbeat=100, max_lines_per_second=1, burst=2)
+    with patch("sparkle_log.suppression.time.monotonic", return_value=policy._refilled_at):
+        emitted = [policy.should_emit(f"m{i}", (i,)) for i in range(4)]
+    assert emitted == [True, True, False, False]
+    with patch("sparkle_log.suppression.time.monotonic", return_value=policy._refilled_at + 1):
+        assert policy.should_emit("m9", (9,))
+    assert policy.suppressed == 2
+
+
+def test_none_readings_count_as_change():
+    policy = SuppressionPolicy()
+    assert policy.should_emit("net_rx", (None, 1, 1, 1))
+    assert policy.should_emit("net_rx", (5, 1, 1, 1))
+
+
+def test_log_system_metrics_suppresses_unchanged_lines():
+    policy = configure_suppression(delta=1, heartbeat=5)
+    with (
+        patch.object(LW.GLOBAL_LOGGER, "info") as mock_info,
+        patch.object(LW.GLOBAL_LOGGER, "isEnabledFor", return_value=True),
+        patch.object(LW.psutil, "virtual_memory") as vm,
+    ):
+        vm.return_value.percent = 50
+        for _ in range(6):
+            LW.log_system_metrics(("memory",))
+    assert mock_info.call_count == 2
+    assert policy.suppressed == 4
+
+
+def test_combined_line_takes_one_token_and_one_count():
+    policy = SuppressionPolicy(delta=1, heartbeat=100, max_lines_per_second=1, burst=1)
+    with patch("sparkle_log.suppression.time.monotonic", return_value=policy._refilled_at):
+        assert policy.should_emit_line({"cpu": (10,), "memory": (50,), "drive": (20,)})
+        assert not policy.should_emit_line({"cpu": (30,), "memory": (70,), "drive": (40,)})
+    assert policy.suppressed == 1
+    assert policy.emitted == 1
+
+
+def test_combined_line_resets_every_baseline():
+    policy = SuppressionPolicy(delta=1, heartbeat=100)
+    assert policy.should_emit_line({"cpu": (10,), "memory": (50,)})
+    assert policy.should_emit_line({"cpu": (20,), "memory": (51,)})
+    # memory was written at 51 along with cpu's change, so 51.5 is no change.
+    assert not policy.should_emit_line({"cpu": (20,), "memory": (51.5,)})
@@ -0,0 +1,71 @@
+import logging
+import threading
+from threading import Event
+from unittest.mock import MagicMock, patch
+
+import psutil
+import pytest
+
+from sparkle_log import log_writer as LW
+from sparkle_log.graphs import GLOBAL_LOGGER
+from sparkle_log.thread_metrics import ThreadSampler, configure_thread_metrics
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    LW.READINGS.clear()
+    yield
+    LW.READINGS.clear()
+    configure_thread_metrics()
+
+
+def fake_thread(thread_id, cpu):
+    return MagicMock(id=thread_id, user_time=cpu, system_time=0.0)
+
+
+def test_ranks_threads_by_cpu_delta():
+    sampler = ThreadSampler(top_k=2)
+    process = MagicMock(pid=psutil.Process().pid)
+    sampler._process = process
+    main_id = threading.main_thread().native_id
+    process.threads.return_value = [fake_thread(main_id, 1.0), fake_thread(1, 1.0), fake_thread(2, 1.0)]
+    with patch("sparkle_log.thread_metrics.time.monotonic", side_effect=[10.0, 11.0]):
+        assert sampler.sample() == {"threads": None}
+        process.threads.return_value = [fake_thread(main_id, 1.2), fake_thread(1, 1.9), fake_thread(2, 1.05)]
+        readings = sampler.sample()
+
+    assert readings["threads"] == pytest.approx(90)
+    assert [name for name, _ in sampler.top] == ["tid 1", "MainThread"]
+    assert sampler.format_top() == "threads top 2: tid 1 90%, MainThread 20%"
+
+
+def test_names_refreshed_only_when_thread_set_changes():
+    sampler = ThreadSampler()
+    with patch("sparkle_log.thread_metrics.threading.enumerate", wraps=threading.enumerate) as mock_enumerate:
+        sampler.sample()
+        sampler.sample()
+        assert mock_enumerate.call_count == 1
+        stop = Event()
+        worker = threading.Thread(target=stop.wait, name="sparkle-worker")
+        worker.start()
+        try:
+            sampler.sample()
+        finally:
+            stop.set()
+            worker.join()
+        assert mock_enumerate.call_count == 2
+    assert "sparkle-worker" in sampler._names.values()
+
+
+def test_threads_metric_logs_top_line():
+    sampler = configure_thread_metrics(top_k=1)
+    prev_level = GLOBAL_LOGGER.level
+    GLOBAL_LOGGER.setLevel(logging.INFO)
+    try:
+        with patch.object(GLOBAL_LOGGER, "info") as mock_info:
+            LW.log_system_metrics(("threads",))
+            LW.log_system_metrics(("threads",))
+    finally:
+        GLOBAL_LOGGER.setLevel(prev_level)
+    assert len(sampler.top) == 1
+    assert mock_info.call_args[0][0].startswith("threads top 1: ")